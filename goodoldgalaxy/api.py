@@ -205,10 +205,10 @@ class Api:
         return achievements
     
     # Get Extrainfo about several games
-    def get_infos(self, games: [Game]) -> tuple:
+    def get_infos(self, games: [Game], cache_validity: int = 60 * 60 * 24) -> tuple:
         glen = len(games)
         if glen <= 50:
-            return self.__get_infos(games)
+            return self.__get_infos(games, cache_validity)
         else:
             pages = math.ceil(glen / 50.0)
             page = 0
@@ -216,20 +216,19 @@ class Api:
             while page <= pages:
                 start = page * 50
                 end = start + 50 
-                resp = self.__get_infos(games[start:end])
+                resp = self.__get_infos(games[start:end], cache_validity)
                 for idx in resp:
                     response.append(idx)
                 page += 1
             return response
     
     # Get Extrainfo about several games
-    def __get_infos(self, games: List[Game]) -> tuple:
+    def __get_infos(self, games: List[Game], cache_validity: int = 60 * 60 * 24) -> tuple:
         ids = ""
         idx = 0
         glen = len(games)
         found = 0
         bypass_cache = False
-        cache_validity = 60 * 60 * 24
         # compose ids and figure out if we can serve from cache
         for game in games:
             game_dir = os.path.join(CACHE_DIR, "game/{}".format(game.id))
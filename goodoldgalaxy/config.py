@@ -1,32 +1,45 @@
 import os
 import threading
 import json
-import time
 from goodoldgalaxy.paths import CONFIG_DIR, CONFIG_FILE_PATH
-from goodoldgalaxy.constants import DEFAULT_CONFIGURATION
+from goodoldgalaxy.constants import DEFAULT_CONFIGURATION, CONFIG_WRITE_DELAY
 
 
 # Make sure you never spawn two instances of this class
 # If multiple instances go out of sync, they will overwrite each others changes
 # The config file is only read once upon starting up
+# Changes are written CONFIG_WRITE_DELAY seconds after the first change, so bursts of changes are written at once,
+# call flush before exiting to write pending changes
 class __Config:
     def __init__(self):
         self.__config_file = CONFIG_FILE_PATH
+        self.__lock = threading.RLock()
+        # serializes writes of the config file, so an older snapshot never replaces a newer one
+        self.__write_lock = threading.Lock()
+        self.__write_timer = None
         self.__config = self.__load_config_file()
         self.__add_missing_config_entries()
-        self.__update_required = False
 
-        # Update the config file regularly to reflect the self.__config dictionary
-        keep_config_synced_thread = threading.Thread(target=self.__keep_config_synced)
-        keep_config_synced_thread.daemon = True
-        keep_config_synced_thread.start()
+    def __schedule_update(self):
+        with self.__lock:
+            if self.__write_timer is None:
+                self.__write_timer = threading.Timer(CONFIG_WRITE_DELAY, self.flush)
+                self.__write_timer.daemon = True
+                self.__write_timer.start()
 
-    def __keep_config_synced(self):
-        while True:
-            if self.__update_required:
-                self.__update_config_file()
-                self.__update_required = False
-            time.sleep(0.1)
+    def flush(self):
+        """
+        Writes pending changes to the config file right away.
+        """
+        with self.__write_lock:
+            # changes made while the file is written are left for the next write, instead of waiting for the disk
+            with self.__lock:
+                if self.__write_timer is None:
+                    return
+                self.__write_timer.cancel()
+                self.__write_timer = None
+                config = json.dumps(self.__config)
+            self.__update_config_file(config)
 
     def __load_config_file(self) -> dict:
         if os.path.exists(self.__config_file):
@@ -35,6 +48,7 @@ class __Config:
                     return json.loads(file.read())
                 except json.decoder.JSONDecodeError:
                     print("Reading config.json failed, creating new config file.")
+                    self.__backup_config_file()
                     return self.__create_config_file()
         else:
             return self.__create_config_file()
@@ -53,10 +67,24 @@ class __Config:
 
         return DEFAULT_CONFIGURATION
 
-    def __update_config_file(self):
-        with open(self.__config_file, "w") as file:
-            file.write(json.dumps(self.__config))
-            file.close()
+    def __backup_config_file(self):
+        # keep the unreadable file around for the user to recover their settings from
+        try:
+            os.replace(self.__config_file, "{}.broken".format(self.__config_file))
+        except OSError:
+            pass
+
+    def __update_config_file(self, config: str):
+        # write a new file and replace the old one with it, so a crash never leaves a partly written config file
+        tmp_file = "{}.tmp".format(self.__config_file)
+        try:
+            with open(tmp_file, "w") as file:
+                file.write(config)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_file, self.__config_file)
+        except OSError as e:
+            print("Could not write the config file {}. Cause: {}".format(self.__config_file, e))
 
     def __add_missing_config_entries(self):
         # Make sure all config values in the default configuration are available
@@ -66,12 +94,13 @@ class __Config:
                 self.set(key, DEFAULT_CONFIGURATION[key])
                 added_value = True
         if added_value:
-            self.__update_config_file()
+            self.flush()
             self.__config = self.__load_config_file()
 
     def set(self, key, value):
-        self.__config[key] = value
-        self.__update_required = True
+        with self.__lock:
+            self.__config[key] = value
+        self.__schedule_update()
 
     def get(self, key):
         try:
@@ -81,8 +110,9 @@ class __Config:
 
     def unset(self, key):
         try:
-            del self.__config[key]
-            self.__update_required = True
+            with self.__lock:
+                del self.__config[key]
+            self.__schedule_update()
         except:
             pass
 
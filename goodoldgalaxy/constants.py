@@ -248,9 +248,18 @@ DEFAULT_CONFIGURATION = {
     "install_dir": DEFAULT_INSTALL_DIR,
     "create_shortcuts": True,
     "keep_installers": False,
+    "installer_store_max_versions": 2,
+    "installer_store_max_size": 0,  # bytes, 0 for no limit
     "stay_logged_in": True,
     "show_fps": False,
-    "show_windows_games": False
+    "resource_sampling": False,
+    "resource_sampling_interval": 5,  # seconds
+    "warmup_game_files": False,
+    "show_windows_games": False,
+    "install_while_downloading": False,
+    "library_refresh_interval": 60 * 60,  # 1 hour
+    "installed_refresh_interval": 10 * 60,  # 10 minutes
+    "updates_refresh_interval": 6 * 60 * 60  # 6 hours
 }
 
 # Game IDs to ignore when received by the API
@@ -267,3 +276,38 @@ MINIMUM_RESUME_SIZE = 50 * 1024**2  # 50 MB
 
 SESSION = requests.Session()
 SESSION.headers.update({'User-Agent': 'goodoldgalaxy/{} (Linux {})'.format(VERSION, platform.machine())})
+
+# Background library refresh scheduling
+REFRESH_JITTER = 0.1  # up to 10% of the interval
+REFRESH_MINIMUM_INTERVAL = 60  # 1 minute
+REFRESH_MAXIMUM_BACKOFF = 6 * 60 * 60  # 6 hours
+REFRESH_DOWNLOAD_RETRY = 60  # retry network refreshes every minute while downloading
+
+# Maximum number of concurrent product information lookups when the batched request fails
+INFO_LOOKUP_WORKERS = 4
+
+# Number of files downloaded at the same time, so the parts of an installer arrive together
+PARALLEL_DOWNLOADS = 3
+
+# Game launch monitoring
+GAME_START_TIMEOUT = 3  # seconds a start process has to run for, unless it leaves the game running
+GAME_POLL_INTERVAL = 2  # seconds between checks whether a game is still running
+ORPHAN_REAP_INTERVAL = 10  # seconds between waits for exited processes reparented to this process
+GAME_OUTPUT_TAIL_SIZE = 64 * 1024  # bytes of game output kept for error messages
+GAME_LOG_MAX_SIZE = 1024 * 1024  # bytes of game output per log file before it is rotated
+GAME_LOG_BACKUPS = 3  # rotated log files kept per game
+
+# Number of play sessions kept per game, older sessions only count towards the total playtime
+PLAYTIME_SESSIONS_KEPT = 50
+
+# Resource sampling of running games
+RESOURCE_SAMPLES_KEPT = 720  # samples kept per session, an hour at the default interval
+RESOURCE_SAMPLER_MAX_OVERHEAD = 0.005  # share of the interval sampling may take before the interval is doubled
+
+# Warming up the page cache with the files games read while starting
+WARMUP_RECORD_DURATION = 60  # seconds after a launch the files a game opens are recorded for
+WARMUP_RECORD_INTERVAL = 2  # seconds between looking at the open files of a game
+WARMUP_MAX_SIZE = 1024**3  # bytes read ahead at most, so the warmup doesn't push everything else out of memory
+
+# Seconds configuration changes are collected for before they are written to the config file
+CONFIG_WRITE_DELAY = 1
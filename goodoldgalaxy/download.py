@@ -41,6 +41,8 @@ class Download:
         self.__state_funcs = []
         self.number = number
         self.out_of_amount = out_of_amount
+        # downloads of the parts of the same file, set by the download manager
+        self.group = None
         self.__downloaded = 0
         self.__paused = False
         self.__queued = True
@@ -286,7 +288,10 @@ class Download:
         for entry in self.__progress_funcs:
             progress_func = entry[0]
             progress_func_args = entry[1]
-            if self.out_of_amount > 1:
+            if self.group is not None and len(self.group) > 1:
+                # parts are downloaded at the same time, report the progress of the whole group
+                percentage = int(sum(max(download.get_progress(), 0) for download in self.group) / len(self.group))
+            elif self.out_of_amount > 1:
                 # Change the percentage based on which number we are
                 progress_start = 100/self.out_of_amount*(self.number-1)
                 percentage = progress_start + percentage/self.out_of_amount
@@ -5,7 +5,7 @@ import threading
 import queue
 from requests.exceptions import ConnectionError
 from goodoldgalaxy.config import Config
-from goodoldgalaxy.constants import DOWNLOAD_CHUNK_SIZE, MINIMUM_RESUME_SIZE, SESSION
+from goodoldgalaxy.constants import DOWNLOAD_CHUNK_SIZE, MINIMUM_RESUME_SIZE, SESSION, PARALLEL_DOWNLOADS
 from goodoldgalaxy.download import Download
 
 
@@ -20,19 +20,25 @@ class __DownloadManger:
     * Cancels downloads
     * Resumes downloads
     * Lists downloads
+
+    Up to PARALLEL_DOWNLOADS files are downloaded at the same time, so the parts of a file split in several downloads
+    arrive together. The finish function of such a group of downloads is only invoked once all parts succeeded.
     """
     def __init__(self):
         self.__queue = queue.Queue()
-        self.__current_download = None
-        self.__cancel = False
+        self.__current_downloads = []
+        self.__canceled = set()
+        self.__succeeded = set()
+        self.__lock = threading.Lock()
         self.__paused = False
         self.__queue_wait = 0.1
         self.__completed = []
         self.__listeners = []
 
-        download_thread = threading.Thread(target=self.__download_thread)
-        download_thread.daemon = True
-        download_thread.start()
+        for i in range(PARALLEL_DOWNLOADS):
+            download_thread = threading.Thread(target=self.__download_thread)
+            download_thread.daemon = True
+            download_thread.start()
 
     def register_listener(self,listener_func):
         """
@@ -95,6 +101,16 @@ class __DownloadManger:
         """
         return self.__paused
         
+    def is_downloading(self) -> bool:
+        """
+        Checks if a file is currently being downloaded.
+        
+        Return:
+        -------
+            True if a download is running and downloads are not paused, False otherwise
+        """
+        return len(self.__current_downloads) > 0 and not self.__paused
+
     # Pause all downloads
     def pause(self):
         """Pause all file downloads"""
@@ -113,9 +129,7 @@ class __DownloadManger:
         --------
             List with Download objects
         """
-        ret = []
-        if (self.__current_download is not None):
-            ret.append(self.__current_download)
+        ret = list(self.__current_downloads)
         for i in self.__queue.queue:
             ret.append(i)
         for i in self.__completed:
@@ -151,12 +165,23 @@ class __DownloadManger:
             self.__queue.put(download)
         else:
             # Assume we've received a list of downloads
+            self.__group_parts(download)
             for d in download:
                 print("Added {} to the download queue".format(d.url))
                 for listener_func in self.__listeners:
                     listener_func(d)
                 self.__queue.put(d)
 
+    def __group_parts(self, downloads: list):
+        # the parts of a file are the downloads of the same object that say they're one of several
+        for d in downloads:
+            if d.out_of_amount > 1 and d.group is None:
+                group = [part for part in downloads
+                         if part.associated_object is d.associated_object and part.out_of_amount == d.out_of_amount]
+                if len(group) == d.out_of_amount:
+                    for part in group:
+                        part.group = group
+
     def download_now(self, download):
         download.set_priority(-1);
         download_file_thread = threading.Thread(target=self.__download_file, args=(download,))
@@ -169,8 +194,8 @@ class __DownloadManger:
             downloads = [downloads]
 
         for download in downloads:
-            if download == self.__current_download:
-                self.cancel_current_download()
+            if download in self.__current_downloads:
+                self.__canceled.add(download)
             else:
                 self.__paused = True
                 new_queue = queue.Queue()
@@ -184,28 +209,39 @@ class __DownloadManger:
                 self.__paused = False
 
     def cancel_current_download(self):
-        self.__cancel = True
+        """Cancels the running downloads"""
+        for download in list(self.__current_downloads):
+            self.__canceled.add(download)
 
     def cancel_all_downloads(self):
         while not self.__queue.empty():
             self.__queue.get()
         self.cancel_current_download()
 
-        # wait for the download to be fully cancelled
-        while self.__current_download:
+        # wait for the downloads to be fully cancelled
+        while len(self.__current_downloads) > 0:
             time.sleep(self.__queue_wait)
 
     def __download_thread(self):
         while True:
             if not self.__queue.empty() and not self.__paused:
-                self.__current_download = self.__queue.get()
-                if self.__current_download.is_paused():
+                try:
+                    download = self.__queue.get_nowait()
+                except queue.Empty:
+                    # taken by another download thread
+                    continue
+                if download.is_paused():
                     # add to the end of the queue
-                    self.__queue.put(self.__current_download)
+                    self.__queue.put(download)
                     # also wait a bit
                     time.sleep(self.__queue_wait)
                     continue
-                self.__download_file(self.__current_download)
+                self.__current_downloads.append(download)
+                try:
+                    self.__download_file(download)
+                finally:
+                    self.__current_downloads.remove(download)
+                    self.__canceled.discard(download)
             time.sleep(self.__queue_wait)
 
     def __download_file(self, download):
@@ -225,17 +261,31 @@ class __DownloadManger:
         self.__mark_download_as_complete(download,result)
         # Successful downloads
         if result:
-            if download.number == download.out_of_amount:
+            if self.__is_group_complete(download):
                 finish_thread = threading.Thread(target=download.finish)
                 finish_thread.start()
-            if self.__queue.empty():
+            if self.__queue.empty() and len(self.__current_downloads) <= 1:
                 Config.unset("current_download")
         # Unsuccessful downloads and cancels
         else:
-            self.__cancel = False
+            self.__canceled.discard(download)
             download.cancel()
-            self.__current_download = None
-            os.remove(download.save_location)
+            if os.path.exists(download.save_location):
+                os.remove(download.save_location)
+            if download.group is not None:
+                # the other parts are useless without this one
+                self.cancel_download([part for part in download.group if part is not download and not part.is_completed()])
+
+    def __is_group_complete(self, download) -> bool:
+        if download.group is None:
+            return download.number == download.out_of_amount
+        # parts finish in any order, only the last one to finish completes the group
+        with self.__lock:
+            self.__succeeded.add(download)
+            if not all(part in self.__succeeded for part in download.group):
+                return False
+            self.__succeeded.difference_update(download.group)
+            return True
 
     def prepare_location(self, save_location):
         # Make sure the directory exists
@@ -262,6 +312,7 @@ class __DownloadManger:
         return start_point, download_mode
     
     def __mark_download_as_complete(self, download, result: bool = None):
+        download.set_completed(result)
         # don't track these downloads
         if (download.priority() < 0):
             return
@@ -287,11 +338,7 @@ class __DownloadManger:
                     save_file.write(chunk)
                     downloaded_size += len(chunk)
                     download.set_downloaded(downloaded_size)
-                    if self.__cancel:
-                        self.__cancel = False
-                        save_file.close()
-                        download.cancel()
-                        self.__current_download = None
+                    if download in self.__canceled:
                         result = False
                         break
                     if file_size > 0:
@@ -0,0 +1,61 @@
+import os
+import fcntl
+import shutil
+
+# ioctl request to share the data blocks of a file with another one (reflink)
+FICLONE = 0x40049409
+
+
+def copy_file(src: str, dst: str):
+    """
+    Copies a file with its metadata, sharing the data blocks when the file system supports it.
+
+    The data is reflinked (FICLONE) if possible, otherwise copied by the kernel (copy_file_range), and only then
+    read and written by shutil.
+
+    Parameters:
+    -----------
+        src: str -> Source file
+        dst: str -> Destination file
+    """
+    try:
+        with open(src, "rb") as source, open(dst, "wb") as destination:
+            try:
+                fcntl.ioctl(destination.fileno(), FICLONE, source.fileno())
+            except OSError:
+                size = os.fstat(source.fileno()).st_size
+                copied = 0
+                while copied < size:
+                    written = os.copy_file_range(source.fileno(), destination.fileno(), size - copied)
+                    if written == 0:
+                        break
+                    copied += written
+                if copied < size:
+                    raise OSError("Only {} of {} bytes of {} were copied".format(copied, size, src))
+        shutil.copystat(src, dst)
+    except (AttributeError, OSError):
+        shutil.copy2(src, dst)
+
+
+def move_file(src: str, dst: str):
+    """
+    Moves a file, replacing the destination. Files on the same file system are renamed, otherwise copied.
+
+    Parameters:
+    -----------
+        src: str -> Source file
+        dst: str -> Destination file
+    """
+    if __same_device(src, dst):
+        os.replace(src, dst)
+    else:
+        copy_file(src, dst)
+        os.remove(src)
+
+
+def __same_device(src: str, dst: str) -> bool:
+    # the destination may not exist yet, compare with the closest existing parent
+    parent = os.path.abspath(dst)
+    while not os.path.exists(parent):
+        parent = os.path.dirname(parent)
+    return os.lstat(src).st_dev == os.stat(parent).st_dev
@@ -51,6 +51,10 @@ class Game:
         self.sidebar_tile = None
         self.list_tile = None
         self.grid_tile = None
+        # extracts the installer while it's downloaded, if enabled
+        self.stream_extractor = None
+        # installer selected for the current download
+        self.download_info = None
         self.safe_name = self.__clean_filename(self.name)
 
         self.dlc_status_list = ["not-installed", "installed", "updatable"]
@@ -0,0 +1,98 @@
+import os
+import time
+from goodoldgalaxy.paths import GAME_LOG_DIR
+from goodoldgalaxy.constants import GAME_LOG_MAX_SIZE, GAME_LOG_BACKUPS
+
+
+def get_log_path(game) -> str:
+    """
+    Gets the log file the output of a game is written to.
+
+    Parameters:
+    -----------
+        game: Game -> Game
+
+    Return:
+    -------
+        str: Path of the current log file, older logs have .1, .2, ... appended
+    """
+    return os.path.join(GAME_LOG_DIR, "{}.log".format(game.get_install_directory_name()))
+
+
+class GameLog:
+    """
+    Size bounded log file of the output of a game.
+
+    Once the log file grows past max_size it is rotated: it's renamed to <path>.1, the previous <path>.1 to <path>.2
+    and so on, keeping up to backups old logs, and a new log file is started. The file is opened in append mode, so
+    every launch adds to the log of the previous one.
+
+    Parameters:
+    -----------
+        path: str -> Log file
+        max_size: int -> Size in bytes after which the log is rotated
+        backups: int -> Number of rotated logs kept
+    """
+
+    def __init__(self, path: str, max_size: int = GAME_LOG_MAX_SIZE, backups: int = GAME_LOG_BACKUPS):
+        self.path = path
+        self.max_size = max_size
+        self.backups = backups
+        self.__file = None
+        self.__size = 0
+
+    def open(self):
+        """
+        Opens the log file, marking the start of a launch in it.
+        """
+        try:
+            os.makedirs(os.path.dirname(self.path), mode=0o755, exist_ok=True)
+            self.__file = open(self.path, "ab")
+            self.__size = self.__file.tell()
+        except OSError as e:
+            print("Could not open the game log {}. Cause: {}".format(self.path, e))
+            return
+        self.write("--- Started at {} ---\n".format(time.strftime("%Y-%m-%d %H:%M:%S")).encode("utf-8"))
+
+    def write(self, data: bytes):
+        """
+        Appends output to the log, rotating it when it grows too large.
+
+        Parameters:
+        -----------
+            data: bytes -> Output of the game
+        """
+        if self.__file is None:
+            return
+        # a single write never takes more than a whole log
+        data = data[-self.max_size:]
+        try:
+            if self.__size > 0 and self.__size + len(data) > self.max_size:
+                self.__rotate()
+            self.__file.write(data)
+            self.__file.flush()
+            self.__size += len(data)
+        except OSError as e:
+            print("Could not write the game log {}. Cause: {}".format(self.path, e))
+            self.close()
+
+    def close(self):
+        """
+        Closes the log file.
+        """
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __rotate(self):
+        self.__file.close()
+        for index in range(self.backups - 1, 0, -1):
+            backup = "{}.{}".format(self.path, index)
+            if os.path.exists(backup):
+                os.replace(backup, "{}.{}".format(self.path, index + 1))
+        if self.backups > 0:
+            os.replace(self.path, "{}.1".format(self.path))
+        else:
+            os.remove(self.path)
+        self.__file = open(self.path, "ab")
+        self.__size = 0
@@ -3,49 +3,394 @@
 #!/usr/bin/env python3
 import io
 import re
-import shutil
+import bisect
 import os
+import hashlib
+import zipfile
 from os import path
 import sys
 
 FILESIZE_RE = re.compile(r'filesizes="(\d+?)"')
 OFFSET_RE = re.compile(r'offset=`head -n (\d+?) "\$0"')
+MD5_RE = re.compile(r'MD5="([0-9a-fA-F]+)"')
+SHA_RE = re.compile(r'SHA="([0-9a-fA-F]+)"')
 
-def extract_installer(input_path:str, output_path:str = "./"):    
-    game_bin = open(input_path, "rb")
+COPY_CHUNK_SIZE = 1024 * 1024  # 1 MB
+HASH_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
+
+
+class FileView(io.RawIOBase):
+    """
+    Read only, seekable view over a section of a file.
+
+    The view has its own position, so it can be handed to readers such as zipfile without copying the section out.
+    """
+
+    def __init__(self, file, offset: int, size: int):
+        self.__file = file
+        self.__offset = offset
+        self.__size = size
+        self.__position = 0
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.__position
+
+    def seek(self, position: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            position += self.__position
+        elif whence == io.SEEK_END:
+            position += self.__size
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self.__position = position
+        return self.__position
+
+    def readinto(self, buffer) -> int:
+        count = min(len(buffer), max(self.__size - self.__position, 0))
+        if count == 0:
+            return 0
+        data = pread(self.__file, count, self.__offset + self.__position)
+        buffer[:len(data)] = data
+        self.__position += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.__file.close()
+        super().close()
+
+
+class MultiPartFile(io.RawIOBase):
+    """
+    Read only, seekable stream over the ordered parts of a file, as if they were concatenated.
+
+    Installers that are downloaded in several parts are read through this class, so the parts never have to be joined
+    into an intermediate file. Reads that cross the end of a part continue at the start of the next one.
+    """
+
+    def __init__(self, paths: list):
+        self.__files = []
+        self.__offsets = []
+        self.__size = 0
+        self.__position = 0
+        try:
+            for part_path in paths:
+                file = open(part_path, "rb")
+                self.__files.append(file)
+                self.__offsets.append(self.__size)
+                self.__size += os.fstat(file.fileno()).st_size
+        except OSError:
+            self.close()
+            raise
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self.__position
+
+    def seek(self, position: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_CUR:
+            position += self.__position
+        elif whence == io.SEEK_END:
+            position += self.__size
+        if position < 0:
+            raise ValueError("Negative seek position {}".format(position))
+        self.__position = position
+        return self.__position
+
+    def segments(self, offset: int, count: int):
+        """
+        Splits a section of the stream into sections of its parts.
+
+        Parameters:
+        -----------
+            offset: int -> Stream offset
+            count: int -> Number of bytes
+
+        Return:
+        -------
+            Generator of (part file object, part offset, number of bytes) tuples, in order
+        """
+        index = max(bisect.bisect_right(self.__offsets, offset) - 1, 0)
+        while count > 0 and index < len(self.__files):
+            file = self.__files[index]
+            part_size = os.fstat(file.fileno()).st_size
+            part_offset = offset - self.__offsets[index]
+            part_count = min(count, part_size - part_offset)
+            if part_count > 0:
+                yield file, part_offset, part_count
+                offset += part_count
+                count -= part_count
+            index += 1
+
+    def pread(self, count: int, offset: int) -> bytes:
+        """
+        Reads from a position of the stream without moving it, like os.pread does for file descriptors.
+
+        Parameters:
+        -----------
+            count: int -> Maximum number of bytes to read
+            offset: int -> Stream offset
+
+        Return:
+        -------
+            bytes: Data read, shorter than count at the end of the stream
+        """
+        chunks = []
+        for file, part_offset, part_count in self.segments(offset, count):
+            chunks.append(os.pread(file.fileno(), part_count, part_offset))
+        return b"".join(chunks)
+
+    def readinto(self, buffer) -> int:
+        data = self.pread(len(buffer), self.__position)
+        buffer[:len(data)] = data
+        self.__position += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            for file in self.__files:
+                file.close()
+        super().close()
+
+
+def pread(file, count: int, offset: int) -> bytes:
+    """
+    Reads from a position of a file without moving its position.
+
+    Parameters:
+    -----------
+        file: File object, or a (buffered) MultiPartFile
+        count: int -> Maximum number of bytes to read
+        offset: int -> File offset
+
+    Return:
+    -------
+        bytes: Data read
+    """
+    raw = getattr(file, "raw", file)
+    if isinstance(raw, MultiPartFile):
+        return raw.pread(count, offset)
+    return os.pread(file.fileno(), count, offset)
+
+
+def open_installer(input_path):
+    """
+    Opens an installer for reading.
+
+    Parameters:
+    -----------
+        input_path: str or list -> Installer path, or the installer parts paths in order
+
+    Return:
+    -------
+        Seekable binary stream over the whole installer, to be closed by the caller
+    """
+    if isinstance(input_path, str):
+        return open(input_path, "rb")
+    if len(input_path) == 1:
+        return open(input_path[0], "rb")
+    return io.BufferedReader(MultiPartFile(input_path), COPY_CHUNK_SIZE)
+
+
+def __get_name(input_path) -> str:
+    return input_path if isinstance(input_path, str) else input_path[0]
+
+
+def get_installer_offsets(input_path) -> tuple:
+    """
+    Gets the layout of a makeself installer.
+
+    Parameters:
+    -----------
+        input_path: str or list -> Installer path, or the installer parts paths in order
+
+    Return:
+    -------
+        tuple: Makeself script size, MojoSetup archive size, game data offset and game data size, in bytes
+    """
+    with open_installer(input_path) as game_bin:
+        # Read the first 10kb so we can determine the script line number
+        beginning = game_bin.read(10240).decode("utf-8", errors="ignore")
+        offset_match = OFFSET_RE.search(beginning)
+        if offset_match is None:
+            raise ValueError("{} is not a makeself installer".format(__get_name(input_path)))
+        script_lines = int(offset_match.group(1))
+
+        # Read the number of lines to determine the script size
+        game_bin.seek(0, io.SEEK_SET)
+        for l in range(0, script_lines):
+            game_bin.readline()
+        script_size = game_bin.tell()
+
+        # Filesize is for the MojoSetup archive, not the actual game data
+        game_bin.seek(0, io.SEEK_SET)
+        script = game_bin.read(script_size).decode("utf-8", errors="ignore")
+        filesize_match = FILESIZE_RE.search(script)
+        if filesize_match is None:
+            raise ValueError("{} has no MojoSetup archive size".format(__get_name(input_path)))
+        filesize = int(filesize_match.group(1))
+        dataoffset = script_size + filesize
+        datasize = game_bin.seek(0, io.SEEK_END) - dataoffset
+    return script_size, filesize, dataoffset, datasize
+
+
+def open_installer_data(input_path):
+    """
+    Opens the game data archive of a makeself installer in place.
+
+    Parameters:
+    -----------
+        input_path: str or list -> Installer path, or the installer parts paths in order
+
+    Return:
+    -------
+        Seekable binary stream over the game data zip archive, to be closed by the caller
+    """
+    _, _, dataoffset, datasize = get_installer_offsets(input_path)
+    return io.BufferedReader(FileView(open_installer(input_path), dataoffset, datasize), COPY_CHUNK_SIZE)
+
+
+def copy_range(source, destination, offset: int, count: int):
+    """
+    Copies a section of a file to the end of another file.
+
+    The copy is done by the kernel where possible (copy_file_range, which reflinks on supporting file systems, or
+    sendfile), falling back to reading and writing the data.
+
+    Parameters:
+    -----------
+        source: Source file object, or a (buffered) MultiPartFile
+        destination: Destination file object
+        offset: int -> Source offset
+        count: int -> Number of bytes to copy
+    """
+    raw = getattr(source, "raw", source)
+    if isinstance(raw, MultiPartFile):
+        # each part is copied by the kernel on its own
+        for file, part_offset, part_count in raw.segments(offset, count):
+            copy_range(file, destination, part_offset, part_count)
+            count -= part_count
+        if count > 0:
+            raise EOFError("Expected {} more bytes".format(count))
+        return
+    source_fd = source.fileno()
+    destination_fd = destination.fileno()
+    destination.flush()
+    copied = 0
+    for copy_func in (_copy_file_range, _sendfile):
+        try:
+            while copied < count:
+                written = copy_func(source_fd, destination_fd, offset + copied, count - copied)
+                if written == 0:
+                    break
+                copied += written
+            break
+        except (AttributeError, OSError):
+            # not supported here, try the next method from where this one stopped
+            continue
+    while copied < count:
+        data = os.pread(source_fd, min(COPY_CHUNK_SIZE, count - copied), offset + copied)
+        if not data:
+            break
+        destination.write(data)
+        copied += len(data)
+    destination.flush()
+    if copied < count:
+        raise EOFError("Expected {} bytes but only {} could be copied".format(count, copied))
+
+
+def _copy_file_range(source_fd: int, destination_fd: int, offset: int, count: int) -> int:
+    return os.copy_file_range(source_fd, destination_fd, min(count, 2**30), offset)
+
+
+def _sendfile(source_fd: int, destination_fd: int, offset: int, count: int) -> int:
+    return os.sendfile(destination_fd, source_fd, offset, min(count, 2**30))
+
+
+def extract_installer(input_path, output_path:str = "./"):
     os.makedirs(output_path, exist_ok=True)
-    
-    # Read the first 10kb so we can determine the script line number
-    beginning = game_bin.read(10240).decode("utf-8", errors="ignore")
-    offset_match = OFFSET_RE.search(beginning)
-    script_lines = int(offset_match.group(1))
-    
-    # Read the number of lines to determine the script size
-    game_bin.seek(0, io.SEEK_SET)
-    for l in range(0, script_lines):
-        game_bin.readline()
-    script_size = game_bin.tell()
+    script_size, filesize, dataoffset, datasize = get_installer_offsets(input_path)
     print("Makeself script size:", script_size)
-    
-    # Read the script
-    game_bin.seek(0, io.SEEK_SET)
-    script_bin = game_bin.read(script_size)
-    with open(path.join(output_path, "unpacker.sh"), "wb") as script_f:
-        script_f.write(script_bin)
-    script = script_bin.decode("utf-8")
-    
-    # Filesize is for the MojoSetup archive, not the actual game data
-    filesize_match = FILESIZE_RE.search(script)
-    filesize = int(filesize_match.group(1))
     print("MojoSetup archive size:", filesize)
-    
-    # Extract the setup archive
-    game_bin.seek(script_size, io.SEEK_SET)
-    with open(path.join(output_path, "mojosetup.tar.gz"), "wb") as setup_f:
-        setup_f.write(game_bin.read(filesize))
-    
-    # Extract the game data archive
-    dataoffset = script_size + filesize
-    game_bin.seek(dataoffset, io.SEEK_SET)
-    with open(path.join(output_path, "data.zip"), "wb") as datafile:
-        shutil.copyfileobj(game_bin, datafile)
+
+    with open_installer(input_path) as game_bin:
+        # Extract the script
+        with open(path.join(output_path, "unpacker.sh"), "wb") as script_f:
+            copy_range(game_bin, script_f, 0, script_size)
+
+        # Extract the setup archive
+        with open(path.join(output_path, "mojosetup.tar.gz"), "wb") as setup_f:
+            copy_range(game_bin, setup_f, script_size, filesize)
+
+        # Extract the game data archive
+        with open(path.join(output_path, "data.zip"), "wb") as datafile:
+            copy_range(game_bin, datafile, dataoffset, datasize)
+
+
+def verify_installer(input_path) -> bool:
+    """
+    Verifies a makeself installer without running it.
+
+    The MojoSetup archive is checked against the SHA256 or MD5 checksum in the makeself header, like the installer's
+    own --check option does (installers without such a checksum are only checked for their size), and the game data
+    archive has to have a readable zip central directory. Installers in several parts are read across the parts.
+
+    Parameters:
+    -----------
+        input_path: str or list -> Installer path, or the installer parts paths in order
+
+    Return:
+    -------
+        bool: True if the installer is intact, False otherwise
+    """
+    name = __get_name(input_path)
+    try:
+        script_size, filesize, dataoffset, datasize = get_installer_offsets(input_path)
+        if datasize <= 0:
+            print("{} is truncated".format(name))
+            return False
+        with open_installer(input_path) as game_bin:
+            script = game_bin.read(script_size).decode("utf-8", errors="ignore")
+            for regex, algorithm in ((SHA_RE, "sha256"), (MD5_RE, "md5")):
+                match = regex.search(script)
+                # makeself writes zeros when the checksum was not computed
+                if match is None or int(match.group(1), 16) == 0:
+                    continue
+                checksum = __hash_range(game_bin, algorithm, script_size, filesize)
+                if checksum != match.group(1).lower():
+                    print("{} checksum mismatch for {}".format(algorithm.upper(), name))
+                    return False
+                break
+        with open_installer_data(input_path) as data:
+            with zipfile.ZipFile(data):
+                pass
+    except (OSError, ValueError, zipfile.BadZipFile, EOFError) as e:
+        print("{} could not be verified. Cause: {}".format(name, e))
+        return False
+    return True
+
+
+def __hash_range(file, algorithm: str, offset: int, count: int) -> str:
+    digest = hashlib.new(algorithm)
+    buffer = bytearray(min(HASH_CHUNK_SIZE, max(count, 1)))
+    view = memoryview(buffer)
+    file.seek(offset, io.SEEK_SET)
+    remaining = count
+    while remaining > 0:
+        read = file.readinto(view[:min(remaining, len(buffer))])
+        if not read:
+            raise EOFError("Expected {} more bytes".format(remaining))
+        digest.update(view[:read])
+        remaining -= read
+    return digest.hexdigest()
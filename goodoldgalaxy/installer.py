@@ -1,19 +1,40 @@
 import os
+import json
+import time
 import shutil
 import subprocess
 import stat
+import zipfile
+import threading
+import tempfile
 import gi
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from xdg.DesktopEntry import DesktopEntry
 import re
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk, GLib
 from goodoldgalaxy.translation import _
-from goodoldgalaxy.paths import CACHE_DIR, THUMBNAIL_DIR
+from goodoldgalaxy.paths import THUMBNAIL_DIR
 from goodoldgalaxy.config import Config
-from goodoldgalaxy.gogextract import extract_installer
+from goodoldgalaxy.gogextract import open_installer_data, verify_installer
+from goodoldgalaxy.fileops import copy_file, move_file
 from goodoldgalaxy.game import Game
+from goodoldgalaxy.installer_store import InstallerStore
+from goodoldgalaxy.wineprefix import prepare_prefix, get_wine_env
+from goodoldgalaxy.launcher import update_launch_plan
 from pathlib import Path
 
+# Describes the installed files, so updates only need to write what changed
+MANIFEST_FILE_NAME = "goodoldgalaxy-manifest.json"
+# Manifest of a DLC, which is installed into the directory of its game
+DLC_MANIFEST_FILE_NAME = "goodoldgalaxy-manifest-{}.json"
+# Hidden directory holding uninstalled games until they are deleted
+TRASH_DIR_NAME = ".goodoldgalaxy-trash"
+
+__trash_lock = threading.Lock()
+__trash_dirs = set()
+__trash_thread = None
+
 def copytree(src, dst, symlinks = False, ignore = None):
     if not os.path.exists(dst):
         os.makedirs(dst)
@@ -38,7 +59,321 @@ def copytree(src, dst, symlinks = False, ignore = None):
         elif os.path.isdir(s):
             copytree(s, d, symlinks, ignore)
         else:
-            shutil.copy2(s, d)
+            copy_file(s, d)
+
+def extract_game_data(installer, install_dir: str, prefix: str = "data/noarch/", progress: "InstallProgress" = None,
+                      manifest_name: str = MANIFEST_FILE_NAME, update: bool = False):
+    """
+    Extracts the game data of a Linux installer straight into the installation directory.
+
+    The installer is a makeself script with a zip archive appended, which is read in place. Only the members under
+    the given prefix are extracted, keeping their permissions and symbolic links.
+
+    When the directory holds a previous installation of the same product, only files that differ from its manifest
+    are written. On updates, files that are no longer part of the product are removed as well. Nothing is written if
+    the file system doesn't have enough free space for the files.
+
+    Parameters:
+    -----------
+        installer: str|list -> Installer path, or the installer files in order
+        install_dir: str -> Game installation directory
+        prefix: str -> Archive directory holding the game files
+        progress: InstallProgress -> Receives the number of extracted bytes and files
+        manifest_name: str -> File name of the manifest of the product, see get_manifest_name
+        update: bool -> True if this is an update of the product installed in the directory
+    """
+    install_dir = os.path.abspath(install_dir)
+    parts = __get_parts(installer)
+    installer = parts[0]
+    if progress is None:
+        progress = InstallProgress()
+    data = None
+    try:
+        try:
+            # read the game data in place, across the installer parts, without copying it out of the installer
+            data = open_installer_data(parts)
+        except ValueError:
+            # not a makeself installer, zip readers can still find an archive at the end of the file
+            data = open(installer, "rb")
+        archive = zipfile.ZipFile(data)
+    except (zipfile.BadZipFile, OSError) as e:
+        if data is not None:
+            data.close()
+        raise CannotOpenZipContent("{} could not be unzipped. Cause: {}".format(installer, e))
+    with data, archive:
+        members = [info for info in archive.infolist() if info.filename.startswith(prefix) and len(info.filename) > len(prefix)]
+        if len(members) == 0:
+            raise CannotOpenZipContent("{} holds no game data".format(installer))
+        progress.start(sum(info.file_size for info in members), len(members))
+        manifest = read_manifest(install_dir, manifest_name)
+        __check_disk_space(installer, install_dir, prefix, members, manifest)
+        os.makedirs(install_dir, mode=0o755, exist_ok=True)
+        directories = []
+        files = []
+        symlinks = []
+        for info in members:
+            target = __get_member_target(install_dir, info.filename[len(prefix):])
+            if target is None:
+                raise CannotOpenZipContent("{} has an invalid member {}".format(installer, info.filename))
+            mode = info.external_attr >> 16
+            # directories are created up front and in order, so workers only ever write files
+            if info.is_dir():
+                os.makedirs(target, mode=0o755, exist_ok=True)
+                directories.append((target, mode))
+                progress.add(0, 1)
+                continue
+            os.makedirs(os.path.dirname(target), mode=0o755, exist_ok=True)
+            if stat.S_ISLNK(mode):
+                # the member data is the link target, links are created once all files are in place
+                symlinks.append((target, archive.read(info).decode("utf-8")))
+                progress.add(info.file_size, 1)
+            elif __is_installed(target, info, manifest.get(info.filename[len(prefix):])):
+                # unchanged since the previous installation
+                if stat.S_IMODE(mode) != 0:
+                    os.chmod(target, stat.S_IMODE(mode))
+                progress.add(info.file_size, 1)
+            else:
+                files.append((info, target, mode))
+        # remove what the previous version had but this one doesn't
+        if update:
+            names = set(info.filename[len(prefix):] for info in members)
+            for name in manifest:
+                target = __get_member_target(install_dir, name)
+                if name not in names and target is not None and os.path.lexists(target) and not os.path.isdir(target):
+                    os.remove(target)
+        # decompression releases the GIL, start with the largest files so they don't end up last on a single thread
+        files.sort(key=lambda entry: entry[0].file_size, reverse=True)
+        with ThreadPoolExecutor() as executor:
+            futures = [executor.submit(__extract_member, archive, info, target, mode, progress) for info, target, mode in files]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+            except:
+                for future in futures:
+                    future.cancel()
+                raise
+        for target, link in symlinks:
+            if os.path.lexists(target):
+                os.remove(target)
+            os.symlink(link, target)
+        # directory permissions last, so read only directories can be filled first
+        for target, mode in reversed(directories):
+            if stat.S_IMODE(mode) != 0:
+                os.chmod(target, stat.S_IMODE(mode))
+        __write_manifest(install_dir, prefix, members, manifest_name)
+        progress.finish()
+
+def record_manifest(installer, install_dir: str, prefix: str = "data/noarch/", manifest_name: str = MANIFEST_FILE_NAME):
+    """
+    Records the installation manifest of a game that was extracted by other means.
+
+    Parameters:
+    -----------
+        installer: str|list -> Installer path, or the installer files in order
+        install_dir: str -> Game installation directory
+        prefix: str -> Archive directory holding the game files
+        manifest_name: str -> File name of the manifest of the product, see get_manifest_name
+    """
+    with open_installer_data(__get_parts(installer)) as data, zipfile.ZipFile(data) as archive:
+        members = [info for info in archive.infolist() if info.filename.startswith(prefix) and len(info.filename) > len(prefix)]
+        __write_manifest(os.path.abspath(install_dir), prefix, members, manifest_name)
+
+def get_manifest_name(game: Game) -> str:
+    """
+    Gets the file name of the installation manifest of a product. DLCs share the directory of their game, so each
+    of them has a manifest of its own next to the manifest of the game.
+
+    Parameters:
+    -----------
+        game: Game -> Game or DLC
+
+    Return:
+    -------
+        str: Manifest file name
+    """
+    if game.type == "dlc":
+        return DLC_MANIFEST_FILE_NAME.format(game.id)
+    return MANIFEST_FILE_NAME
+
+def read_manifest(install_dir: str, manifest_name: str = MANIFEST_FILE_NAME) -> dict:
+    """
+    Reads an installation manifest, which describes the files of the last installation of a product in a directory.
+
+    Parameters:
+    -----------
+        install_dir: str -> Game installation directory
+        manifest_name: str -> File name of the manifest of the product, see get_manifest_name
+
+    Return:
+    -------
+        dict: Size, CRC-32 and modification time of each installed file by relative path, empty if unknown
+    """
+    path = os.path.join(install_dir, manifest_name)
+    if not os.path.isfile(path):
+        return {}
+    try:
+        with open(path, "r") as file:
+            return json.load(file)["files"]
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        print("Could not read {}. Cause: {}".format(path, e))
+        return {}
+
+def __write_manifest(install_dir: str, prefix: str, members: list, manifest_name: str):
+    files = {}
+    for info in members:
+        name = info.filename[len(prefix):]
+        target = os.path.join(install_dir, name)
+        if info.is_dir() or not os.path.lexists(target):
+            continue
+        # links are always created again, their entry only tells that they belong to the game
+        entry = {"size": info.file_size, "crc": info.CRC, "mtime": None}
+        if not os.path.islink(target):
+            entry["mtime"] = os.lstat(target).st_mtime_ns
+        files[name] = entry
+    path = os.path.join(install_dir, manifest_name)
+    try:
+        with open("{}.tmp".format(path), "w") as file:
+            json.dump({"files": files}, file)
+        os.replace("{}.tmp".format(path), path)
+    except OSError as e:
+        print("Could not write {}. Cause: {}".format(path, e))
+
+def __is_installed(target: str, info: zipfile.ZipInfo, entry: dict) -> bool:
+    # same contents as the member, and not touched since it was installed
+    if entry is None or entry["mtime"] is None or entry["size"] != info.file_size or entry["crc"] != info.CRC:
+        return False
+    try:
+        st = os.lstat(target)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size == entry["size"] and st.st_mtime_ns == entry["mtime"]
+
+def __check_disk_space(installer: str, install_dir: str, prefix: str, members: list, manifest: dict):
+    required = 0
+    for info in members:
+        target = os.path.join(install_dir, info.filename[len(prefix):])
+        if info.is_dir() or __is_installed(target, info, manifest.get(info.filename[len(prefix):])):
+            continue
+        required += info.file_size
+        # files being replaced give their space back
+        if os.path.isfile(target) and not os.path.islink(target):
+            required -= os.path.getsize(target)
+    # the installation directory may not exist yet
+    existing_dir = install_dir
+    while not os.path.exists(existing_dir):
+        existing_dir = os.path.dirname(existing_dir)
+    available = shutil.disk_usage(existing_dir).free
+    if required > available:
+        raise InsufficientDiskSpace("{} needs {} bytes in {} but only {} are available".format(
+            installer, required, install_dir, available), required, available)
+
+def __get_member_target(install_dir: str, name: str) -> str:
+    target = os.path.normpath(os.path.join(install_dir, name))
+    # never write outside of the installation directory
+    if os.path.commonpath([install_dir, target]) != install_dir:
+        return None
+    return target
+
+def __extract_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: str, mode: int, progress):
+    if os.path.lexists(target):
+        os.remove(target)
+    with archive.open(info) as source, open(target, "wb") as destination:
+        while True:
+            chunk = source.read(1024 * 1024)
+            if not chunk:
+                break
+            destination.write(chunk)
+            progress.add(len(chunk))
+    if stat.S_IMODE(mode) != 0:
+        os.chmod(target, stat.S_IMODE(mode))
+    progress.add(0, 1)
+
+class InstallProgress:
+    """
+    Progress of an installation, reported through progress functions like the progress of a Download.
+
+    Counting is thread safe, progress functions are invoked with the percentage whenever it changes.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self.total_files = 0
+        self.extracted = 0
+        self.extracted_files = 0
+        self.__progress = -1
+        self.__progress_funcs = []
+        self.__lock = threading.Lock()
+
+    def register_progress_function(self, func = None, func_args = None):
+        """
+        Registers a new progress function with associated arguments.
+
+        Parameters:
+        -----------
+            func: Function that is invoked when the installation progress is updated
+            func_args: Function arguments
+        """
+        if func is None:
+            return
+        self.__progress_funcs.append([func,func_args])
+
+    def get_progress(self) -> int:
+        """
+        Gets the current progress.
+
+        Return:
+        ------
+            int : Progress percentage or -1 if indeterminate
+        """
+        return self.__progress
+
+    def start(self, total: int, total_files: int):
+        """
+        Starts counting.
+
+        Parameters:
+        -----------
+            total: int -> Total number of bytes to extract
+            total_files: int -> Total number of files to extract
+        """
+        with self.__lock:
+            self.total = total
+            self.total_files = total_files
+            self.extracted = 0
+            self.extracted_files = 0
+        self.__set_progress(0)
+
+    def add(self, count: int, files: int = 0):
+        """
+        Counts extracted data.
+
+        Parameters:
+        -----------
+            count: int -> Number of bytes extracted
+            files: int -> Number of files completed
+        """
+        with self.__lock:
+            self.extracted += count
+            self.extracted_files += files
+            percentage = int(self.extracted / self.total * 100) if self.total > 0 else 0
+        self.__set_progress(percentage)
+
+    def finish(self):
+        """Marks the installation as complete"""
+        self.__set_progress(100)
+
+    def __set_progress(self, percentage: int):
+        with self.__lock:
+            if percentage == self.__progress:
+                return
+            self.__progress = percentage
+        for entry in self.__progress_funcs:
+            progress_func = entry[0]
+            progress_func_args = entry[1]
+            if progress_func_args is None:
+                progress_func(percentage)
+            else:
+                progress_func(percentage, progress_func_args)
 
 def uninstall_freedesktop_menuitem(game: Game):
     entry_name = re.sub('[^A-Za-z0-9_]+', '', game.name.replace(" ","_"))
@@ -101,15 +436,27 @@ def create_shortcuts(game: Game):
     install_freedesktop_menuitem(game)
     install_freedesktop_desktopitem(game)
 
-def install_game(game, installer, parent_window=None, main_window=None) -> None:
-    if not os.path.exists(installer):
+def install_game(game, installer, parent_window=None, main_window=None, progress=None, stream_extractor=None,
+                 update=False) -> None:
+    # installers from the installer store are passed as the list of their stored files
+    parts = __get_parts(installer)
+    installer = parts[0]
+    stored = InstallerStore.contains(installer)
+    if not all(os.path.exists(part) for part in parts):
         GLib.idle_add(__show_installation_error, game, _("{} failed to download.").format(installer), parent_window, main_window)
         raise FileNotFoundError("The installer {} does not exist".format(installer))
 
     if game.platform == "linux":
-        if not __verify_installer_integrity(installer):
+        if not __verify_installer_integrity(parts):
+            if stream_extractor is not None:
+                stream_extractor.cancel()
             GLib.idle_add(__show_installation_error, game, _("{} was corrupted. Please download it again.").format(installer), parent_window, main_window)
-            os.remove(installer)
+            if stored:
+                # the files may be shared with other stored installers, the store removes them when unused
+                InstallerStore.remove(parts)
+            else:
+                for part in parts:
+                    os.remove(part)
             raise FileNotFoundError("The installer {} was corrupted".format(installer))
         
         # Make sure the install directory exists
@@ -117,46 +464,53 @@ def install_game(game, installer, parent_window=None, main_window=None) -> None:
         if not os.path.exists(library_dir):
             os.makedirs(library_dir)
 
-        # Make a temporary empty directory for extracting the installer
-        extract_dir = os.path.join(CACHE_DIR, "extract")
-        temp_dir = os.path.join(extract_dir, str(game.id))
-        if os.path.exists(extract_dir):
-            shutil.rmtree(extract_dir, ignore_errors=True)
-        os.makedirs(temp_dir, mode=0o755)
+        # Most of the game may have been extracted while downloading already
+        if stream_extractor is not None:
+            try:
+                stream_extractor.finish()
+                record_manifest(parts, game.install_dir, manifest_name=get_manifest_name(game))
+            except Exception as e:
+                print("Extracting {} while downloading failed, extracting it again. Cause: {}".format(installer, e))
+                stream_extractor = None
 
-        # Extract the installer
-        subprocess.call(["unzip", "-qq", installer, "-d", temp_dir])
-        if len(os.listdir(temp_dir)) == 0:
+        # Extract the game files straight into the correct directory
+        try:
+            if stream_extractor is None:
+                extract_game_data(parts, game.install_dir, progress=progress,
+                                  manifest_name=get_manifest_name(game), update=update)
+        except CannotOpenZipContent:
             GLib.idle_add(__show_installation_error, game, _("{} could not be unzipped.").format(installer), parent_window, main_window)
-            raise CannotOpenZipContent("{} could not be unzipped.".format(installer))
-
-        # Make sure the install directory exists
-        library_dir = Config.get("install_dir")
-        if not os.path.exists(library_dir):
-            os.makedirs(library_dir, mode=0o755)
+            raise
+        except InsufficientDiskSpace as e:
+            GLib.idle_add(__show_installation_error, game, _("Not enough disk space, {} MB are needed but only {} MB are available.").format(
+                e.required // 1024**2, e.available // 1024**2), parent_window, main_window)
+            raise
 
-        # Copy the game files into the correct directory
-        tmp_noarch_dir=os.path.join(temp_dir, "data/noarch")
-        copytree(tmp_noarch_dir, game.install_dir)
-        
         if game.type == "game" and Config.get("create_shortcuts") == True:
             create_shortcuts(game)
 
-        # Remove the temporary directory
-        shutil.rmtree(temp_dir, ignore_errors=True)
-
     elif game.platform == "windows":
-        # Set the prefix for Windows games
+        # Set the prefix for Windows games, cloned from the base prefix so wine doesn't have to create it
         prefix_dir = os.path.join(game.install_dir, "prefix")
         if not os.path.exists(prefix_dir):
             os.makedirs(prefix_dir, mode=0o755)
+        prepare_prefix(prefix_dir)
 
-        os.environ["WINEPREFIX"] = prefix_dir
+        # setup programs find their parts by file name, stored files are named after their hash
+        link_dir = None
+        setup = installer
+        if stored:
+            link_dir = tempfile.mkdtemp(dir=InstallerStore.store_dir())
+            setup = InstallerStore.link(parts, link_dir)[0]
 
         # It's possible to set install dir as argument before installation
-        command = ["wine", installer, "/dir=" + game.install_dir]
-        process = subprocess.Popen(command)
-        process.wait()
+        command = ["wine", setup, "/dir=" + game.install_dir]
+        try:
+            process = subprocess.Popen(command, env=get_wine_env(prefix_dir))
+            process.wait()
+        finally:
+            if link_dir is not None:
+                shutil.rmtree(link_dir, ignore_errors=True)
         if process.returncode != 0:
             GLib.idle_add(__show_installation_error, game,
                       _("The installation of {} failed. Please try again.").format(installer), main_window)
@@ -172,30 +526,61 @@ def install_game(game, installer, parent_window=None, main_window=None) -> None:
     if os.path.exists(thumbnail_medium):
         shutil.copyfile(thumbnail_medium,os.path.join(game.install_dir, "thumbnail_196.jpg"))
 
-    if Config.get("keep_installers"):
+    if stored:
+        # installed from the installer store, where it stays
+        pass
+    elif Config.get("keep_installers") and game.download_info is not None:
+        try:
+            InstallerStore.add(game.id, game.download_info["os"], game.download_info["language"],
+                               game.download_info["version"], parts)
+        except Exception as ex:
+            print("Encountered error while storing {}. Got error: {}".format(installer, ex))
+    elif Config.get("keep_installers"):
         keep_dir = os.path.join(Config.get("install_dir"), "installer")
-        download_dir = os.path.join(CACHE_DIR, "download")
-        update_dir = os.path.join(CACHE_DIR, "update")
         if not os.path.exists(keep_dir):
             os.makedirs(keep_dir, mode=0o755)
         try:
             # It's needed for multiple files
-            for file in os.listdir(download_dir):
-                shutil.move(download_dir + '/' + file, keep_dir + '/' + file)
-        except Exception as ex:
-            print("Encountered error while copying {} to {}. Got error: {}".format(installer, keep_dir, ex))
-        try:
-            # It's needed for multiple files
-            for file in os.listdir(update_dir):
-                shutil.move(update_dir + '/' + file, keep_dir + '/' + file)
+            for part in parts:
+                if os.path.dirname(os.path.abspath(part)) != os.path.abspath(keep_dir):
+                    move_file(part, os.path.join(keep_dir, os.path.basename(part)))
         except Exception as ex:
             print("Encountered error while copying {} to {}. Got error: {}".format(installer, keep_dir, ex))
     else:
-        os.remove(installer)
+        for part in parts:
+            os.remove(part)
+    # work out how to start the game now, instead of on its first launch
+    try:
+        update_launch_plan(game)
+    except (OSError, KeyError, IndexError, ValueError) as e:
+        # like a goggame info file without play tasks, it's tried again when the game is started
+        print("Could not determine how to start {}. Cause: {}".format(game.name, e))
     # finish up
     game.istalled = 1
     game.updates = 0
 
+def get_installer_parts(installer: str) -> list:
+    """
+    Gets the files of an installer, the installer itself followed by its additional parts.
+
+    Parameters:
+    -----------
+        installer: str -> Installer path
+
+    Return:
+    -------
+        list: Installer file paths, in order
+    """
+    parts = [installer]
+    while os.path.exists("{}-{}.bin".format(installer, len(parts))):
+        parts.append("{}-{}.bin".format(installer, len(parts)))
+    return parts
+
+def __get_parts(installer) -> list:
+    if isinstance(installer, list):
+        return installer
+    return get_installer_parts(installer)
+
 def __show_installation_error(game, message, parent_window=None, main_window = None):
     error_message = [_("Failed to install {}").format(game.name), message]
     print("{}: {}".format(error_message[0], error_message[1]))
@@ -212,36 +597,21 @@ def __show_installation_error(game, message, parent_window=None, main_window = N
     dialog.destroy()
 
 
-def __move_and_overwrite(source_dir, target_dir):
-    for src_dir, dirs, files in os.walk(source_dir):
-        destination_dir = src_dir.replace(source_dir, target_dir, 1)
-        if not os.path.exists(destination_dir):
-            os.makedirs(destination_dir)
-        for src_file in files:
-            file_to_copy = os.path.join(src_dir, src_file)
-            dst_file = os.path.join(destination_dir, src_file)
-            if os.path.exists(dst_file):
-                os.remove(dst_file)
-            shutil.move(file_to_copy, destination_dir)
-
-
 class CannotOpenZipContent(Exception):
     pass
 
 
-def __verify_installer_integrity(installer):
-    try:
-        print("Executing integrity check for {}".format(installer))
-        os.chmod(installer, 0o744)
-        result = subprocess.run([installer, "--check"])
-        if result.returncode == 0:
-            return True
-        else:
-            return False
-    except Exception as ex:
-        # Any exception means the archive doesn't work, so we don't care with the error is
-        print("Error, exception encountered: {}".format(ex))
-        return False
+class InsufficientDiskSpace(Exception):
+    def __init__(self, message: str, required: int = 0, available: int = 0):
+        super().__init__(message)
+        self.required = required
+        self.available = available
+
+
+def __verify_installer_integrity(parts: list):
+    print("Executing integrity check for {}".format(parts[0]))
+    # checked natively across all the parts, the installer is never executed
+    return verify_installer(parts)
 
 
 def remove_shortcuts(game: Game):
@@ -253,6 +623,75 @@ def remove_shortcuts(game: Game):
 def uninstall_game(game):
     if Config.get("create_shortcuts") == True:
             remove_shortcuts(game)
-    shutil.rmtree(game.install_dir, ignore_errors=True)
+    trash_directory(game.install_dir)
     game.install_dir = None
     game.installed_version = None
+
+def trash_directory(path: str):
+    """
+    Removes a directory right away by moving it to the trash, the trash is emptied in the background.
+
+    The trash is a hidden directory next to the removed directory, so moving it there is a rename on the same file
+    system. Directories that can't be moved are removed in place.
+
+    Parameters:
+    -----------
+        path: str -> Directory to remove
+    """
+    if path is None or not os.path.isdir(path):
+        return
+    path = os.path.abspath(path)
+    trash_dir = os.path.join(os.path.dirname(path), TRASH_DIR_NAME)
+    try:
+        os.makedirs(trash_dir, mode=0o700, exist_ok=True)
+        os.rename(path, os.path.join(trash_dir, "{}-{}".format(os.path.basename(path), time.time_ns())))
+    except OSError as e:
+        print("Could not move {} to the trash, removing it in place. Cause: {}".format(path, e))
+        shutil.rmtree(path, ignore_errors=True)
+        return
+    empty_trash(trash_dir)
+
+def empty_trash(trash_dir: str = None):
+    """
+    Empties a trash directory in the background, with idle IO priority.
+
+    Parameters:
+    -----------
+        trash_dir: str -> Trash directory, the trash of the installation directory if not set
+    """
+    global __trash_thread
+    if trash_dir is None:
+        trash_dir = os.path.join(Config.get("install_dir"), TRASH_DIR_NAME)
+    with __trash_lock:
+        __trash_dirs.add(trash_dir)
+        # a running worker picks the directory up, it only stops once it found nothing left while holding the lock
+        if __trash_thread is not None:
+            return
+        __trash_thread = threading.Thread(target=__empty_trash)
+        __trash_thread.daemon = True
+        __trash_thread.start()
+
+def __empty_trash():
+    global __trash_thread
+    while True:
+        with __trash_lock:
+            if len(__trash_dirs) == 0:
+                __trash_thread = None
+                return
+            trash_dir = __trash_dirs.pop()
+        if not os.path.isdir(trash_dir):
+            continue
+        for name in os.listdir(trash_dir):
+            path = os.path.join(trash_dir, name)
+            try:
+                # don't get in the way of running games and installations
+                subprocess.run(["ionice", "-c3", "nice", "-n19", "rm", "-rf", "--", path], stdout=subprocess.DEVNULL,
+                               stderr=subprocess.DEVNULL)
+            except OSError:
+                pass
+            if os.path.lexists(path):
+                shutil.rmtree(path, ignore_errors=True)
+        try:
+            os.rmdir(trash_dir)
+        except OSError:
+            pass
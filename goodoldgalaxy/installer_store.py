@@ -0,0 +1,295 @@
+import os
+import json
+import time
+import shutil
+import hashlib
+import threading
+from goodoldgalaxy.config import Config
+from goodoldgalaxy.fileops import move_file
+
+HASH_CHUNK_SIZE = 8 * 1024 * 1024  # 8 MB
+
+
+class __InstallerStore:
+    """
+    Store for kept installers.
+
+    Installer files are stored once, named after their SHA256 hash, in the objects directory of the store. An index
+    maps each installer (product, operating system, language and version) to its ordered list of files, so identical
+    files shared by several installers are only kept once. The oldest installers are removed when a product has too
+    many versions stored or when the store grows beyond its maximum size.
+
+    The store lives in the installer directory of the current installation directory.
+    """
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+
+    def store_dir(self) -> str:
+        """
+        Gets the store directory.
+
+        Return:
+        -------
+            str: Store directory
+        """
+        return os.path.join(Config.get("install_dir"), "installer")
+
+    def __objects_dir(self) -> str:
+        return os.path.join(self.store_dir(), "objects")
+
+    def __index_path(self) -> str:
+        return os.path.join(self.store_dir(), "index.json")
+
+    def __object_path(self, digest: str) -> str:
+        return os.path.join(self.__objects_dir(), digest[:2], digest[2:])
+
+    def __load_index(self) -> list:
+        path = self.__index_path()
+        if not os.path.isfile(path):
+            return []
+        try:
+            with open(path, "r") as file:
+                return json.load(file)["installers"]
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print("Could not read the installer index {}. Cause: {}".format(path, e))
+            return []
+
+    def __save_index(self, installers: list):
+        path = self.__index_path()
+        os.makedirs(os.path.dirname(path), mode=0o755, exist_ok=True)
+        tmp_path = "{}.tmp".format(path)
+        with open(tmp_path, "w") as file:
+            json.dump({"installers": installers}, file)
+        os.replace(tmp_path, path)
+
+    def contains(self, path: str) -> bool:
+        """
+        Checks if a file belongs to the store.
+
+        Parameters:
+        -----------
+            path: str -> File path
+
+        Return:
+        -------
+            bool: True if the file is one of the stored files, False otherwise
+        """
+        objects_dir = os.path.abspath(self.__objects_dir())
+        return os.path.commonpath([objects_dir, os.path.abspath(path)]) == objects_dir
+
+    def add(self, product: int, operating_system: str, language: str, version: str, paths: list) -> list:
+        """
+        Moves the files of an installer into the store.
+
+        Files that are already stored are removed instead. An installer stored before with the same product,
+        operating system, language and version is replaced.
+
+        Parameters:
+        -----------
+            product: int -> Product (game or DLC) id
+            operating_system: str -> Operating system of the installer
+            language: str -> Language of the installer
+            version: str -> Installer version
+            paths: list -> Installer files, in order
+
+        Return:
+        -------
+            list: Paths of the stored files, in order
+        """
+        # hashed before taking the lock, the files aren't in the store yet
+        digests = [self.__hash(path) for path in paths]
+        size = sum(os.path.getsize(path) for path in paths)
+        # moved and indexed at once, so pruning never sees stored files that aren't indexed yet
+        with self.__lock:
+            for path, digest in zip(paths, digests):
+                target = self.__object_path(digest)
+                if os.path.exists(target):
+                    # already stored for another installer
+                    os.remove(path)
+                else:
+                    os.makedirs(os.path.dirname(target), mode=0o755, exist_ok=True)
+                    move_file(path, target)
+            installers = [entry for entry in self.__load_index()
+                          if not self.__matches(entry, product, operating_system, language, version)]
+            installers.append({
+                "product": product,
+                "os": operating_system,
+                "language": language,
+                "version": version,
+                "parts": digests,
+                "names": [os.path.basename(path) for path in paths],
+                "size": size,
+                "added": time.time()
+            })
+            self.__save_index(installers)
+            self.prune()
+        return [self.__object_path(digest) for digest in digests]
+
+    def find(self, product: int, operating_system: str, language: str, version: str = None) -> list:
+        """
+        Finds a stored installer.
+
+        Parameters:
+        -----------
+            product: int -> Product (game or DLC) id
+            operating_system: str -> Operating system of the installer
+            language: str -> Language of the installer
+            version: str -> Installer version, None for the most recently stored one
+
+        Return:
+        -------
+            list: Paths of the stored files, in order, or None if the installer isn't stored
+        """
+        entry = self.__find_entry(product, operating_system, language, version)
+        if entry is None:
+            return None
+        return [self.__object_path(digest) for digest in entry["parts"]]
+
+    def find_info(self, product: int, operating_system: str, language: str) -> dict:
+        """
+        Finds the most recently stored installer of a product, without knowing its version.
+
+        Parameters:
+        -----------
+            product: int -> Product (game or DLC) id
+            operating_system: str -> Operating system of the installer
+            language: str -> Language of the installer
+
+        Return:
+        -------
+            dict: Operating system, language and version of the installer, or None if no installer is stored
+        """
+        entry = self.__find_entry(product, operating_system, language, None)
+        if entry is None:
+            return None
+        return {"os": entry["os"], "language": entry["language"], "version": entry["version"]}
+
+    def __find_entry(self, product: int, operating_system: str, language: str, version: str) -> dict:
+        with self.__lock:
+            installers = [entry for entry in self.__load_index()
+                          if self.__matches(entry, product, operating_system, language, version)]
+        if len(installers) == 0:
+            return None
+        entry = max(installers, key=lambda entry: entry["added"])
+        if not all(os.path.isfile(self.__object_path(digest)) for digest in entry["parts"]):
+            return None
+        return entry
+
+    def link(self, paths: list, directory: str) -> list:
+        """
+        Makes the files of a stored installer available under their original names, which installers looking for
+        their parts by name need. The files are hard linked, or copied to directories on other file systems.
+
+        Parameters:
+        -----------
+            paths: list -> Paths of the stored files, in order, as returned by find
+            directory: str -> Directory to create the files in
+
+        Return:
+        -------
+            list: Paths of the created files, in order
+        """
+        digests = self.__get_digests(paths)
+        names = None
+        with self.__lock:
+            for entry in self.__load_index():
+                if entry["parts"] == digests:
+                    names = entry.get("names")
+                    break
+        if names is None or len(names) != len(paths):
+            # stored before the names were recorded, use the names of downloaded installers
+            names = ["installer"] + ["installer-{}.bin".format(index) for index in range(1, len(paths))]
+        os.makedirs(directory, mode=0o755, exist_ok=True)
+        links = []
+        for path, name in zip(paths, names):
+            target = os.path.join(directory, name)
+            if os.path.lexists(target):
+                os.remove(target)
+            try:
+                os.link(path, target)
+            except OSError:
+                shutil.copy2(path, target)
+            links.append(target)
+        return links
+
+    def remove(self, paths: list):
+        """
+        Removes the stored installers made of the given files, for example when they turned out to be corrupted.
+        Their files are removed once no other stored installer uses them.
+
+        Parameters:
+        -----------
+            paths: list -> Paths of the stored files, in order, as returned by find
+        """
+        digests = self.__get_digests(paths)
+        with self.__lock:
+            installers = self.__load_index()
+            kept = [entry for entry in installers if entry["parts"] != digests]
+            if len(kept) != len(installers):
+                self.__save_index(kept)
+            self.__collect_garbage(kept)
+
+    def __get_digests(self, paths: list) -> list:
+        return [os.path.basename(os.path.dirname(path)) + os.path.basename(path) for path in paths]
+
+    def prune(self):
+        """
+        Applies the retention policies and removes files no longer used by any stored installer.
+
+        The configured maximum number of versions per product (installer_store_max_versions) and the maximum store
+        size in bytes (installer_store_max_size) are enforced by removing the oldest installers first. A value of 0
+        disables the policy.
+        """
+        with self.__lock:
+            installers = sorted(self.__load_index(), key=lambda entry: entry["added"], reverse=True)
+            max_versions = Config.get("installer_store_max_versions") or 0
+            max_size = Config.get("installer_store_max_size") or 0
+            kept = []
+            versions = {}
+            size = 0
+            for entry in installers:
+                key = (entry["product"], entry["os"], entry["language"])
+                versions[key] = versions.get(key, 0) + 1
+                if max_versions > 0 and versions[key] > max_versions:
+                    continue
+                # the most recent installer is always kept
+                if max_size > 0 and len(kept) > 0 and size + entry["size"] > max_size:
+                    continue
+                size += entry["size"]
+                kept.append(entry)
+            if len(kept) != len(installers):
+                self.__save_index(kept)
+            self.__collect_garbage(kept)
+
+    def __collect_garbage(self, installers: list):
+        used = set(digest for entry in installers for digest in entry["parts"])
+        objects_dir = self.__objects_dir()
+        if not os.path.isdir(objects_dir):
+            return
+        for prefix in os.listdir(objects_dir):
+            prefix_dir = os.path.join(objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                if prefix + name not in used:
+                    os.remove(os.path.join(prefix_dir, name))
+            if len(os.listdir(prefix_dir)) == 0:
+                os.rmdir(prefix_dir)
+
+    def __matches(self, entry: dict, product: int, operating_system: str, language: str, version: str) -> bool:
+        return entry["product"] == product and entry["os"] == operating_system and entry["language"] == language \
+            and (version is None or entry["version"] == version)
+
+    def __hash(self, path: str) -> str:
+        digest = hashlib.sha256()
+        buffer = bytearray(HASH_CHUNK_SIZE)
+        view = memoryview(buffer)
+        with open(path, "rb") as file:
+            while True:
+                read = file.readinto(buffer)
+                if not read:
+                    break
+                digest.update(view[:read])
+        return digest.hexdigest()
+
+
+InstallerStore = __InstallerStore()
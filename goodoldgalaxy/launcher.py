@@ -3,38 +3,329 @@ import subprocess
 import shutil
 import re
 import json
+import time
+import hashlib
+import threading
 import gi
 import glob
 gi.require_version('Gtk', '3.0')
-from gi.repository import Gtk
+from gi.repository import Gtk, GLib
 from goodoldgalaxy.translation import _
 from goodoldgalaxy.config import Config
+from goodoldgalaxy.paths import LAUNCH_PLAN_DIR
+from goodoldgalaxy.constants import GAME_START_TIMEOUT, GAME_POLL_INTERVAL, GAME_OUTPUT_TAIL_SIZE
+from goodoldgalaxy.wineprefix import prepare_prefix, get_wine_env
+from goodoldgalaxy.process import ProcessTracker, set_child_subreaper, get_exit_code, add_owned_process, \
+    remove_owned_process
+from goodoldgalaxy.playtime import PlayTime
+from goodoldgalaxy.sampler import start_sampler
+from goodoldgalaxy.gamelog import GameLog, get_log_path
+from goodoldgalaxy.warmup import WarmupRecorder, warm_up
 
 
 def config_game(game):
-    prefix = os.path.join(game.install_dir, "prefix")
+    # preparing the prefix may have to create the base prefix first, keep that off the GTK main loop
+    config_thread = threading.Thread(target=__run_winecfg, args=(os.path.join(game.install_dir, "prefix"),))
+    config_thread.daemon = True
+    config_thread.start()
 
-    os.environ["WINEPREFIX"] = prefix
-    subprocess.Popen(['wine', 'winecfg'])
 
+def __run_winecfg(prefix: str):
+    prepare_prefix(prefix)
 
-def start_game(game, parent_window=None):
-    error_message = ""
-    process = None
-    if not error_message:
-        error_message = set_fps_display()
-    if not error_message:
-        error_message, process = run_game_subprocess(game)
-    if not error_message:
-        error_message = check_if_game_started_correctly(process, game)
+    subprocess.Popen(['wine', 'winecfg'], env=get_wine_env(prefix))
+
+
+class RunningGame:
+    """
+    Game started by start_game, followed until it and everything it started exit.
+
+    The start process is watched with a GLib child watch, so nothing ever waits for it. Its output is read as it
+    arrives, so the game can't block on a full pipe. The output of the game and everything it started goes to the
+    rotating log of the game (see get_log_path), and its end is kept in memory for error messages.
+
+    Once the game started, its play session is recorded. As this process is the subreaper of the game, the processes
+    of the game session that are its children always include an ancestor of every running game process, so watching
+    them is enough to notice the end of the game without polling.
+
+    When warming up game files is enabled, the files the game opens while starting are recorded for the next launch.
+    When resource sampling is enabled, the CPU, memory and storage use of the game processes is sampled until the game
+    exits.
+
+    Parameters:
+    -----------
+        game: Game -> Started game
+        process: subprocess.Popen -> Start process
+        error_func: Function invoked with the game and the error message if the game failed to start
+        exit_func: Function invoked with the game once it exited
+    """
+
+    def __init__(self, game, process, error_func=None, exit_func=None):
+        self.game = game
+        self.process = process
+        self.tracker = ProcessTracker(process.pid)
+        self.started = time.monotonic()
+        self.stdout = b""
+        self.stderr = b""
+        self.__error_func = error_func
+        self.__exit_func = exit_func
+        self.__watched = set([process.pid])
+        self.__session_start = time.time()
+        self.log = GameLog(get_log_path(game))
+        self.log.open()
+        self.__open_streams = 0
+        self.sampler = None
+        if Config.get("resource_sampling"):
+            self.sampler = start_sampler(PlayTime.get_key(game), self.tracker, Config.get("resource_sampling_interval"))
+        self.recorder = None
+        if Config.get("warmup_game_files"):
+            self.recorder = WarmupRecorder(game, self.tracker)
+            self.recorder.start()
+        for stream in (process.stdout, process.stderr):
+            if stream is not None:
+                self.__open_streams += 1
+                os.set_blocking(stream.fileno(), False)
+                GLib.io_add_watch(stream.fileno(), GLib.PRIORITY_DEFAULT, GLib.IOCondition.IN | GLib.IOCondition.HUP,
+                                  self.__on_output, stream)
+        add_owned_process(process.pid)
+        GLib.child_watch_add(GLib.PRIORITY_DEFAULT, process.pid, self.__on_start_process_exited)
+
+    def __on_output(self, fd, condition, stream) -> bool:
+        data = self.__read(stream)
+        if data is None:
+            # wait for more
+            return True
+        if len(data) == 0:
+            stream.close()
+            self.__open_streams -= 1
+            if self.__open_streams == 0:
+                # nothing that could still write output is running
+                self.log.close()
+            return False
+        self.__append(stream, data)
+        return True
+
+    def __append(self, stream, data: bytes):
+        self.log.write(data)
+        if stream is self.process.stderr:
+            self.stderr = (self.stderr + data)[-GAME_OUTPUT_TAIL_SIZE:]
+        else:
+            self.stdout = (self.stdout + data)[-GAME_OUTPUT_TAIL_SIZE:]
+
+    def __read(self, stream) -> bytes:
+        if stream.closed:
+            return b""
+        try:
+            return stream.read()
+        except (BlockingIOError, OSError):
+            return None
+
+    def read_output(self) -> tuple:
+        """
+        Gets the output of the start process received so far, including what wasn't handled by the watches yet.
+
+        Return:
+        -------
+            tuple: End of the standard output and of the standard error, as bytes
+        """
+        for stream in (self.process.stdout, self.process.stderr):
+            if stream is not None:
+                data = self.__read(stream)
+                if data:
+                    self.__append(stream, data)
+        return self.stdout, self.stderr
+
+    def __on_start_process_exited(self, pid, status):
+        # the child watch reaped the process, let Popen know
+        remove_owned_process(pid)
+        self.process.returncode = get_exit_code(status)
+        error_message = check_if_game_started_correctly(self, time.monotonic() - self.started)
+        if error_message:
+            print(_("Failed to start {}:").format(self.game.name))
+            print(error_message)
+            self.__stop_monitors()
+            if self.__error_func is not None:
+                self.__error_func(self.game, error_message)
+            return
+        self.__watched.discard(pid)
+        # the start script may have left the game running
+        self.__watch_session()
+
+    def __watch_session(self):
+        if not set_child_subreaper():
+            # descendants can't be watched, check on them now and then
+            GLib.timeout_add_seconds(GAME_POLL_INTERVAL, self.__check_running)
+            return
+        for pid in self.tracker.get_session_children():
+            if pid not in self.__watched:
+                self.__watched.add(pid)
+                add_owned_process(pid)
+                GLib.child_watch_add(GLib.PRIORITY_DEFAULT, pid, self.__on_session_process_exited)
+        if len(self.__watched) == 0:
+            self.__exited()
+
+    def __on_session_process_exited(self, pid, status):
+        self.__watched.discard(pid)
+        remove_owned_process(pid)
+        # the children of the exited process are now children of this process
+        self.__watch_session()
+
+    def __check_running(self) -> bool:
+        if self.tracker.is_running():
+            return True
+        self.__exited()
+        return False
+
+    def __stop_monitors(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+        if self.recorder is not None:
+            self.recorder.stop()
+
+    def __exited(self):
+        self.__stop_monitors()
+        PlayTime.add_session(self.game, self.__session_start, time.time())
+        if self.__exit_func is not None:
+            self.__exit_func(self.game)
+
+
+def start_game(game, parent_window=None, error_func=None, exit_func=None):
+    """
+    Starts a game without waiting for it.
+
+    Has to be called from the GTK main loop. Failures to start the game, right away or when the start process exits
+    within GAME_START_TIMEOUT seconds without leaving anything running, are reported to the error function, which
+    defaults to an error dialog.
+
+    When warming up game files is enabled, the files the game read on its previous launch are read ahead while it
+    starts.
+
+    Parameters:
+    -----------
+        game: Game -> Game to start
+        parent_window: Gtk.Widget -> Widget whose window the error dialog belongs to
+        error_func: Function invoked with the game and the error message if the game failed to start
+        exit_func: Function invoked with the game once it and everything it started exited
+
+    Return:
+    -------
+        RunningGame: Started game, None if it couldn't be started
+    """
+    if error_func is None:
+        error_func = lambda failed_game, message: __show_start_error(failed_game, message, parent_window)
+    if Config.get("warmup_game_files"):
+        warm_up(game)
+    error_message, process = run_game_subprocess(game)
     if error_message:
         print(_("Failed to start {}:").format(game.name))
         print(error_message)
-    return error_message
+        GLib.idle_add(error_func, game, error_message)
+        return None
+    return RunningGame(game, process, error_func, exit_func)
+
+
+def __show_start_error(game, message, parent_window=None):
+    dialog = Gtk.MessageDialog(
+        message_type=Gtk.MessageType.ERROR,
+        parent=parent_window.get_toplevel() if parent_window is not None else None,
+        modal=True,
+        buttons=Gtk.ButtonsType.CLOSE,
+        text=_("Failed to start {}").format(game.name)
+    )
+    log_path = get_log_path(game)
+    if os.path.exists(log_path):
+        message = "{}\n\n{}".format(message, _("The output of the game is logged in {}").format(log_path))
+    dialog.format_secondary_text(message)
+    dialog.run()
+    dialog.destroy()
 
 def get_execute_command(game) -> list:
+    return get_launch_plan(game)["command"]
+
+
+def get_launch_plan(game) -> dict:
+    """
+    Gets how to start a game, from the launch plan cache when the installation didn't change since it was cached.
+
+    Parameters:
+    -----------
+        game: Game -> Installed game
+
+    Return:
+    -------
+        dict: Launch plan, with the command, working directory and environment variables to start the game with
+    """
+    path = __get_launch_plan_path(game.install_dir)
+    try:
+        with open(path, "r") as file:
+            plan = json.load(file)
+        if plan["install_dir"] == game.install_dir and plan["mtimes"] == __get_mtimes(list(plan["mtimes"])):
+            return plan
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return update_launch_plan(game)
+
+
+def update_launch_plan(game) -> dict:
+    """
+    Determines how to start a game and caches it, to be done when the game is installed or updated.
+
+    The launch plan is invalidated when the modification time of the installation directory, or of a file the plan
+    was determined from, changes.
+
+    Parameters:
+    -----------
+        game: Game -> Installed game
+
+    Return:
+    -------
+        dict: Launch plan, with the command, working directory and environment variables to start the game with
+    """
     files = os.listdir(game.install_dir)
     launcher_type = determine_launcher_type(files)
+    game_dir = os.path.join(game.install_dir, "game")
+    # the directories and the info files the command is determined from
+    sources = [game.install_dir] + __get_info_files(game.install_dir, files)
+    if os.path.isdir(game_dir):
+        sources += [game_dir] + __get_info_files(game_dir, os.listdir(game_dir))
+    plan = {
+        "install_dir": game.install_dir,
+        "mtimes": __get_mtimes(sources),
+        "command": __get_launcher_command(game, launcher_type, files),
+        "cwd": game_dir if launcher_type == "final_resort" else game.install_dir,
+        "env": {"WINEPREFIX": os.path.join(game.install_dir, "prefix")} if launcher_type == "windows" else {}
+    }
+    path = __get_launch_plan_path(game.install_dir)
+    try:
+        os.makedirs(LAUNCH_PLAN_DIR, mode=0o755, exist_ok=True)
+        tmp_path = "{}.tmp".format(path)
+        with open(tmp_path, "w") as file:
+            json.dump(plan, file)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print("Could not cache the launch plan of {}. Cause: {}".format(game.name, e))
+    return plan
+
+
+def __get_launch_plan_path(install_dir: str) -> str:
+    return os.path.join(LAUNCH_PLAN_DIR, "{}.json".format(hashlib.sha1(install_dir.encode("utf-8")).hexdigest()))
+
+
+def __get_info_files(directory: str, files: list) -> list:
+    return [os.path.join(directory, file) for file in files if re.match(r'^goggame-[0-9]*\.info$', file)]
+
+
+def __get_mtimes(paths: list) -> dict:
+    mtimes = {}
+    for path in paths:
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtimes[path] = None
+    return mtimes
+
+
+def __get_launcher_command(game, launcher_type: str, files: list) -> list:
     if launcher_type in ["windows"]:
         exe_cmd = get_windows_exe_cmd(game, files)
     elif launcher_type in ["dosbox"]:
@@ -68,15 +359,13 @@ def determine_launcher_type(files):
 
 
 def get_windows_exe_cmd(game, files):
+    # relative to the installation directory, the command runs there with the game's WINEPREFIX
     exe_cmd = [""]
-    prefix = os.path.join(game.install_dir, "prefix")
-    os.environ["WINEPREFIX"] = prefix
 
     # Find game executable file
     for file in files:
         if re.match(r'^goggame-[0-9]*\.info$', file):
-            os.chdir(game.install_dir)
-            with open(file, 'r') as info_file:
+            with open(os.path.join(game.install_dir, file), 'r') as info_file:
                 info = json.loads(info_file.read())
                 # if we have the workingDir property, start the executable at that directory
                 if "workingDir" in info["playTasks"][0]:
@@ -119,63 +408,62 @@ def get_start_script_exe_cmd(game, files):
 
 
 def get_final_resort_exe_cmd(game, files):
-    # This is the final resort, applies to FTL
+    # This is the final resort, applies to FTL, the command runs in the game directory
     exe_cmd = [""]
-    game_files = os.listdir("game")
+    game_dir = os.path.join(game.install_dir, "game")
+    game_files = os.listdir(game_dir)
     for file in game_files:
         if re.match(r'^goggame-[0-9]*\.info$', file):
-            os.chdir(os.path.join(game.install_dir, "game"))
-            with open(file, 'r') as info_file:
+            with open(os.path.join(game_dir, file), 'r') as info_file:
                 info = json.loads(info_file.read())
                 exe_cmd = ["./{}".format(info["playTasks"][0]["path"])]
     return exe_cmd
 
 
-def set_fps_display():
-    error_message = ""
+def get_fps_display_env() -> dict:
     # Enable FPS Counter for Nvidia or AMD (Mesa) users
     if Config.get("show_fps"):
-        os.environ["__GL_SHOW_GRAPHICS_OSD"] = "1"  # For Nvidia users + OpenGL/Vulkan games
-        os.environ["GALLIUM_HUD"] = "simple,fps"  # For AMDGPU users + OpenGL games
-        os.environ["VK_INSTANCE_LAYERS"] = "VK_LAYER_MESA_overlay"  # For AMDGPU users + Vulkan games
-    else:
-        os.environ["__GL_SHOW_GRAPHICS_OSD"] = "0"
-        os.environ["GALLIUM_HUD"] = ""
-        os.environ["VK_INSTANCE_LAYERS"] = ""
-    return error_message
+        return {
+            "__GL_SHOW_GRAPHICS_OSD": "1",  # For Nvidia users + OpenGL/Vulkan games
+            "GALLIUM_HUD": "simple,fps",  # For AMDGPU users + OpenGL games
+            "VK_INSTANCE_LAYERS": "VK_LAYER_MESA_overlay"  # For AMDGPU users + Vulkan games
+        }
+    return {
+        "__GL_SHOW_GRAPHICS_OSD": "0",
+        "GALLIUM_HUD": "",
+        "VK_INSTANCE_LAYERS": ""
+    }
 
 
 def run_game_subprocess(game):
-    # Change the directory to the install dir
-    working_dir = os.getcwd()
-    os.chdir(game.install_dir)
+    # keep the game a descendant of this process, in a session of its own, even if its start script exits
+    set_child_subreaper()
     try:
-        process = subprocess.Popen(get_execute_command(game), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        plan = get_launch_plan(game)
+        env = os.environ.copy()
+        env.update(plan["env"])
+        env.update(get_fps_display_env())
+        process = subprocess.Popen(plan["command"], cwd=plan["cwd"], env=env, stdout=subprocess.PIPE,
+                                   stderr=subprocess.PIPE, start_new_session=True)
         error_message = ""
     except FileNotFoundError:
         process = None
         error_message = _("No executable was found in {}").format(game.install_dir)
-
-    # restore the working directory
-    os.chdir(working_dir)
     return error_message, process
 
 
-def check_if_game_started_correctly(process, game):
+def check_if_game_started_correctly(running_game, elapsed: float):
     error_message = ""
-    # Check if the application has started and see if it is still runnning after a short timeout
-    try:
-        process.wait(timeout=float(3))
+    # The application has started if its start process ran for a while, or left something running
+    if elapsed < GAME_START_TIMEOUT:
         error_message = "Game start process has finished prematurely"
-    except subprocess.TimeoutExpired:
-        pass
 
     if error_message in ["Game start process has finished prematurely"]:
-        error_message = check_if_game_start_process_spawned_final_process(error_message, game)
+        error_message = check_if_game_start_process_spawned_final_process(error_message, running_game.process)
 
     # Set the error message to what's been received in std error if not yet set
     if error_message:
-        stdout, stderror = process.communicate()
+        stdout, stderror = running_game.read_output()
         if stderror:
             error_message = stderror.decode("utf-8")
         elif stdout:
@@ -183,16 +471,8 @@ def check_if_game_started_correctly(process, game):
     return error_message
 
 
-def check_if_game_start_process_spawned_final_process(error_message, game):
-    ps_ef = subprocess.check_output(["ps", "-ef"]).decode("utf-8")
-    ps_list = ps_ef.split("\n")
-    for ps in ps_list:
-        ps_split = ps.split()
-        if len(ps_split) < 2:
-            continue
-        if not ps_split[1].isdigit():
-            continue
-        if int(ps_split[1]) > os.getpid() and game.name in ps:
-            error_message = ""
-            break
+def check_if_game_start_process_spawned_final_process(error_message, process):
+    # the start process exited, the game is running if anything it started still is
+    if ProcessTracker(process.pid).is_running():
+        error_message = ""
     return error_message
@@ -7,22 +7,84 @@ import os
 import re
 import json
 import time
+import threading
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 from goodoldgalaxy.api import Api
 from goodoldgalaxy.config import Config
+from goodoldgalaxy.constants import INFO_LOOKUP_WORKERS
 from goodoldgalaxy.game import Game
+from goodoldgalaxy.paths import LIBRARY_SNAPSHOT_PATH
+from goodoldgalaxy.playtime import PlayTime
+
+# View of the library contents, replaced as a whole whenever games are added or removed
+LibrarySnapshot = namedtuple('LibrarySnapshot', ['games', 'genres', 'tags'])
+
+# Game attributes persisted in the library snapshot file
+SNAPSHOT_GAME_FIELDS = ["image_url", "icon_url", "sidebar_icon_url", "logo_url", "background_url", "platform",
+                        "supported_platforms", "type", "genre", "genres", "tags", "release_date", "language",
+                        "supported_languages", "installed", "installed_version", "install_dir", "updates",
+                        "is_gog_game"]
+
 
 class Library():
+    """
+    The games library, composed of installed games and games owned on GOG.
+
+    Readers always get a snapshot of the library so they never block nor see a partially built library. Writers build
+    a new list and publish it as a new snapshot while holding the write lock (copy-on-write).
+
+    Only the contents of a snapshot are fixed, not the games in it: games are shared with the views and downloads that
+    keep their tiles and state on them, so they are changed in place while holding the write lock. Readers may see a
+    game whose installation is partly updated, that is its installed, installed_version, install_dir, platform,
+    language, updates and state attributes.
+    """
 
     def __init__(self, api: Api):
         self.api = api
-        self.games = []
-        self.genres = []
-        self.tags = []
+        self.__snapshot = LibrarySnapshot((), (), ())
+        self.__write_lock = threading.Lock()
+        self.__sync_lock = threading.Lock()
+        self.__pending_paths = set()
         self.offline = False
         self.last_api_check = 0
-        self.fetching = 0
-        
+
+    @property
+    def games(self) -> tuple:
+        """Games in the current library snapshot."""
+        return self.__snapshot.games
+
+    @games.setter
+    def games(self, games: List[Game]):
+        with self.__write_lock:
+            self.__snapshot = self.__snapshot._replace(games=tuple(games))
+
+    @property
+    def genres(self) -> tuple:
+        """Genres in the current library snapshot."""
+        return self.__snapshot.genres
+
+    @property
+    def tags(self) -> tuple:
+        """Tags in the current library snapshot."""
+        return self.__snapshot.tags
+
+    @property
+    def fetching(self) -> bool:
+        """Whether or not the library is being synchronized."""
+        return self.__sync_lock.locked()
+
+    def get_snapshot(self) -> LibrarySnapshot:
+        """
+        Gets the current library snapshot.
+
+        Return:
+        -------
+            LibrarySnapshot: Games, genres and tags as they were published together
+        """
+        return self.__snapshot
+
     def __get_installed_games(self) -> List[Game]:
         games = []
         directories = os.listdir(Config.get("install_dir"))
@@ -31,37 +93,163 @@ class Library():
             # Only scan directories
             if not os.path.isdir(full_path):
                 continue
-            # Make sure the gameinfo file exists
-            gameinfo = os.path.join(full_path, "gameinfo")
-            if os.path.isfile(gameinfo):
-                with open(gameinfo, 'r') as file:
-                    name = file.readline().strip()
-                    version = file.readline().strip()
-                    version_dev = file.readline().strip()
-                    language = file.readline().strip()
-                    game_id = file.readline().strip()
-                    if not game_id:
-                        game_id = 0
-                    else:
-                        game_id = int(game_id)
-                game = Game(name=name, game_id=game_id)
-                game.set_installed("linux", full_path, version)
-                game.set_installed_language(language)
-                games.append(game)
-            else:
-                game_files = os.listdir(full_path)
-                for file in game_files:
-                    if re.match(r'^goggame-[0-9]*\.info$', file):
-                        with open(os.path.join(full_path, file), 'r') as info_file:
-                            info = json.loads(info_file.read())
-                            game = Game(name=info["name"], game_id=int(info["gameId"]))
-                            game.set_installed("windows",full_path)
-                            game.set_installed_language(info["language"])
-                            for lang in info["languages"]:
-                                game.add_language(lang)
-                            games.append(game)
+            games.extend(self.read_installed_games(full_path))
         return games
-    
+
+    def read_installed_games(self, full_path: str) -> List[Game]:
+        """
+        Reads the games installed in a given directory.
+
+        Linux games are described by a gameinfo file, Windows games by one or more goggame-*.info files.
+
+        Parameters:
+        -----------
+            full_path: str -> Game installation directory
+
+        Return:
+        -------
+            List of games found in the directory, empty if the directory does not hold an installed game
+        """
+        games = []
+        # Make sure the gameinfo file exists
+        gameinfo = os.path.join(full_path, "gameinfo")
+        if os.path.isfile(gameinfo):
+            with open(gameinfo, 'r') as file:
+                name = file.readline().strip()
+                version = file.readline().strip()
+                version_dev = file.readline().strip()
+                language = file.readline().strip()
+                game_id = file.readline().strip()
+                if not game_id:
+                    game_id = 0
+                else:
+                    game_id = int(game_id)
+            game = Game(name=name, game_id=game_id)
+            game.set_installed("linux", full_path, version)
+            game.set_installed_language(language)
+            games.append(game)
+        elif os.path.isdir(full_path):
+            game_files = os.listdir(full_path)
+            for file in game_files:
+                if re.match(r'^goggame-[0-9]*\.info$', file):
+                    with open(os.path.join(full_path, file), 'r') as info_file:
+                        info = json.loads(info_file.read())
+                        game = Game(name=info["name"], game_id=int(info["gameId"]))
+                        game.set_installed("windows",full_path)
+                        game.set_installed_language(info["language"])
+                        for lang in info["languages"]:
+                            game.add_language(lang)
+                        games.append(game)
+        return games
+
+    def update_installed_game(self, full_path: str) -> List[Game]:
+        """
+        Updates the library with the games installed in a given directory.
+
+        Games that are already known have their installation details refreshed, unknown games are added to the library.
+        Games which were installed in the directory but are no longer found there are marked as not installed.
+
+        Parameters:
+        -----------
+            full_path: str -> Game installation directory
+
+        Return:
+        -------
+            List of library games that were added or changed
+        """
+        try:
+            found = self.read_installed_games(full_path)
+        except (OSError, ValueError, KeyError) as e:
+            # files are probably still being written, a later event will pick them up
+            print("Could not read installed game in {}. Cause: {}".format(full_path, e))
+            return []
+        changed = []
+        seen = []
+        with self.__write_lock:
+            if self.fetching:
+                self.__pending_paths.add(full_path)
+            games = list(self.__snapshot.games)
+            for installed_game in found:
+                game = self.__find_game(games, installed_game, full_path)
+                if game is None:
+                    games.append(installed_game)
+                    changed.append(installed_game)
+                    seen.append(installed_game)
+                    continue
+                previous = (game.installed, game.install_dir, game.installed_version, game.platform, game.language)
+                game.set_installed(installed_game.platform, full_path, installed_game.installed_version)
+                if installed_game.language is not None:
+                    game.set_installed_language(installed_game.language)
+                if previous != (game.installed, game.install_dir, game.installed_version, game.platform, game.language):
+                    changed.append(game)
+                seen.append(game)
+            # anything else registered in this directory is gone
+            removed = [game for game in games if game.install_dir == full_path and not any(game is g for g in seen)]
+            changed.extend(self.__uninstall(games, removed))
+            self.__snapshot = self.__snapshot._replace(games=tuple(games))
+        return changed
+
+    def remove_installed_game(self, full_path: str, games: List[Game] = None) -> List[Game]:
+        """
+        Marks the games installed in a given directory as not installed.
+
+        Games that are not known to GOG are removed from the library altogether.
+
+        Parameters:
+        -----------
+            full_path: str -> Game installation directory that was removed
+            games: List[Game] -> Optional list of games to remove, all games installed in the directory if not given
+
+        Return:
+        -------
+            List of library games that were changed or removed
+        """
+        with self.__write_lock:
+            if self.fetching:
+                self.__pending_paths.add(full_path)
+            library_games = list(self.__snapshot.games)
+            if games is None:
+                games = [game for game in library_games if game.install_dir == full_path]
+            self.__uninstall(library_games, games)
+            self.__snapshot = self.__snapshot._replace(games=tuple(library_games))
+        return games
+
+    def __uninstall(self, library_games: List[Game], games: List[Game]) -> List[Game]:
+        for game in games:
+            game.installed = 0
+            game.installed_version = None
+            game.install_dir = None
+            game.updates = 0
+            game.state = game.state.DOWNLOADABLE
+            if game.is_gog_game == 0 and game in library_games:
+                library_games.remove(game)
+        return games
+
+    def __merge_installed_games(self, library_games: List[Game], installed_games: List[Game]):
+        seen = []
+        for installed_game in installed_games:
+            game = self.__find_game(library_games, installed_game, installed_game.install_dir)
+            if game is None:
+                library_games.append(installed_game)
+                seen.append(installed_game)
+                continue
+            game.set_installed(installed_game.platform, installed_game.install_dir, installed_game.installed_version)
+            if installed_game.language is not None:
+                game.set_installed_language(installed_game.language)
+            seen.append(game)
+        # games that were installed but aren't anymore
+        removed = [game for game in library_games if game.installed == 1 and not any(game is g for g in seen)]
+        self.__uninstall(library_games, removed)
+
+    def __find_game(self, games: List[Game], installed_game: Game, full_path: str) -> Game:
+        for game in games:
+            if game.install_dir == full_path and game.get_stripped_name() == installed_game.get_stripped_name():
+                return game
+        for game in games:
+            if game == installed_game:
+                return game
+        return None
+
     def __validate_if_installed_is_latest(self,game,info) -> bool:
         if (game.installed_version is None or len(game.installed_version) == 0):
             return False
@@ -75,13 +263,66 @@ class Library():
         # validate if we have the latest version
         return (current_installer is not None and current_installer["version"] == game.installed_version)
     
-    def __get_games_from_api(self):
+    def __apply_info(self, game: Game, info: dict, langs: dict):
+        game.updates = 0 if self.__validate_if_installed_is_latest(game,info) == True else 1
+        game.sidebar_icon_url = info["images"]["sidebarIcon"]
+        game.logo_url = info["images"]["logo"]
+        game.icon_url = info["images"]["icon"]
+        game.background_url = info["images"]["background"]
+        supported_languages=[]
+        if info["languages"]:
+            for lang in info["languages"]:
+                langs[lang] = info["languages"][lang]
+                supported_languages.append(info["languages"][lang])
+        game.supported_languages=supported_languages
+
+    def __get_infos(self, games: List[Game]) -> dict:
+        """
+        Gets the product information of several games, keyed by game id.
+
+        The information is requested in batches, if that fails the games are looked up one by one on a small worker
+        pool. Games that can't be found are left out.
+
+        Parameters:
+        -----------
+            games: List[Game] -> Games to look up
+
+        Return:
+        -------
+            dict: Product information by game id (as string)
+        """
+        infos = {}
+        if len(games) == 0:
+            return infos
+        try:
+            for product in self.api.get_infos(games):
+                infos[str(product["id"])] = product
+            return infos
+        except Exception as e:
+            print("Could not fetch information about {} games at once. Cause: {}".format(len(games), e))
+
+        def get_info(game):
+            try:
+                return self.api.get_info(game)
+            except Exception:
+                return None
+        with ThreadPoolExecutor(max_workers=min(INFO_LOOKUP_WORKERS, len(games))) as executor:
+            for game, product in zip(games, executor.map(get_info, games)):
+                if product is not None and "id" in product:
+                    infos[str(game.id)] = product
+        return infos
+
+    def __get_games_from_api(self, games: List[Game]) -> LibrarySnapshot:
         try:
             retrieved_games = self.api.get_library()
             self.offline = False
         except:
             self.offline = True
-            return
+            # keep the owned games of the current snapshot, only the installed games are known offline
+            with self.__write_lock:
+                library_games = list(self.__snapshot.games)
+                self.__merge_installed_games(library_games, games)
+                return self.__snapshot._replace(games=tuple(library_games))
         # complete information with api calls
         ginfos = self.api.get_infos(retrieved_games)
         gmap = {}
@@ -99,9 +340,9 @@ class Library():
                 for tag in game.tags:
                     if len(tag) > 0:
                         tags.add(tag)
-            if game in self.games:
+            if game in games:
                 # Make sure the game id is set if the game is installed
-                for installed_game in self.games:
+                for installed_game in games:
                     if game == installed_game:
                         game.installed = installed_game.installed
                         game.is_gog_game = 1
@@ -112,57 +353,79 @@ class Library():
                         game.sidebar_tile = installed_game.sidebar_tile
                         game.list_tile = installed_game.list_tile
                         game.grid_tile = installed_game.grid_tile
-                        # also check if we have the most up to date version or not
-                        try:
-                            resp=gmap[str(game.id)]
-                            if resp is None:
-                                resp = self.api.get_info(game)
-                            game.updates = 0 if self.__validate_if_installed_is_latest(game,resp) == True else 1
-                            game.sidebar_icon_url = resp["images"]["sidebarIcon"]
-                            game.logo_url = resp["images"]["logo"]
-                            game.icon_url = resp["images"]["icon"]
-                            game.background_url = resp["images"]["background"]
-                            supported_languages=[]
-                            if resp["languages"]:
-                                for lang in resp["languages"]:
-                                    langs[lang] = resp["languages"][lang]
-                                    supported_languages.append(resp["languages"][lang])
-                            game.supported_languages=supported_languages
-                        except:
-                            print("Could not fetch current information about {}".format(game.name))
-                        self.games.remove(installed_game)
+                        games.remove(installed_game)
                         break
-            self.games.append(game)
-        # handle self installed games that may exist on gog
-        for game in self.games:
-            if game.is_gog_game == 1:
+            games.append(game)
+        # self installed games may exist on gog too, look them up all at once
+        missing = [game for game in games if game.installed == 1 and game.is_gog_game == 0 and game.id > 0
+                   and str(game.id) not in gmap]
+        gmap.update(self.__get_infos(missing))
+        # also check if the installed games have the most up to date version or not
+        for game in games:
+            if game.installed != 1:
+                continue
+            resp = gmap.get(str(game.id))
+            if resp is None:
+                print("Could not fetch current information about {}".format(game.name))
                 continue
             try:
-                resp = self.api.get_info(game)
-                game.updates = 0 if self.__validate_if_installed_is_latest(game,resp) == True else 1
-                game.sidebar_icon_url = resp["images"]["sidebarIcon"]
-                game.logo_url = resp["images"]["logo"]
-                game.icon_url = resp["images"]["icon"]
-                game.background_url = resp["images"]["background"]
-                supported_languages=[]
-                if resp["languages"]:
-                    for lang in resp["languages"]:
-                        langs[lang] = resp["languages"][lang]
-                        supported_languages.append(resp["languages"][lang])
-                    game.supported_languages=supported_languages
+                self.__apply_info(game, resp, langs)
             except:
                 print("Could not fetch current information about {}".format(game.name))
-        # reset genres and tags and use the new information we got
-        self.genres = []
-        for cat in cats:
-            self.genres.append(cat)
-        self.genres.sort()
-        self.tags = []
-        for tag in tags:
-            self.tags.append(tag)
-        self.tags.sort()
         self.last_api_check = time.time()
+        # reset genres and tags and use the new information we got
+        return LibrarySnapshot(tuple(games), tuple(sorted(cats)), tuple(sorted(tags)))
         
+    def refresh_installed_games(self) -> List[Game]:
+        """
+        Rescans the installation directory and updates the installed games in the library.
+
+        Return:
+        -------
+            List of library games that were added, changed or removed
+        """
+        paths = set()
+        install_dir = Config.get("install_dir")
+        if os.path.isdir(install_dir):
+            for directory in os.listdir(install_dir):
+                full_path = os.path.join(install_dir, directory)
+                if os.path.isdir(full_path):
+                    paths.add(full_path)
+        # also recheck games installed elsewhere or removed in the meantime
+        for game in self.games:
+            if game.install_dir:
+                paths.add(game.install_dir)
+        changed = []
+        for path in paths:
+            changed.extend(self.update_installed_game(path))
+        return changed
+
+    def check_for_updates(self) -> List[Game]:
+        """
+        Checks GOG for new versions of the installed games, bypassing cached product information.
+
+        Return:
+        -------
+            List of installed games for which the update availability changed
+        """
+        installed = [game for game in self.games if game.installed == 1 and game.id > 0]
+        if len(installed) == 0:
+            return []
+        infos = {}
+        for product in self.api.get_infos(installed, cache_validity=0):
+            infos[product["id"]] = product
+        changed = []
+        with self.__write_lock:
+            for game in installed:
+                # uninstalled while GOG was asked
+                if game.id not in infos or game.installed != 1:
+                    continue
+                updates = 0 if self.__validate_if_installed_is_latest(game, infos[game.id]) == True else 1
+                if updates != game.updates:
+                    game.updates = updates
+                    changed.append(game)
+        return changed
+
     def update_dlcs_for_game(self, game: Game):
         """
         Update DLCs for a given game.
@@ -191,27 +454,135 @@ class Library():
         return self.__get_installed_games()
     
     def get_games(self,forced: bool = False) -> List[Game]:
-        if self.fetching == 1:
-            return self.games
         # wait a some time before calling the API again
         if (forced == False and time.time() - self.last_api_check < 30):
-            return self.games;
-        # rebuild list
-        self.fetching = 1
-        self.games = self.__get_installed_games()
-        self.__get_games_from_api()
-        self.fetching = 0
+            return self.games
+        # only one synchronization at a time, others get the current snapshot
+        if not self.__sync_lock.acquire(blocking=False):
+            return self.games
+        try:
+            # rebuild list outside of the write lock, readers keep using the previous snapshot
+            snapshot = self.__get_games_from_api(self.__get_installed_games())
+            with self.__write_lock:
+                self.__snapshot = snapshot
+                pending_paths = self.__pending_paths
+                self.__pending_paths = set()
+        finally:
+            self.__sync_lock.release()
+        # replay installation changes that happened while synchronizing
+        for path in pending_paths:
+            self.update_installed_game(path)
+        self.save_snapshot()
         return self.games
 
+    def save_snapshot(self, path: str = LIBRARY_SNAPSHOT_PATH):
+        """
+        Persists the current library snapshot so it can be shown right away on the next start.
+
+        Parameters:
+        -----------
+            path: str -> Snapshot file path
+        """
+        snapshot = self.__snapshot
+        games = []
+        for game in snapshot.games:
+            entry = {"name": game.name, "url": game.url, "id": game.id}
+            for field in SNAPSHOT_GAME_FIELDS:
+                entry[field] = getattr(game, field)
+            games.append(entry)
+        data = {"games": games, "genres": list(snapshot.genres), "tags": list(snapshot.tags)}
+        try:
+            os.makedirs(os.path.dirname(path), mode=0o755, exist_ok=True)
+            # write next to the snapshot and swap, so an interrupted write never leaves a broken file behind
+            tmp_path = "{}.tmp".format(path)
+            with open(tmp_path, "w") as file:
+                json.dump(data, file, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError) as e:
+            print("Could not save the library snapshot. Cause: {}".format(e))
+
+    def load_snapshot(self, path: str = LIBRARY_SNAPSHOT_PATH) -> bool:
+        """
+        Loads the library snapshot saved by the last synchronization.
+
+        The snapshot is only loaded while the library is still empty. Games whose installation directory no longer
+        exists are loaded as not installed.
+
+        Parameters:
+        -----------
+            path: str -> Snapshot file path
+
+        Return:
+        -------
+            bool: True if a snapshot was loaded, False otherwise
+        """
+        if not os.path.isfile(path):
+            return False
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+            games = []
+            for entry in data["games"]:
+                game = Game(name=entry["name"], url=entry["url"], game_id=entry["id"])
+                for field in SNAPSHOT_GAME_FIELDS:
+                    if field in entry:
+                        setattr(game, field, entry[field])
+                if game.installed == 1 and game.install_dir and os.path.isdir(game.install_dir):
+                    game.set_installed(game.platform, game.install_dir)
+                else:
+                    game.installed = 0
+                    game.install_dir = None
+                    game.installed_version = None
+                games.append(game)
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            print("Could not load the library snapshot. Cause: {}".format(e))
+            return False
+        with self.__write_lock:
+            if len(self.__snapshot.games) > 0:
+                return False
+            self.__snapshot = LibrarySnapshot(tuple(games), tuple(data["genres"]), tuple(data["tags"]))
+        return True
+
     def get_sorted_games(self, key="game", reverse=False, sortfn = None) -> List[Game]:
         if (sortfn is None):
             return sorted(self.games, key, reverse)
         else:
             return sortfn(self.games, key, reverse)
 
+    def get_recently_played_games(self, limit: int = None) -> List[Game]:
+        """
+        Gets the played games of the library, most recently played first.
+
+        Parameters:
+        -----------
+            limit: int -> Maximum number of games, None for all
+
+        Return:
+        -------
+            List[Game]: Played games
+        """
+        return self.__get_played_games(PlayTime.get_recently_played(), limit)
+
+    def get_most_played_games(self, limit: int = None) -> List[Game]:
+        """
+        Gets the played games of the library, longest played first.
+
+        Parameters:
+        -----------
+            limit: int -> Maximum number of games, None for all
+
+        Return:
+        -------
+            List[Game]: Played games
+        """
+        return self.__get_played_games(PlayTime.get_most_played(), limit)
+
+    def __get_played_games(self, keys: list, limit: int = None) -> List[Game]:
+        games = {PlayTime.get_key(game): game for game in self.games}
+        played = [games[key] for key in keys if key in games]
+        return played if limit is None else played[:limit]
+
     def get_filtered_games(self, installed = None, platform = None, genre = None, tag = None, state = None, name = None) -> List[Game]:
-        if self.fetching == 1:
-            return self.games
         games = []
         for game in self.games:
             if (self.is_game_filtered(game, installed, platform, genre, tag, state, name) == False):
@@ -7,9 +7,15 @@ if LAUNCH_DIR == "/bin" or LAUNCH_DIR == "/sbin":
 
 CONFIG_DIR = os.path.join(os.getenv('XDG_CONFIG_HOME', os.path.expanduser('~/.config')), "goodoldgalaxy")
 CONFIG_FILE_PATH = os.path.join(CONFIG_DIR, "config.json")
+PLAYTIME_FILE_PATH = os.path.join(CONFIG_DIR, "playtime.json")
 CACHE_DIR = os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), "goodoldgalaxy")
 
 THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
+LIBRARY_SNAPSHOT_PATH = os.path.join(CACHE_DIR, "library.json")
+WINE_BASE_PREFIX_DIR = os.path.join(CACHE_DIR, "wineprefix")
+LAUNCH_PLAN_DIR = os.path.join(CACHE_DIR, "launch")
+GAME_LOG_DIR = os.path.join(CACHE_DIR, "logs")
+WARMUP_DIR = os.path.join(CACHE_DIR, "warmup")
 DEFAULT_INSTALL_DIR = os.path.expanduser("~/GOG Games")
 
 UI_DIR = os.path.abspath(os.path.join(LAUNCH_DIR, "../data/ui"))
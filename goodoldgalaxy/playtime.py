@@ -0,0 +1,183 @@
+import os
+import json
+import threading
+from goodoldgalaxy.paths import PLAYTIME_FILE_PATH
+from goodoldgalaxy.constants import PLAYTIME_SESSIONS_KEPT
+
+
+class __PlayTime:
+    """
+    Store for the play sessions of games.
+
+    Each game has its total playtime, number of sessions, last time played and its most recent sessions (start and
+    end times, in seconds since the epoch). The store is read on first use and written when a session ends, so it
+    costs nothing while games run.
+    """
+
+    def __init__(self):
+        self.__lock = threading.RLock()
+        self.__games = None
+        self.__listeners = []
+
+    def register_listener(self, listener_func):
+        """
+        Register a listener function that wants to be let know about finished play sessions.
+
+        Parameters:
+        -----------
+            listener_func: lambda -> Listener function to register that receives the game as its argument
+        """
+        if listener_func is None:
+            return
+        self.__listeners.append(listener_func)
+
+    def unregister_listener(self, listener_func):
+        """
+        Unregister a listener function.
+
+        Parameters:
+        -----------
+            listener_func: lambda -> Listener function to unregister
+        """
+        if listener_func is None:
+            return
+        self.__listeners.remove(listener_func)
+
+    def add_session(self, game, start: float, end: float):
+        """
+        Records a play session.
+
+        Parameters:
+        -----------
+            game: Game -> Played game
+            start: float -> Session start, in seconds since the epoch
+            end: float -> Session end, in seconds since the epoch
+        """
+        with self.__lock:
+            games = self.__load()
+            entry = games.setdefault(self.get_key(game), {"total": 0, "count": 0, "last": 0, "sessions": []})
+            entry["total"] += int(end - start)
+            entry["count"] += 1
+            entry["last"] = int(end)
+            entry["sessions"] = (entry["sessions"] + [[int(start), int(end)]])[-PLAYTIME_SESSIONS_KEPT:]
+            self.__save()
+        for listener_func in self.__listeners:
+            listener_func(game)
+
+    def get_total(self, game) -> int:
+        """
+        Gets the total playtime of a game.
+
+        Parameters:
+        -----------
+            game: Game -> Game
+
+        Return:
+        -------
+            int: Playtime in seconds
+        """
+        return self.__get_entry(game).get("total", 0)
+
+    def get_last_played(self, game) -> int:
+        """
+        Gets when a game was last played.
+
+        Parameters:
+        -----------
+            game: Game -> Game
+
+        Return:
+        -------
+            int: End of the last session in seconds since the epoch, 0 if the game was never played
+        """
+        return self.__get_entry(game).get("last", 0)
+
+    def get_sessions(self, game) -> list:
+        """
+        Gets the most recent play sessions of a game.
+
+        Parameters:
+        -----------
+            game: Game -> Game
+
+        Return:
+        -------
+            list: [start, end] pairs in seconds since the epoch, oldest first
+        """
+        return list(self.__get_entry(game).get("sessions", []))
+
+    def get_recently_played(self, limit: int = None) -> list:
+        """
+        Gets the played games, most recently played first.
+
+        Parameters:
+        -----------
+            limit: int -> Maximum number of games, None for all
+
+        Return:
+        -------
+            list: Game keys (game id, or name for games without an id)
+        """
+        return self.__get_sorted("last", limit)
+
+    def get_most_played(self, limit: int = None) -> list:
+        """
+        Gets the played games, longest played first.
+
+        Parameters:
+        -----------
+            limit: int -> Maximum number of games, None for all
+
+        Return:
+        -------
+            list: Game keys (game id, or name for games without an id)
+        """
+        return self.__get_sorted("total", limit)
+
+    def get_key(self, game) -> str:
+        """
+        Gets the key a game is stored under.
+
+        Parameters:
+        -----------
+            game: Game -> Game
+
+        Return:
+        -------
+            str: Game id, or name for games without an id
+        """
+        return str(game.id) if game.id else game.name
+
+    def __get_sorted(self, field: str, limit: int) -> list:
+        with self.__lock:
+            games = self.__load()
+            keys = sorted(games, key=lambda key: games[key][field], reverse=True)
+        return keys if limit is None else keys[:limit]
+
+    def __get_entry(self, game) -> dict:
+        with self.__lock:
+            return self.__load().get(self.get_key(game), {})
+
+    def __load(self) -> dict:
+        if self.__games is None:
+            self.__games = {}
+            if os.path.isfile(PLAYTIME_FILE_PATH):
+                try:
+                    with open(PLAYTIME_FILE_PATH, "r") as file:
+                        self.__games = json.load(file)["games"]
+                except (OSError, ValueError, KeyError, TypeError) as e:
+                    print("Could not read the playtime of games from {}. Cause: {}".format(PLAYTIME_FILE_PATH, e))
+        return self.__games
+
+    def __save(self):
+        tmp_path = "{}.tmp".format(PLAYTIME_FILE_PATH)
+        try:
+            os.makedirs(os.path.dirname(PLAYTIME_FILE_PATH), mode=0o755, exist_ok=True)
+            with open(tmp_path, "w") as file:
+                json.dump({"games": self.__games}, file, separators=(",", ":"))
+            os.replace(tmp_path, PLAYTIME_FILE_PATH)
+        except OSError as e:
+            print("Could not save the playtime of games to {}. Cause: {}".format(PLAYTIME_FILE_PATH, e))
+
+
+PlayTime = __PlayTime()
@@ -0,0 +1,240 @@
+import os
+import glob
+import time
+import ctypes
+import threading
+from goodoldgalaxy.constants import ORPHAN_REAP_INTERVAL
+
+PR_SET_CHILD_SUBREAPER = 36
+
+__subreaper_lock = threading.Lock()
+__subreaper = None
+
+# children waited for by whoever started or watches them
+__owned = set()
+# exited children nobody waited for on the previous reap
+__zombies = set()
+__reap_lock = threading.Lock()
+
+
+def set_child_subreaper() -> bool:
+    """
+    Makes this process the subreaper of its descendants.
+
+    Processes whose parent exits are then reparented to this process instead of init, so a game keeps being a
+    descendant of the launcher even when its start script exits right after starting it. A background thread waits
+    for the reparented processes once they exit (see reap_orphans).
+
+    Return:
+    -------
+        bool: True if this process is a subreaper, False if the kernel doesn't support it
+    """
+    global __subreaper
+    with __subreaper_lock:
+        if __subreaper is None:
+            try:
+                # the C library is already loaded into this process
+                libc = ctypes.CDLL(None, use_errno=True)
+                __subreaper = libc.prctl(PR_SET_CHILD_SUBREAPER, 1, 0, 0, 0) == 0
+            except (OSError, AttributeError):
+                __subreaper = False
+            if __subreaper:
+                reaper_thread = threading.Thread(target=__reap_orphans_periodically)
+                reaper_thread.daemon = True
+                reaper_thread.start()
+            else:
+                print("Could not become the subreaper of the started games")
+        return __subreaper
+
+
+def __reap_orphans_periodically():
+    while True:
+        time.sleep(ORPHAN_REAP_INTERVAL)
+        reap_orphans()
+
+
+def add_owned_process(pid: int):
+    """
+    Marks a child process as waited for elsewhere, like by a GLib child watch, so reap_orphans leaves it alone.
+
+    Parameters:
+    -----------
+        pid: int -> Process id
+    """
+    with __reap_lock:
+        __owned.add(pid)
+
+
+def remove_owned_process(pid: int):
+    """
+    Removes a child process marked with add_owned_process, once it was waited for.
+
+    Parameters:
+    -----------
+        pid: int -> Process id
+    """
+    with __reap_lock:
+        __owned.discard(pid)
+
+
+def reap_orphans():
+    """
+    Waits for exited children of this process that nobody else waits for, so they don't stay zombies.
+
+    As a subreaper, this process gets all orphaned descendants as children, also those of processes that aren't games,
+    like the wineserver started by winecfg. Children marked with add_owned_process are skipped. Other children are
+    only waited for when they were already zombies on the previous call, as subprocesses started by this process are
+    waited for by whoever started them right after they exit.
+    """
+    global __zombies
+    with __reap_lock:
+        zombies = set()
+        for pid in get_children(os.getpid()):
+            stat = get_stat(pid)
+            if stat is None or stat[0] != "Z" or pid in __owned:
+                continue
+            if pid not in __zombies:
+                zombies.add(pid)
+                continue
+            try:
+                os.waitpid(pid, os.WNOHANG)
+            except ChildProcessError:
+                pass
+        __zombies = zombies
+
+
+def get_exit_code(status: int) -> int:
+    """
+    Converts a wait status, as returned by os.waitpid or passed to GLib child watches, to an exit code.
+
+    Parameters:
+    -----------
+        status: int -> Wait status
+
+    Return:
+    -------
+        int: Exit code of the process, or the negated signal number if a signal ended it, like Popen.returncode
+    """
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    if os.WIFEXITED(status):
+        return os.WEXITSTATUS(status)
+    return status
+
+
+def get_children(pid: int) -> list:
+    """
+    Gets the child processes of a process, from /proc/<pid>/task/*/children.
+
+    Parameters:
+    -----------
+        pid: int -> Process id
+
+    Return:
+    -------
+        list: Process ids of the children
+    """
+    children = []
+    for path in glob.glob("/proc/{}/task/*/children".format(pid)):
+        try:
+            with open(path, "r") as file:
+                children.extend(int(child) for child in file.read().split())
+        except OSError:
+            # the thread exited
+            continue
+    return children
+
+
+def get_stat(pid: int) -> tuple:
+    """
+    Gets the state, parent process id and session id of a process, from /proc/<pid>/stat.
+
+    Parameters:
+    -----------
+        pid: int -> Process id
+
+    Return:
+    -------
+        tuple: State letter, parent process id and session id, None if the process doesn't exist
+    """
+    try:
+        with open("/proc/{}/stat".format(pid), "r") as file:
+            stat = file.read()
+    except OSError:
+        return None
+    # the command name can hold spaces and parentheses, the fields start after the last parenthesis
+    fields = stat[stat.rfind(")") + 2:].split()
+    return fields[0], int(fields[1]), int(fields[3])
+
+
+class ProcessTracker:
+    """
+    Tracks a started process and all of its descendants.
+
+    The process is expected to lead its own session (started with start_new_session=True). Descendants are followed
+    through /proc/<pid>/task/*/children, and descendants whose parent exited are found among the children of this
+    process by their session, as long as it is a subreaper (see set_child_subreaper). No process table scan is needed.
+
+    Parameters:
+    -----------
+        pid: int -> Process id of the started process
+    """
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.__pids = {pid}
+
+    def get_session_children(self) -> list:
+        """
+        Gets the processes of the tracked session that are children of this process: the started process and the
+        descendants reparented to this process. Everything else still running in the session descends from them.
+
+        Return:
+        -------
+            list: Process ids, including exited processes that weren't waited for yet
+        """
+        children = []
+        for pid in get_children(os.getpid()):
+            stat = get_stat(pid)
+            if stat is not None and stat[2] == self.pid:
+                children.append(pid)
+        return children
+
+    def get_pids(self) -> set:
+        """
+        Gets the running processes.
+
+        Return:
+        -------
+            set: Process ids of the started process, if it's still running, and of its running descendants
+        """
+        # pids are reused, so processes from the previous check are only trusted while they're part of the session,
+        # processes listed as children are descendants for sure
+        pending = [(pid, False) for pid in self.__pids]
+        # orphans are reparented to this process, their session tells which game they belong to
+        for pid in get_children(os.getpid()):
+            stat = get_stat(pid)
+            if stat is not None and stat[2] == self.pid:
+                pending.append((pid, True))
+        running = set()
+        while len(pending) > 0:
+            pid, descendant = pending.pop()
+            if pid in running:
+                continue
+            stat = get_stat(pid)
+            if stat is None or stat[0] in ("Z", "X") or (not descendant and stat[2] != self.pid):
+                continue
+            running.add(pid)
+            pending.extend((child, True) for child in get_children(pid))
+        self.__pids = running
+        return set(running)
+
+    def is_running(self) -> bool:
+        """
+        Checks if the started process or any of its descendants is still running.
+
+        Return:
+        -------
+            bool: True if any of the processes is running, False otherwise
+        """
+        return len(self.get_pids()) > 0
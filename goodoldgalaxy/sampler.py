@@ -0,0 +1,225 @@
+import os
+import csv
+import time
+import threading
+from collections import deque
+from goodoldgalaxy.constants import RESOURCE_SAMPLES_KEPT, RESOURCE_SAMPLER_MAX_OVERHEAD
+
+CLOCK_TICKS = os.sysconf("SC_CLK_TCK")
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+CSV_HEADER = ["time", "cpu_percent", "rss_bytes", "read_bytes", "written_bytes"]
+
+# most recent sampler of every game, by game key
+__samplers = {}
+__samplers_lock = threading.Lock()
+
+
+def read_process_usage(pid: int) -> tuple:
+    """
+    Reads the resource usage of a process from /proc/<pid>/stat, statm and io.
+
+    Parameters:
+    -----------
+        pid: int -> Process id
+
+    Return:
+    -------
+        tuple: CPU time in clock ticks, resident memory in bytes, bytes read from and written to storage, None if the
+               process doesn't exist
+    """
+    try:
+        with open("/proc/{}/stat".format(pid), "r") as file:
+            stat = file.read()
+        with open("/proc/{}/statm".format(pid), "r") as file:
+            statm = file.read().split()
+    except OSError:
+        return None
+    # the command name can hold spaces and parentheses, the fields start after the last parenthesis
+    fields = stat[stat.rfind(")") + 2:].split()
+    # utime and stime
+    ticks = int(fields[11]) + int(fields[12])
+    rss = int(statm[1]) * PAGE_SIZE
+    read_bytes = 0
+    written_bytes = 0
+    try:
+        with open("/proc/{}/io".format(pid), "r") as file:
+            for line in file:
+                name, value = line.split(":", 1)
+                if name == "read_bytes":
+                    read_bytes = int(value)
+                elif name == "write_bytes":
+                    written_bytes = int(value)
+    except (OSError, ValueError):
+        # not allowed to read the counters of the process
+        pass
+    return ticks, rss, read_bytes, written_bytes
+
+
+class ResourceSampler:
+    """
+    Samples the CPU, memory and storage use of a process tree while it runs.
+
+    Every interval the processes of the tracker are read from /proc, and their CPU use since the previous sample, total
+    resident memory and storage reads and writes since the previous sample are kept in a ring buffer of the last
+    RESOURCE_SAMPLES_KEPT samples. When reading the samples costs more than RESOURCE_SAMPLER_MAX_OVERHEAD of the
+    interval, as with games that start many processes, the interval is doubled.
+
+    Parameters:
+    -----------
+        tracker: ProcessTracker -> Tracker of the processes to sample
+        interval: float -> Seconds between samples
+    """
+
+    def __init__(self, tracker, interval: float = 5):
+        self.tracker = tracker
+        self.interval = max(1, interval)
+        self.samples = deque(maxlen=RESOURCE_SAMPLES_KEPT)
+        self.started = None
+        self.stopped = None
+        self.read_bytes = 0
+        self.written_bytes = 0
+        self.__usage = {}
+        self.__sampled = None
+        self.__lock = threading.Lock()
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        """
+        Starts sampling in a background thread.
+        """
+        self.started = time.time()
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stops sampling, without waiting for the sampling thread.
+        """
+        self.stopped = time.time()
+        self.__stop.set()
+
+    def __run(self):
+        while not self.__stop.is_set():
+            cost = time.thread_time()
+            self.sample()
+            cost = time.thread_time() - cost
+            if cost > self.interval * RESOURCE_SAMPLER_MAX_OVERHEAD:
+                self.interval *= 2
+            self.__stop.wait(self.interval)
+
+    def sample(self):
+        """
+        Takes a sample of the running processes. The first sample only records the starting point.
+        """
+        now = time.monotonic()
+        usage = {}
+        for pid in self.tracker.get_pids():
+            process_usage = read_process_usage(pid)
+            if process_usage is not None:
+                usage[pid] = process_usage
+        ticks = 0
+        rss = 0
+        read_bytes = 0
+        written_bytes = 0
+        for pid, (pid_ticks, pid_rss, pid_read, pid_written) in usage.items():
+            # processes started since the previous sample count from zero
+            previous_ticks, _, previous_read, previous_written = self.__usage.get(pid, (0, 0, 0, 0))
+            ticks += max(0, pid_ticks - previous_ticks)
+            rss += pid_rss
+            read_bytes += max(0, pid_read - previous_read)
+            written_bytes += max(0, pid_written - previous_written)
+        with self.__lock:
+            if self.__sampled is not None:
+                cpu = 100 * ticks / CLOCK_TICKS / max(now - self.__sampled, 0.001)
+                self.samples.append((time.time(), round(cpu, 1), rss, read_bytes, written_bytes))
+                self.read_bytes += read_bytes
+                self.written_bytes += written_bytes
+            self.__usage = usage
+            self.__sampled = now
+
+    def get_samples(self) -> list:
+        """
+        Gets the kept samples.
+
+        Return:
+        -------
+            list: Tuples of time in seconds since the epoch, CPU use in percent of a core, resident memory in bytes and
+                  bytes read and written since the previous sample, oldest first
+        """
+        with self.__lock:
+            return list(self.samples)
+
+    def summary(self) -> dict:
+        """
+        Gets summary statistics of the sampled session.
+
+        Return:
+        -------
+            dict: Duration in seconds, number of samples, average and maximum CPU use, average and maximum resident
+                  memory, and bytes read and written during the whole session
+        """
+        samples = self.get_samples()
+        count = len(samples)
+        end = self.stopped if self.stopped is not None else time.time()
+        return {
+            "duration": int(end - self.started) if self.started is not None else 0,
+            "samples": count,
+            "cpu_average": round(sum(sample[1] for sample in samples) / count, 1) if count > 0 else 0,
+            "cpu_max": max((sample[1] for sample in samples), default=0),
+            "rss_average": sum(sample[2] for sample in samples) // count if count > 0 else 0,
+            "rss_max": max((sample[2] for sample in samples), default=0),
+            "read_bytes": self.read_bytes,
+            "written_bytes": self.written_bytes
+        }
+
+    def export_csv(self, path: str):
+        """
+        Writes the kept samples to a CSV file.
+
+        Parameters:
+        -----------
+            path: str -> CSV file to write
+        """
+        with open(path, "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(CSV_HEADER)
+            writer.writerows(self.get_samples())
+
+
+def start_sampler(key: str, tracker, interval: float) -> ResourceSampler:
+    """
+    Starts sampling the processes of a game, replacing the sampler of its previous session.
+
+    Parameters:
+    -----------
+        key: str -> Game key
+        tracker: ProcessTracker -> Tracker of the processes of the game
+        interval: float -> Seconds between samples
+
+    Return:
+    -------
+        ResourceSampler: Started sampler
+    """
+    sampler = ResourceSampler(tracker, interval)
+    with __samplers_lock:
+        __samplers[key] = sampler
+    sampler.start()
+    return sampler
+
+
+def get_sampler(key: str) -> ResourceSampler:
+    """
+    Gets the sampler of the running or most recent session of a game.
+
+    Parameters:
+    -----------
+        key: str -> Game key
+
+    Return:
+    -------
+        ResourceSampler: Sampler, None if the game wasn't sampled since this program started
+    """
+    with __samplers_lock:
+        return __samplers.get(key)
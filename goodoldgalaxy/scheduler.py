@@ -0,0 +1,143 @@
+import time
+import random
+import threading
+from goodoldgalaxy.config import Config
+from goodoldgalaxy.constants import REFRESH_JITTER, REFRESH_MINIMUM_INTERVAL, REFRESH_MAXIMUM_BACKOFF, \
+    REFRESH_DOWNLOAD_RETRY
+from goodoldgalaxy.download_manager import DownloadManager
+
+
+class RefreshJob:
+    """
+    Definition of a periodic refresh job.
+
+    The interval is read from the configuration every time the job is rescheduled, so changes apply to the next run.
+    """
+
+    def __init__(self, name: str, func, interval_key: str, network: bool = True):
+        self.name = name
+        self.func = func
+        self.interval_key = interval_key
+        self.network = network
+        self.failures = 0
+        self.next_run = 0
+
+    def interval(self) -> float:
+        """
+        Gets the configured interval of the job.
+
+        Return:
+        -------
+            float: Interval in seconds, never smaller than the minimum refresh interval
+        """
+        interval = Config.get(self.interval_key)
+        if interval is None:
+            interval = REFRESH_MINIMUM_INTERVAL
+        return max(float(interval), REFRESH_MINIMUM_INTERVAL)
+
+    def delay(self) -> float:
+        """
+        Gets the delay until the next run, taking failures and jitter into account.
+
+        Return:
+        -------
+            float: Delay in seconds
+        """
+        delay = self.interval()
+        if self.failures > 0:
+            # exponential backoff, capped
+            delay = min(delay * 2 ** self.failures, max(delay, REFRESH_MAXIMUM_BACKOFF))
+        # spread runs so that jobs (and clients) don't all fire at the same moment
+        return delay + random.uniform(-REFRESH_JITTER, REFRESH_JITTER) * delay
+
+
+class RefreshScheduler:
+    """
+    Runs refresh jobs in the background on configurable intervals.
+
+    All jobs run on a single scheduler thread, so two refreshes never run at the same time. Failed jobs back off
+    exponentially, and jobs that need the network are postponed while a download is running. The scheduler thread
+    sleeps until the next job is due, it doesn't wake up in between unless jobs are added or triggered.
+    """
+
+    def __init__(self):
+        self.__jobs = []
+        self.__lock = threading.Lock()
+        self.__wakeup = threading.Event()
+        self.__stopped = True
+        self.__thread = None
+
+    def add_job(self, name: str, func, interval_key: str, network: bool = True, run_now: bool = False):
+        """
+        Adds a refresh job.
+
+        Parameters:
+        -----------
+            name: str -> Job name
+            func: Function to run, a raised exception counts as a failure
+            interval_key: str -> Configuration key holding the interval in seconds
+            network: bool -> True if the job uses the network and should wait for downloads to finish
+            run_now: bool -> True to run the job as soon as possible, otherwise it runs after its interval
+        """
+        job = RefreshJob(name, func, interval_key, network)
+        job.next_run = time.time() if run_now else time.time() + job.delay()
+        with self.__lock:
+            self.__jobs.append(job)
+        self.__wakeup.set()
+
+    def trigger(self, name: str):
+        """
+        Runs a job as soon as possible.
+
+        Parameters:
+        -----------
+            name: str -> Job name
+        """
+        with self.__lock:
+            for job in self.__jobs:
+                if job.name == name:
+                    job.next_run = time.time()
+        self.__wakeup.set()
+
+    def start(self):
+        """Starts the scheduler thread"""
+        if not self.__stopped:
+            return
+        self.__stopped = False
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """Stops the scheduler thread after the current job finishes"""
+        self.__stopped = True
+        self.__wakeup.set()
+
+    def __next_job(self) -> RefreshJob:
+        with self.__lock:
+            if len(self.__jobs) == 0:
+                return None
+            return min(self.__jobs, key=lambda job: job.next_run)
+
+    def __run(self):
+        while not self.__stopped:
+            job = self.__next_job()
+            timeout = None if job is None else max(job.next_run - time.time(), 0)
+            if self.__wakeup.wait(timeout):
+                # jobs changed or the scheduler was stopped
+                self.__wakeup.clear()
+                continue
+            if job.network and DownloadManager.is_downloading():
+                # don't compete with downloads for bandwidth
+                job.next_run = time.time() + REFRESH_DOWNLOAD_RETRY
+                continue
+            self.__run_job(job)
+
+    def __run_job(self, job: RefreshJob):
+        try:
+            job.func()
+            job.failures = 0
+        except Exception as e:
+            job.failures += 1
+            print("Refreshing {} failed ({} times in a row). Cause: {}".format(job.name, job.failures, e))
+        job.next_run = time.time() + job.delay()
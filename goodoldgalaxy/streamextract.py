@@ -0,0 +1,262 @@
+import os
+import stat
+import shutil
+import struct
+import threading
+import zipfile
+import zlib
+from goodoldgalaxy.gogextract import FILESIZE_RE, OFFSET_RE, open_installer_data
+
+# Zip local file header: signature, version, flags, method, time, date, crc, compressed size, size, name and extra length
+LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+LOCAL_HEADER_SIGNATURE = 0x04034b50
+ZIP64_EXTRA_ID = 0x0001
+# Enough to hold the makeself script of any installer
+SCRIPT_READ_SIZE = 256 * 1024
+READ_CHUNK_SIZE = 1024 * 1024  # 1 MB
+# Files whose appearance marks a game as installed, only put in place once everything else is
+DEFERRED_FILES = ["gameinfo"]
+
+
+class StreamingNotSupported(Exception):
+    pass
+
+
+class StreamingCanceled(Exception):
+    pass
+
+
+class StreamExtractor:
+    """
+    Extracts the game data of a Linux installer while it is still being downloaded.
+
+    Makeself installers start with the script and the MojoSetup archive, followed by the game data zip. The zip
+    members are read from their local headers as soon as their bytes are on disk, so by the time the download ends
+    most of the game is already in place. Permissions and symbolic links are only known from the zip central
+    directory at the very end of the file, so they are applied by finish().
+
+    The download progress functions should call notify(), the download finish (or cancel) should call complete()
+    (or cancel()).
+
+    Parameters:
+    -----------
+        installer: str -> Installer path, written by the download
+        install_dir: str -> Game installation directory
+        prefix: str -> Archive directory holding the game files
+    """
+
+    def __init__(self, installer: str, install_dir: str, prefix: str = "data/noarch/"):
+        self.installer = installer
+        self.install_dir = os.path.abspath(install_dir)
+        self.prefix = prefix
+        self.extracted = set()
+        self.error = None
+        self.__created_dir = not os.path.exists(self.install_dir)
+        self.__condition = threading.Condition()
+        self.__completed = False
+        self.__stopped = False
+        self.__thread = None
+
+    def start(self):
+        """Starts extracting in the background"""
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def notify(self, *args):
+        """Lets the extraction know that more data was downloaded"""
+        with self.__condition:
+            self.__condition.notify_all()
+
+    def complete(self, *args):
+        """Lets the extraction know that the download finished"""
+        with self.__condition:
+            self.__completed = True
+            self.__condition.notify_all()
+
+    def cancel(self, *args):
+        """Stops the extraction and removes what was extracted into a new installation directory"""
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+        if self.__thread is not None:
+            self.__thread.join()
+        if self.__created_dir:
+            shutil.rmtree(self.install_dir, ignore_errors=True)
+
+    def finish(self):
+        """
+        Waits for the extraction to reach the end of the finished download and applies permissions and links.
+
+        Raises the error that stopped the extraction if any, the caller is expected to extract the installer the
+        regular way then.
+        """
+        self.complete()
+        if self.__thread is not None:
+            self.__thread.join()
+        if self.error is not None:
+            raise self.error
+        directories = []
+        with open_installer_data(self.installer) as data, zipfile.ZipFile(data) as archive:
+            for info in archive.infolist():
+                name = info.filename
+                if not name.startswith(self.prefix) or len(name) <= len(self.prefix):
+                    continue
+                if name not in self.extracted:
+                    raise StreamingNotSupported("{} was not extracted".format(name))
+                target = self.__get_output(name)
+                mode = info.external_attr >> 16
+                if info.is_dir():
+                    directories.append((target, mode))
+                elif stat.S_ISLNK(mode):
+                    # the link target was extracted as the file contents
+                    with open(target, "r") as file:
+                        link = file.read()
+                    os.remove(target)
+                    os.symlink(link, target)
+                elif stat.S_IMODE(mode) != 0:
+                    os.chmod(target, stat.S_IMODE(mode))
+        for target, mode in reversed(directories):
+            if stat.S_IMODE(mode) != 0:
+                os.chmod(target, stat.S_IMODE(mode))
+        for name in DEFERRED_FILES:
+            part = "{}.part".format(os.path.join(self.install_dir, name))
+            if os.path.exists(part):
+                os.replace(part, os.path.join(self.install_dir, name))
+
+    def __run(self):
+        try:
+            self.__extract()
+        except StreamingCanceled:
+            pass
+        except Exception as e:
+            self.error = e
+            print("Could not extract {} while downloading. Cause: {}".format(self.installer, e))
+
+    def __wait_for(self, fd: int, size: int, exact: bool = True):
+        with self.__condition:
+            while True:
+                if self.__stopped:
+                    raise StreamingCanceled()
+                # read the flag before the size, the file is complete once it is set
+                completed = self.__completed
+                if fd is None:
+                    if os.path.exists(self.installer):
+                        return
+                elif os.fstat(fd).st_size >= size:
+                    return
+                if completed:
+                    if fd is not None and not exact:
+                        return
+                    raise EOFError("{} ended before byte {}".format(self.installer, size))
+                # downloads don't always report their progress, check the file now and then
+                self.__condition.wait(1)
+
+    def __get_target(self, name: str) -> str:
+        target = os.path.normpath(os.path.join(self.install_dir, name[len(self.prefix):]))
+        # never write outside of the installation directory
+        if os.path.commonpath([self.install_dir, target]) != self.install_dir:
+            raise zipfile.BadZipFile("{} has an invalid member {}".format(self.installer, name))
+        return target
+
+    def __get_output(self, name: str) -> str:
+        target = self.__get_target(name)
+        if os.path.relpath(target, self.install_dir) in DEFERRED_FILES:
+            return "{}.part".format(target)
+        return target
+
+    def __extract(self):
+        self.__wait_for(None, 0)
+        with open(self.installer, "rb") as installer:
+            fd = installer.fileno()
+            offset = self.__get_data_offset(fd)
+            while True:
+                self.__wait_for(fd, offset + LOCAL_HEADER.size)
+                signature, version, flags, method, mtime, mdate, crc, compressed_size, size, name_length, \
+                    extra_length = LOCAL_HEADER.unpack(os.pread(fd, LOCAL_HEADER.size, offset))
+                if signature != LOCAL_HEADER_SIGNATURE:
+                    # the central directory starts after the last member
+                    return
+                if flags & 0x01:
+                    raise StreamingNotSupported("Encrypted members can't be extracted")
+                if flags & 0x08:
+                    raise StreamingNotSupported("Member sizes are only known after the member data")
+                self.__wait_for(fd, offset + LOCAL_HEADER.size + name_length + extra_length)
+                name = os.pread(fd, name_length, offset + LOCAL_HEADER.size)
+                name = name.decode("utf-8" if flags & 0x800 else "cp437")
+                extra = os.pread(fd, extra_length, offset + LOCAL_HEADER.size + name_length)
+                if compressed_size == 0xFFFFFFFF or size == 0xFFFFFFFF:
+                    size, compressed_size = self.__read_zip64_sizes(extra, size, compressed_size)
+                data_offset = offset + LOCAL_HEADER.size + name_length + extra_length
+                if name.startswith(self.prefix) and len(name) > len(self.prefix):
+                    self.__extract_member(fd, name, method, crc, data_offset, compressed_size)
+                offset = data_offset + compressed_size
+
+    def __get_data_offset(self, fd: int) -> int:
+        self.__wait_for(fd, SCRIPT_READ_SIZE, exact=False)
+        header = os.pread(fd, SCRIPT_READ_SIZE, 0)
+        offset_match = OFFSET_RE.search(header[:10240].decode("utf-8", errors="ignore"))
+        if offset_match is None:
+            raise StreamingNotSupported("{} is not a makeself installer".format(self.installer))
+        script_size = 0
+        for line in range(0, int(offset_match.group(1))):
+            script_size = header.find(b"\n", script_size) + 1
+            if script_size == 0:
+                raise StreamingNotSupported("The makeself script of {} is too long".format(self.installer))
+        filesize_match = FILESIZE_RE.search(header[:script_size].decode("utf-8", errors="ignore"))
+        if filesize_match is None:
+            raise StreamingNotSupported("{} has no MojoSetup archive size".format(self.installer))
+        return script_size + int(filesize_match.group(1))
+
+    def __read_zip64_sizes(self, extra: bytes, size: int, compressed_size: int) -> tuple:
+        position = 0
+        while position + 4 <= len(extra):
+            extra_id, extra_size = struct.unpack("<HH", extra[position:position + 4])
+            if extra_id == ZIP64_EXTRA_ID:
+                values = extra[position + 4:position + 4 + extra_size]
+                if size == 0xFFFFFFFF:
+                    size = struct.unpack("<Q", values[:8])[0]
+                    values = values[8:]
+                if compressed_size == 0xFFFFFFFF:
+                    compressed_size = struct.unpack("<Q", values[:8])[0]
+                return size, compressed_size
+            position += 4 + extra_size
+        raise zipfile.BadZipFile("{} has a member without its ZIP64 sizes".format(self.installer))
+
+    def __extract_member(self, fd: int, name: str, method: int, crc: int, offset: int, compressed_size: int):
+        target = self.__get_target(name)
+        if name.endswith("/"):
+            os.makedirs(target, mode=0o755, exist_ok=True)
+            self.extracted.add(name)
+            return
+        if method == zipfile.ZIP_DEFLATED:
+            decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+        elif method == zipfile.ZIP_STORED:
+            decompressor = None
+        else:
+            raise StreamingNotSupported("Compression method {} of {} is not supported".format(method, name))
+        os.makedirs(os.path.dirname(target), mode=0o755, exist_ok=True)
+        target = self.__get_output(name)
+        if os.path.lexists(target) and not os.path.isdir(target):
+            # never write through links of a previous installation
+            os.remove(target)
+        checksum = 0
+        with open(target, "wb") as destination:
+            position = offset
+            end = offset + compressed_size
+            while position < end:
+                count = min(READ_CHUNK_SIZE, end - position)
+                self.__wait_for(fd, position + count)
+                chunk = os.pread(fd, count, position)
+                position += len(chunk)
+                if decompressor is not None:
+                    chunk = decompressor.decompress(chunk)
+                checksum = zlib.crc32(chunk, checksum)
+                destination.write(chunk)
+            if decompressor is not None:
+                chunk = decompressor.flush()
+                checksum = zlib.crc32(chunk, checksum)
+                destination.write(chunk)
+        if checksum != crc:
+            raise zipfile.BadZipFile("Bad CRC-32 for {}".format(name))
+        self.extracted.add(name)
@@ -15,6 +15,8 @@ from goodoldgalaxy.api import Api
 from goodoldgalaxy.game import Game
 from goodoldgalaxy.config import Config
 from goodoldgalaxy.launcher import start_game, config_game
+from goodoldgalaxy.playtime import PlayTime
+from goodoldgalaxy.sampler import get_sampler
 from goodoldgalaxy.download import Download
 from goodoldgalaxy.download_manager import DownloadManager
 from goodoldgalaxy.constants import IETF_DOWNLOAD_LANGUAGES, DL_TYPES, BONUS_TYPES, DOWNLOAD_LANGUAGES_TO_GOG_CODE
@@ -45,6 +47,8 @@ class Details(Gtk.Viewport):
     release_date_header = Gtk.Template.Child()
     release_date_label = Gtk.Template.Child()
     installed_version_label = Gtk.Template.Child()
+    resource_usage_header = Gtk.Template.Child()
+    resource_usage_label = Gtk.Template.Child()
     button = Gtk.Template.Child()
     update_icon = Gtk.Template.Child()
     menu_button = Gtk.Template.Child()
@@ -55,6 +59,7 @@ class Details(Gtk.Viewport):
     menu_button_support = Gtk.Template.Child()
     menu_button_uninstall = Gtk.Template.Child()
     menu_button_open = Gtk.Template.Child()
+    menu_button_export_usage = Gtk.Template.Child()
     media_bar = Gtk.Template.Child()
     media_flowbox = Gtk.Template.Child()
     downloads_header = Gtk.Template.Child()
@@ -181,6 +186,9 @@ class Details(Gtk.Viewport):
             self.installed_version_label.set_text(game.installed_version)
         else:
             self.installed_version_label.hide()
+
+        # Show the resource usage of the last play session
+        self.update_resource_usage()
         
         # Handle game languages
         languages = ""
@@ -796,7 +804,7 @@ class Details(Gtk.Viewport):
         if self.current_state in dont_act_in_states:
             return
         elif self.current_state == self.game.state.INSTALLED or self.current_state == self.game.state.UPDATABLE:
-            start_game(self.game, self.parent)
+            start_game(self.game, self.parent, exit_func=lambda game: self.update_resource_usage())
         elif self.current_state == self.game.state.INSTALLABLE:
             install_thread = threading.Thread(target=self.__install)
             install_thread.start()
@@ -830,6 +838,44 @@ class Details(Gtk.Viewport):
     def on_menu_button_open_files(self, widget):
         subprocess.call(["xdg-open", self.__get_install_dir()])
 
+    @Gtk.Template.Callback("on_menu_button_export_usage_clicked")
+    def on_menu_button_export_usage(self, widget):
+        sampler = get_sampler(PlayTime.get_key(self.game))
+        if sampler is None:
+            return
+        dialog:Gtk.FileChooserDialog = Gtk.FileChooserDialog(_("Export Resource Usage"),self.parent,action=Gtk.FileChooserAction.SAVE,buttons=(Gtk.STOCK_CANCEL,Gtk.ResponseType.CANCEL, Gtk.STOCK_SAVE, Gtk.ResponseType.ACCEPT))
+        dialog.set_do_overwrite_confirmation(True)
+        dialog.set_current_name("{}-resource-usage.csv".format(self.game.get_install_directory_name()))
+        if dialog.run() == Gtk.ResponseType.ACCEPT:
+            try:
+                sampler.export_csv(dialog.get_filename())
+            except OSError as e:
+                print("Could not export the resource usage to {}. Cause: {}".format(dialog.get_filename(), e))
+        dialog.destroy()
+
+    def update_resource_usage(self):
+        """
+        Shows the summary of the resource usage sampled during the running or last play session of the game.
+        """
+        sampler = get_sampler(PlayTime.get_key(self.game))
+        if sampler is None:
+            self.resource_usage_header.hide()
+            self.resource_usage_label.hide()
+            self.menu_button_export_usage.hide()
+            return
+        summary = sampler.summary()
+        self.resource_usage_label.set_text(
+            _("CPU {}% average, {}% peak\nMemory {} average, {} peak\nRead {}, written {} in {} minutes").format(
+                summary["cpu_average"], summary["cpu_max"],
+                self.__sizeof_fmt(summary["rss_average"]), self.__sizeof_fmt(summary["rss_max"]),
+                self.__sizeof_fmt(summary["read_bytes"]), self.__sizeof_fmt(summary["written_bytes"]),
+                summary["duration"] // 60
+            )
+        )
+        self.resource_usage_header.show()
+        self.resource_usage_label.show()
+        self.menu_button_export_usage.show()
+
     @Gtk.Template.Callback("on_menu_button_support_clicked")
     def on_menu_button_support(self, widget):
         try:
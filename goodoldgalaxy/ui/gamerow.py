@@ -244,6 +244,7 @@ class GameRow(Gtk.Box):
 
             if self.progress_bar:
                 self.progress_bar.destroy()
+                self.progress_bar = None
 
         elif state == self.game.state.QUEUED or state == self.game.state.UPDATE_QUEUED:
             self.button.set_sensitive(False)
@@ -261,8 +262,11 @@ class GameRow(Gtk.Box):
             self.button.set_sensitive(False)
             self.image.set_sensitive(True)
 
-            if self.progress_bar:
-                self.progress_bar.destroy()
+            # the progress bar now follows the installation
+            if not self.progress_bar:
+                self.__create_progress_bar()
+            self.progress_bar.set_fraction(0.0)
+            self.progress_bar.show_all()
 
             self.parent.filter_library()
 
@@ -273,6 +277,7 @@ class GameRow(Gtk.Box):
 
             if self.progress_bar:
                 self.progress_bar.destroy()
+                self.progress_bar = None
 
         elif state == self.game.state.UNINSTALLING:
             self.button.set_sensitive(False)
@@ -245,6 +245,7 @@ class GameTile(Gtk.Box):
             
             if self.progress_bar:
                 self.progress_bar.destroy()
+                self.progress_bar = None
 
         elif state == self.game.state.QUEUED or state == self.game.state.UPDATE_QUEUED:
             self.button.set_sensitive(False)
@@ -262,8 +263,11 @@ class GameTile(Gtk.Box):
             self.button.set_sensitive(False)
             self.image.set_sensitive(True)
 
-            if self.progress_bar:
-                self.progress_bar.destroy()
+            # the progress bar now follows the installation
+            if not self.progress_bar:
+                self.__create_progress_bar()
+            self.progress_bar.set_fraction(0.0)
+            self.progress_bar.show_all()
 
             self.parent.filter_library()
 
@@ -274,6 +278,7 @@ class GameTile(Gtk.Box):
 
             if self.progress_bar:
                 self.progress_bar.destroy()
+                self.progress_bar = None
 
         elif state == self.game.state.UNINSTALLING:
             self.button.set_sensitive(False)
@@ -3,10 +3,12 @@ import gi
 gi.require_version('Gtk', '3.0')
 from gi.repository import Gtk, GLib
 import os
+import time
 from goodoldgalaxy.translation import _
 from goodoldgalaxy.paths import UI_DIR
 from goodoldgalaxy.download import Download
 from goodoldgalaxy.download_manager import DownloadManager
+from goodoldgalaxy.playtime import PlayTime
 
 
 @Gtk.Template.from_file(os.path.join(UI_DIR, "installedrow.ui"))
@@ -29,7 +31,7 @@ class InstalledRow(Gtk.Box):
         self.title_label.set_text(self.game.name)
         self.current_state = self.game.state
         
-        self.last_played_label.set_text(_("Not yet played"))
+        self.update_last_played()
 
         self.load_icon()
 
@@ -62,6 +64,19 @@ class InstalledRow(Gtk.Box):
             return True
         return False
 
+    def update_last_played(self):
+        last_played = PlayTime.get_last_played(self.game)
+        if last_played == 0:
+            self.last_played_label.set_text(_("Not yet played"))
+            return
+        minutes = PlayTime.get_total(self.game) // 60
+        if minutes < 60:
+            playtime = _("{} min").format(minutes)
+        else:
+            playtime = _("{} h {} min").format(minutes // 60, minutes % 60)
+        self.last_played_label.set_text(_("Last played {}, {} in total").format(
+            time.strftime("%x", time.localtime(last_played)), playtime))
+
     @Gtk.Template.Callback("on_row_button_release")
     def on_row_button_release(self, widget, event):
         self.parent.show_game_details(self.game)
@@ -89,10 +104,18 @@ class InstalledRow(Gtk.Box):
             if not self.progress_bar:
                 self.__create_progress_bar()
             self.progress_bar.show_all()
+        elif state == self.game.state.INSTALLING or state == self.game.state.UPDATING:
+            self.image.set_sensitive(True)
+            # the progress bar now follows the installation
+            if not self.progress_bar:
+                self.__create_progress_bar()
+            self.progress_bar.set_fraction(0.0)
+            self.progress_bar.show_all()
         else:
             self.image.set_sensitive(True)
             if self.progress_bar:
                 self.progress_bar.destroy()
+                self.progress_bar = None
         self.update_options()
 
     def update_options(self):
@@ -123,21 +123,55 @@ class Library(Gtk.Viewport):
         # handle genres
         cats = self.library.genres
         tags = self.library.tags
-        for child in self.genrebox.get_children():
-            self.genrebox.remove(child)
-        for child in self.tagsbox.get_children():
-            self.tagsbox.remove(child)
-        for cat in cats:
-            ck = Gtk.CheckButton(cat)
-            ck.connect("toggled",self.library_changed)
-            self.genrebox.pack_start(ck,False,True,10)
-        for tag in tags:
-            ck = Gtk.CheckButton(tag)
-            ck.connect("toggled",self.library_changed)
-            self.tagsbox.pack_start(ck,False,True,10)
+        # keep the current selection, and the check buttons themselves if nothing changed
+        if tuple(child.get_label() for child in self.genrebox.get_children()) != tuple(cats):
+            active = self.__get_selected_genres() or []
+            for child in self.genrebox.get_children():
+                self.genrebox.remove(child)
+            for cat in cats:
+                ck = Gtk.CheckButton(cat)
+                ck.set_active(cat in active)
+                ck.connect("toggled",self.library_changed)
+                self.genrebox.pack_start(ck,False,True,10)
+        if tuple(child.get_label() for child in self.tagsbox.get_children()) != tuple(tags):
+            active = self.__get_selected_tags() or []
+            for child in self.tagsbox.get_children():
+                self.tagsbox.remove(child)
+            for tag in tags:
+                ck = Gtk.CheckButton(tag)
+                ck.set_active(tag in active)
+                ck.connect("toggled",self.library_changed)
+                self.tagsbox.pack_start(ck,False,True,10)
         self.genrebox.show_all()
         self.tagsbox.show_all()
-  
+
+    def __reconcile_tiles(self, container, add_func, tile_attr):
+        """
+        Brings the tiles in a container in line with the library, reusing the tiles of games that are still there.
+
+        Parameters:
+        -----------
+            container: Gtk.Container -> List box or flow box holding the tiles
+            add_func: Function that creates and adds the tile for a new game
+            tile_attr: str -> Game attribute that references the tile
+        """
+        children = {}
+        for child in container.get_children():
+            tile = child.get_children()[0]
+            children[(tile.game.id, tile.game.name)] = child
+        for game in self.library.games:
+            child = children.pop((game.id, game.name), None)
+            if child is None:
+                add_func(game)
+                continue
+            tile = child.get_children()[0]
+            tile.game = game
+            setattr(game, tile_attr, tile)
+            tile.reload_state()
+        # remove tiles of games that are gone
+        for child in children.values():
+            container.remove(child)
+
     def view_as_list(self):
         self.reset()
         # add it to the viewport
@@ -146,16 +180,10 @@ class Library(Gtk.Viewport):
         GLib.idle_add(self.__create_gamerow)
             
     def __create_gamerow(self) -> None:
-        # remove any existing children from the listbox
-        for child in self.listbox.get_children():
-            self.listbox.remove(child)
-        # get filtered games
-        filtered_games = self.library.get_games()
         self.__update_popovers()
         # create rows
-        for game in filtered_games:
-            self.__add_gamerow(game)
-            
+        self.__reconcile_tiles(self.listbox, self.__add_gamerow, "list_tile")
+
         self.sort_library()
         self.listbox.show_all()
 
@@ -171,16 +199,10 @@ class Library(Gtk.Viewport):
         GLib.idle_add(self.__create_gametile)
 
     def __create_gametile(self) -> None:
-        # remove any existing children from the listbox
-        for child in self.flowbox.get_children():
-            self.flowbox.remove(child)
-        # get filtered games
-        filtered_games = self.library.get_games()
         self.__update_popovers()
-        # create rows
-        for game in filtered_games:
-            self.__add_gametile(game)
-        
+        # create tiles
+        self.__reconcile_tiles(self.flowbox, self.__add_gametile, "grid_tile")
+
         self.sort_library()
         self.flowbox.show_all()
 
@@ -28,6 +28,9 @@ class Preferences(Gtk.Dialog):
     button_save = Gtk.Template.Child()
     switch_do_not_show_backgrounds = Gtk.Template.Child()
     switch_do_not_show_media_tab = Gtk.Template.Child()
+    switch_resource_sampling = Gtk.Template.Child()
+    switch_warmup_game_files = Gtk.Template.Child()
+    switch_install_while_downloading = Gtk.Template.Child()
     
 
     def __init__(self, parent):
@@ -44,6 +47,9 @@ class Preferences(Gtk.Dialog):
         self.switch_automatic_updates.set_active(Config.get("automatic_updates"))
         self.switch_do_not_show_backgrounds.set_active(Config.get("do_not_show_backgrounds"))
         self.switch_do_not_show_media_tab.set_active(Config.get("do_not_show_media_tab"))
+        self.switch_resource_sampling.set_active(Config.get("resource_sampling"))
+        self.switch_warmup_game_files.set_active(Config.get("warmup_game_files"))
+        self.switch_install_while_downloading.set_active(Config.get("install_while_downloading"))
 
         # Set tooltip for keep installers label
         installer_dir = os.path.join(self.button_file_chooser.get_filename(), "installer")
@@ -123,6 +129,9 @@ class Preferences(Gtk.Dialog):
         Config.set("automatic_updates", self.switch_automatic_updates.get_active())
         Config.set("do_not_show_backgrounds",self.switch_do_not_show_backgrounds.get_active())
         Config.set("do_not_show_media_tab",self.switch_do_not_show_media_tab.get_active())
+        Config.set("resource_sampling", self.switch_resource_sampling.get_active())
+        Config.set("warmup_game_files", self.switch_warmup_game_files.get_active())
+        Config.set("install_while_downloading", self.switch_install_while_downloading.get_active())
 
         if self.switch_show_windows_games.get_active() != Config.get("show_windows_games"):
             Config.set("show_windows_games", self.switch_show_windows_games.get_active())
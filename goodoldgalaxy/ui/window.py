@@ -13,14 +13,20 @@ from goodoldgalaxy.game import Game
 from goodoldgalaxy.config import Config
 from goodoldgalaxy.paths import UI_DIR, LOGO_IMAGE_PATH, THUMBNAIL_DIR, CACHE_DIR
 from goodoldgalaxy.library import Library
+from goodoldgalaxy.watcher import InstallDirWatcher
+from goodoldgalaxy.scheduler import RefreshScheduler
 from goodoldgalaxy.ui.installedrow import InstalledRow
 from goodoldgalaxy.ui.downloadrow import DownloadRow
 from goodoldgalaxy.ui.library import Library as LibraryView
 from goodoldgalaxy.ui.details import Details
 from zipfile import BadZipFile
-from goodoldgalaxy.installer import uninstall_game, install_game
+from goodoldgalaxy.installer import uninstall_game, install_game, empty_trash, InstallProgress, \
+    CannotOpenZipContent, InsufficientDiskSpace
+from goodoldgalaxy.streamextract import StreamExtractor
+from goodoldgalaxy.installer_store import InstallerStore
 from goodoldgalaxy.download import Download
 from goodoldgalaxy.download_manager import DownloadManager
+from goodoldgalaxy.playtime import PlayTime
 
 @Gtk.Template.from_file(os.path.join(UI_DIR, "application.ui"))
 class Window(Gtk.ApplicationWindow):
@@ -60,6 +66,9 @@ class Window(Gtk.ApplicationWindow):
         icon = GdkPixbuf.Pixbuf.new_from_file(LOGO_IMAGE_PATH)
         self.set_default_icon_list([icon])
         self.installed_search.connect("search-changed",self.filter_installed)
+        # most recently played games first
+        self.installed_list.set_sort_func(self.__sort_installed_func)
+        PlayTime.register_listener(self.__game_played)
         self.selection_button.hide()
 
         # Show the window
@@ -74,11 +83,19 @@ class Window(Gtk.ApplicationWindow):
         if not os.path.exists(THUMBNAIL_DIR):
             os.makedirs(THUMBNAIL_DIR)
 
-        # Interact with the API
-        self.__authenticate()
-        self.user_photo.set_tooltip_text(self.api.get_user_info(self.__set_avatar))
-        self.sync_library()
-        
+        # Finish deleting games uninstalled in a previous session
+        empty_trash()
+
+        # Follow changes to the installation directory
+        self.watcher = InstallDirWatcher(self.library)
+        self.watcher.register_listener(self.__installed_games_changed)
+        self.watcher.start()
+
+        # Show the library of the last session right away, live data is reconciled once synchronized
+        if self.library.load_snapshot():
+            self.__update_installed_rows()
+            self.update_library_view()
+
         # Check what was the last view
         if Config.get("last_view") == "Game":
             print("last view as game..")
@@ -88,6 +105,31 @@ class Window(Gtk.ApplicationWindow):
         # Register self as a download manager listener
         DownloadManager.register_listener(self.__download_listener_func)
 
+        # Keep the library up to date in the background
+        self.scheduler = RefreshScheduler()
+        self.scheduler.add_job("library", self.__refresh_library, "library_refresh_interval")
+        self.scheduler.add_job("installed games", self.__refresh_installed_games, "installed_refresh_interval", network=False)
+        self.scheduler.add_job("updates", self.__refresh_updates, "updates_refresh_interval")
+
+        # Interact with the API in the background, the library snapshot stays usable meanwhile
+        connect_thread = threading.Thread(target=self.__connect)
+        # don't keep the application running while waiting for a login that will never come
+        connect_thread.daemon = True
+        connect_thread.start()
+
+    def __connect(self):
+        self.__authenticate()
+        try:
+            GLib.idle_add(self.user_photo.set_tooltip_text, self.api.get_user_info(self.__set_avatar))
+        except Exception as ex:
+            print("Could not get the user information. Cause: {}".format(ex))
+        try:
+            self.__sync_library()
+            # Start download if goodoldgalaxy was closed while downloading this game, only once per session
+            self.resume_download_if_expected()
+        finally:
+            self.scheduler.start()
+
     def get_screen_resolution(self, measurement="px"):
         """
         Tries to detect the screen resolution from the system.
@@ -239,7 +281,21 @@ class Window(Gtk.ApplicationWindow):
         if game.platform is None:
             game.platform = operating_system
         
+        # kept installers don't need to be downloaded again, nor GOG to be asked about them
+        stored_info = self.__find_stored_installer(game, operating_system)
+        if stored_info is not None:
+            game.download_info = stored_info
+            Config.unset("current_download")
+            self.__install(game)
+            return
+
         download_info = self.api.get_download_info(game,operating_system=operating_system)
+        game.download_info = download_info
+
+        if InstallerStore.find(game.id, download_info["os"], download_info["language"], download_info["version"]):
+            Config.unset("current_download")
+            self.__install(game)
+            return
 
         # Start the download for all files
         game.downloads = []
@@ -247,7 +303,7 @@ class Window(Gtk.ApplicationWindow):
         finish_func = self.__install
         for key, file_info in enumerate(download_info['files']):
             if key > 0:
-                download_path = "{}-{}.bin".format(self.download_path, key)
+                download_path = "{}-{}.bin".format(game.download_path, key)
             download = Download(
                 url=self.api.get_real_download_link(file_info["downlink"]),
                 title=download_info["name"],
@@ -262,17 +318,51 @@ class Window(Gtk.ApplicationWindow):
             download.register_cancel_function(self.__cancel_download,game)
             game.downloads.append(download)
 
+        # extract single file Linux installers while they download
+        game.stream_extractor = None
+        if Config.get("install_while_downloading") and game.platform == "linux" and len(game.downloads) == 1 \
+                and not os.path.exists(game.download_path) and not os.path.exists(game.keep_path):
+            game.stream_extractor = StreamExtractor(game.download_path, game.get_install_dir())
+            game.downloads[0].register_progress_function(game.stream_extractor.notify)
+            game.downloads[0].register_cancel_function(game.stream_extractor.cancel)
+            game.stream_extractor.start()
+
         DownloadManager.download(game.downloads)
 
+    def __find_stored_installer(self, game: Game, operating_system: str) -> dict:
+        # the same installer get_download_info prefers: Windows when there is no Linux one, the configured language
+        # or English
+        operating_systems = [operating_system]
+        if operating_system == "linux":
+            operating_systems.append("windows")
+        for installer_os in operating_systems:
+            for language in (Config.get("lang"), "en"):
+                stored_info = InstallerStore.find_info(game.id, installer_os, language)
+                if stored_info is not None:
+                    return stored_info
+        return None
+
     def __install(self, game: Game = None):
         GLib.idle_add(self.__update_to_state, game.state.INSTALLING, game)
         game.install_dir = game.get_install_dir()
+        stream_extractor = game.stream_extractor
+        game.stream_extractor = None
+        stored = None
+        if game.download_info is not None:
+            stored = InstallerStore.find(game.id, game.download_info["os"], game.download_info["language"],
+                                         game.download_info["version"])
+        # installation progress is shown like the download progress
+        progress = InstallProgress()
+        progress.register_progress_function(self.set_progress, game)
         try:
-            if os.path.exists(game.keep_path):
-                install_game(game, game.keep_path, main_window=self)
+            if stored is not None:
+                install_game(game, stored, main_window=self, progress=progress)
+            elif os.path.exists(game.keep_path):
+                install_game(game, game.keep_path, main_window=self, progress=progress)
             else:
-                install_game(game, game.download_path, main_window=self)
-        except (FileNotFoundError, BadZipFile):
+                install_game(game, game.download_path, main_window=self, progress=progress,
+                             stream_extractor=stream_extractor)
+        except (FileNotFoundError, BadZipFile, CannotOpenZipContent, InsufficientDiskSpace):
             GLib.idle_add(self.__update_to_state, game.state.DOWNLOADABLE, game)
             return
         GLib.idle_add(self.__update_to_state, game.state.INSTALLED, game)
@@ -296,6 +386,7 @@ class Window(Gtk.ApplicationWindow):
                 # set dlc information now, otherwise this will break later
                 dlc.platform = game.platform
                 dlc.language = game.language
+                dlc.download_info = download_info
                 # add download
                 # Start the download for all files
                 for key, file_info in enumerate(download_info['files']):
@@ -324,12 +415,14 @@ class Window(Gtk.ApplicationWindow):
         if dlc is None:
             return
         # install DLC
+        progress = InstallProgress()
+        progress.register_progress_function(self.set_progress, game)
         try:
             if os.path.exists(dlc.keep_path):
-                install_game(dlc, dlc.keep_path, main_window=self)
+                install_game(dlc, dlc.keep_path, main_window=self, progress=progress)
             else:
-                install_game(dlc, dlc.download_path, main_window=self)
-        except (FileNotFoundError, BadZipFile):
+                install_game(dlc, dlc.download_path, main_window=self, progress=progress)
+        except (FileNotFoundError, BadZipFile, CannotOpenZipContent, InsufficientDiskSpace):
             # error, revert state
             return
         # No error, install was successful, as such update information
@@ -381,6 +474,7 @@ class Window(Gtk.ApplicationWindow):
         Config.set("current_download", game.id)
         GLib.idle_add(self.__update_to_state, game.state.UPDATE_QUEUED, game)
         download_info = self.api.get_download_info(game)
+        game.download_info = download_info
 
         # Start the download for all files
         game.downloads = []
@@ -388,32 +482,35 @@ class Window(Gtk.ApplicationWindow):
         finish_func = self.__update
         for key, file_info in enumerate(download_info['files']):
             if key > 0:
-                download_path = "{}-{}.bin".format(self.update_path, key)
+                download_path = "{}-{}.bin".format(game.update_path, key)
             download = Download(
                 url=self.api.get_real_download_link(file_info["downlink"]),
+                title=download_info["name"],
+                associated_object=game,
                 save_location=download_path,
-                finish_func=finish_func,
-                finish_func_args=game,
-                progress_func=self.set_progress,
-                progress_func_args=game,
-                cancel_func=self.__cancel_update,
-                cancel_func_args=game,
                 number=key+1,
+                file_size=download_info["total_size"],
                 out_of_amount=len(download_info['files'])
             )
+            download.register_finish_function(finish_func,game)
+            download.register_progress_function(self.set_progress,game)
+            download.register_cancel_function(self.__cancel_update,game)
             game.downloads.append(download)
 
         DownloadManager.download(game.downloads)
         
     def __update(self, game: Game = None):
         GLib.idle_add(self.__update_to_state, game.state.UPDATING, game)
-        game.install_dir = self.__get_install_dir(game)
+        game.install_dir = game.get_install_dir()
+        progress = InstallProgress()
+        progress.register_progress_function(self.set_progress, game)
         try:
+            # only the files that changed since the installation are written
             if os.path.exists(game.keep_path):
-                install_game(self.game, self.keep_path, parent_window=self.parent)
+                install_game(game, game.keep_path, main_window=self, progress=progress, update=True)
             else:
-                install_game(self.game, self.update_path, parent_window=self.parent)
-        except (FileNotFoundError, BadZipFile):
+                install_game(game, game.update_path, main_window=self, progress=progress, update=True)
+        except (FileNotFoundError, BadZipFile, CannotOpenZipContent, InsufficientDiskSpace):
             GLib.idle_add(self.__update_to_state, game.state.UPDATABLE, game)
             return
         # reset updates count flag
@@ -445,6 +542,67 @@ class Window(Gtk.ApplicationWindow):
         uninstall_game(game)
         GLib.idle_add(self.__update_to_state, game.state.DOWNLOADABLE, game)
         
+    def __installed_games_changed(self, event, games):
+        refresh_view = False
+        for game in games:
+            if game.installed == 1 and game.sidebar_tile is None:
+                game.sidebar_tile = InstalledRow(self, game, self.api)
+                self.installed_list.prepend(game.sidebar_tile)
+            elif game.installed == 0 and game.sidebar_tile is not None:
+                self.installed_list.remove(game.sidebar_tile.get_parent())
+                game.sidebar_tile = None
+            # games without tiles are new to the library, games not in it anymore were removed
+            if (game.list_tile is None and game.grid_tile is None) or game not in self.library.games:
+                refresh_view = True
+            self.__reload_state(game)
+        if refresh_view:
+            self.update_library_view()
+        else:
+            self.library_view.filter_library()
+
+    def __sort_installed_func(self, child1, child2):
+        game1 = child1.get_children()[0].game
+        game2 = child2.get_children()[0].game
+        last_played1 = PlayTime.get_last_played(game1)
+        last_played2 = PlayTime.get_last_played(game2)
+        if last_played1 != last_played2:
+            return last_played2 - last_played1
+        return (game1.name > game2.name) - (game1.name < game2.name)
+
+    def __game_played(self, game):
+        GLib.idle_add(self.__update_last_played, game)
+
+    def __update_last_played(self, game):
+        if game.sidebar_tile is not None:
+            game.sidebar_tile.update_last_played()
+        self.installed_list.invalidate_sort()
+        return False
+
+    def __update_installed_rows(self):
+        # reuse the rows of games that are still installed instead of recreating all of them
+        rows = {}
+        for child in self.installed_list.get_children():
+            row = child.get_children()[0]
+            rows[(row.game.id, row.game.name)] = child
+        for game in self.library.games:
+            if game.installed == 0:
+                continue
+            child = rows.pop((game.id, game.name), None)
+            if child is None:
+                if game.sidebar_tile is None:
+                    game.sidebar_tile = InstalledRow(self, game, self.api)
+                if game.sidebar_tile.get_parent() is None:
+                    self.installed_list.prepend(game.sidebar_tile)
+            else:
+                row = child.get_children()[0]
+                row.game = game
+                game.sidebar_tile = row
+                row.reload_state()
+        for child in rows.values():
+            self.installed_list.remove(child)
+        self.installed_list.show_all()
+        return False
+
     def __update_downloads(self):
         # disabled now
         for child in self.downloads_list.get_children():
@@ -509,21 +667,27 @@ class Window(Gtk.ApplicationWindow):
     def __sync_library(self):
         if self.library.offline:
             self.__authenticate()
-        for child in self.installed_list.get_children():
-            self.installed_list.remove(child)
         self.games=self.library.get_games(forced=True)
-        for game in self.games:
-            if game.installed == 0:
-                continue
-            if game.sidebar_tile is None:
-                game.sidebar_tile = InstalledRow(self, game, self.api)
-                GLib.idle_add(self.installed_list.prepend,game.sidebar_tile)
+        GLib.idle_add(self.__update_installed_rows)
         # update library view
         self.update_library_view()
-        
-        # Start download if goodoldgalaxy was closed while downloading this game
-        self.resume_download_if_expected()
+        # the installation directory may have changed
+        GLib.idle_add(self.watcher.start)
     
+    def __refresh_library(self):
+        self.__sync_library()
+        if self.library.offline:
+            raise ConnectionError("Could not reach GOG")
+
+    def __refresh_installed_games(self):
+        changed = self.library.refresh_installed_games()
+        if len(changed) > 0:
+            GLib.idle_add(self.__installed_games_changed, "updated", changed)
+
+    def __refresh_updates(self):
+        for game in self.library.check_for_updates():
+            GLib.idle_add(self.__reload_state, game)
+
     @Gtk.Template.Callback("on_menu_sync_clicked")
     def sync_library(self): 
         sync_thread = threading.Thread(target=self.__sync_library)
@@ -554,16 +718,31 @@ class Window(Gtk.ApplicationWindow):
             return
 
         while not authenticated:
-            login_url = self.api.get_login_url()
-            redirect_url = self.api.get_redirect_url()
-            login = Login(login_url=login_url, redirect_url=redirect_url, parent=self)
-            response = login.run()
-            login.hide()
-            if response == Gtk.ResponseType.DELETE_EVENT:
-                Gtk.main_quit()
-                exit(0)
-            if response == Gtk.ResponseType.NONE:
-                result = login.get_result()
+            result = self.__show_login()
+            if result is not None:
                 authenticated = self.api.authenticate(refresh_token=token, login_code=result)
 
         Config.set("refresh_token", authenticated)
+
+    def __show_login(self) -> str:
+        # the login dialog runs on the GTK main loop, other threads wait for it there
+        if threading.current_thread() is not threading.main_thread():
+            done = threading.Event()
+            result = []
+            def show_login():
+                result.append(self.__show_login())
+                done.set()
+                return False
+            GLib.idle_add(show_login)
+            done.wait()
+            return result[0]
+        login = Login(login_url=self.api.get_login_url(), redirect_url=self.api.get_redirect_url(), parent=self)
+        response = login.run()
+        login.hide()
+        if response == Gtk.ResponseType.DELETE_EVENT:
+            Gtk.main_quit()
+            Config.flush()
+            exit(0)
+        if response == Gtk.ResponseType.NONE:
+            return login.get_result()
+        return None
@@ -0,0 +1,202 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from goodoldgalaxy.paths import WARMUP_DIR
+from goodoldgalaxy.constants import WARMUP_RECORD_DURATION, WARMUP_RECORD_INTERVAL, WARMUP_MAX_SIZE
+
+
+def get_open_files(pid: int) -> list:
+    """
+    Gets the files a process has open or mapped into memory, from /proc/<pid>/fd and /proc/<pid>/maps.
+
+    Parameters:
+    -----------
+        pid: int -> Process id
+
+    Return:
+    -------
+        list: Absolute paths of the files, empty if the process doesn't exist
+    """
+    files = []
+    fd_dir = "/proc/{}/fd".format(pid)
+    try:
+        fds = os.listdir(fd_dir)
+    except OSError:
+        return files
+    for fd in fds:
+        try:
+            files.append(os.readlink(os.path.join(fd_dir, fd)))
+        except OSError:
+            # the file was closed
+            continue
+    try:
+        with open("/proc/{}/maps".format(pid), "r") as file:
+            for line in file:
+                # address, permissions, offset, device, inode and path
+                fields = line.split(maxsplit=5)
+                if len(fields) == 6 and fields[5].startswith("/"):
+                    files.append(fields[5].rstrip("\n"))
+    except OSError:
+        pass
+    return files
+
+
+def get_warmup_files(game) -> list:
+    """
+    Gets the files a game read while starting, as recorded on its previous launch.
+
+    Parameters:
+    -----------
+        game: Game -> Installed game
+
+    Return:
+    -------
+        list: Paths of the files, in the order they were opened, empty if the launch wasn't recorded yet
+    """
+    try:
+        with open(__get_warmup_path(game.install_dir), "r") as file:
+            return json.load(file)["files"]
+    except (OSError, ValueError, KeyError, TypeError):
+        return []
+
+
+def save_warmup_files(game, files: list):
+    """
+    Saves the files a game read while starting, for the next launch to warm up.
+
+    Parameters:
+    -----------
+        game: Game -> Installed game
+        files: list -> Paths of the files, in the order they were opened
+    """
+    path = __get_warmup_path(game.install_dir)
+    tmp_path = "{}.tmp".format(path)
+    try:
+        os.makedirs(WARMUP_DIR, mode=0o755, exist_ok=True)
+        with open(tmp_path, "w") as file:
+            json.dump({"install_dir": game.install_dir, "files": files}, file)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print("Could not save the warmup files of {}. Cause: {}".format(game.name, e))
+
+
+def warm_up(game) -> threading.Thread:
+    """
+    Asks the kernel to read the files recorded for a game into the page cache, in a background thread, so the game
+    finds them there instead of reading them piece by piece while it starts.
+
+    Reading ahead is only a hint, it doesn't wait for the data to arrive. Files are hinted in the order of their inode
+    numbers, which roughly follows their location on disk, up to WARMUP_MAX_SIZE bytes.
+
+    Parameters:
+    -----------
+        game: Game -> Installed game
+
+    Return:
+    -------
+        threading.Thread: Thread hinting the files, None if there is nothing to warm up
+    """
+    files = get_warmup_files(game)
+    if len(files) == 0:
+        return None
+    warm_up_thread = threading.Thread(target=__warm_up_files, args=(game.name, files))
+    warm_up_thread.daemon = True
+    warm_up_thread.start()
+    return warm_up_thread
+
+
+def __warm_up_files(name: str, files: list):
+    started = time.monotonic()
+    stats = []
+    for path in files:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            # removed since the launch was recorded
+            continue
+        stats.append((stat.st_dev, stat.st_ino, stat.st_size, path))
+    stats.sort()
+    count = 0
+    size = 0
+    for _, _, file_size, path in stats:
+        if size + file_size > WARMUP_MAX_SIZE:
+            continue
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except OSError:
+            continue
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            count += 1
+            size += file_size
+        except OSError:
+            pass
+        finally:
+            os.close(fd)
+    print("Warmed up {} files ({} MiB) of {} in {:.2f} seconds".format(count, size // 1024**2, name,
+                                                                       time.monotonic() - started))
+
+
+class WarmupRecorder:
+    """
+    Records the files of a game its processes open while it starts, for warm_up to read ahead on the next launch.
+
+    For the first WARMUP_RECORD_DURATION seconds after the launch, the open and memory mapped files of the game
+    processes are listed every WARMUP_RECORD_INTERVAL seconds from /proc. Only regular files in the installation
+    directory of the game are recorded, system libraries are usually cached already.
+
+    Parameters:
+    -----------
+        game: Game -> Started game
+        tracker: ProcessTracker -> Tracker of the processes of the game
+    """
+
+    def __init__(self, game, tracker):
+        self.game = game
+        self.tracker = tracker
+        self.files = []
+        self.__seen = set()
+        self.__prefix = os.path.join(game.install_dir, "")
+        self.__stop = threading.Event()
+        self.__thread = None
+
+    def start(self):
+        """
+        Starts recording in a background thread.
+        """
+        self.__thread = threading.Thread(target=self.__run)
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def stop(self):
+        """
+        Stops recording early, when the game exited. What was recorded so far is saved.
+        """
+        self.__stop.set()
+
+    def __run(self):
+        deadline = time.monotonic() + WARMUP_RECORD_DURATION
+        while True:
+            self.record()
+            if self.__stop.wait(WARMUP_RECORD_INTERVAL) or time.monotonic() >= deadline:
+                break
+        if len(self.files) > 0:
+            save_warmup_files(self.game, self.files)
+
+    def record(self):
+        """
+        Adds the files the game processes have open right now.
+        """
+        for pid in self.tracker.get_pids():
+            for path in get_open_files(pid):
+                if path in self.__seen or not path.startswith(self.__prefix):
+                    continue
+                self.__seen.add(path)
+                if os.path.isfile(path):
+                    self.files.append(path)
+
+
+def __get_warmup_path(install_dir: str) -> str:
+    return os.path.join(WARMUP_DIR, "{}.json".format(hashlib.sha1(install_dir.encode("utf-8")).hexdigest()))
@@ -0,0 +1,138 @@
+import os
+import re
+import gi
+gi.require_version('Gio', '2.0')
+from gi.repository import Gio
+from goodoldgalaxy.config import Config
+from goodoldgalaxy.library import Library
+
+GAME_INFO_RE = re.compile(r'^(gameinfo|goggame-[0-9]*\.info)$')
+
+
+class InstallDirWatcher:
+    """
+    Watches the installation directory for changes.
+
+    Directory monitors are backed by inotify through Gio, so nothing is polled. The installation directory itself is
+    watched for games being added or removed, each game directory is watched for changes to its gameinfo and
+    goggame-*.info files. Changes are applied to the library and reported to the registered listeners.
+
+    Events are delivered on the GLib main loop.
+    """
+
+    def __init__(self, library: Library):
+        self.library = library
+        self.install_dir = None
+        self.__root_monitor = None
+        self.__game_monitors = {}
+        self.__listeners = []
+
+    def register_listener(self, listener_func):
+        """
+        Register a listener function that wants to be let know about installation changes.
+
+        Parameters:
+        -----------
+            listener_func: lambda -> Listener function that receives the event ("added", "updated" or "removed")
+                                     and the list of affected games
+        """
+        if listener_func is None:
+            return
+        self.__listeners.append(listener_func)
+
+    def unregister_listener(self, listener_func):
+        """
+        Unregister a listener function.
+
+        Parameters:
+        -----------
+            listener_func: lambda -> Listener function to unregister
+        """
+        if listener_func is None or listener_func not in self.__listeners:
+            return
+        self.__listeners.remove(listener_func)
+
+    def start(self):
+        """Starts watching the configured installation directory, restarting the watch if it was changed."""
+        install_dir = Config.get("install_dir")
+        if self.__root_monitor is not None and install_dir == self.install_dir:
+            return
+        self.stop()
+        if not os.path.isdir(install_dir):
+            return
+        self.install_dir = install_dir
+        self.__root_monitor = self.__monitor(install_dir, self.__on_root_changed)
+        for directory in os.listdir(install_dir):
+            full_path = os.path.join(install_dir, directory)
+            if self.__is_game_dir(full_path):
+                self.__watch_game_dir(full_path)
+
+    def stop(self):
+        """Stops watching the installation directory."""
+        if self.__root_monitor is not None:
+            self.__root_monitor.cancel()
+            self.__root_monitor = None
+        for monitor in self.__game_monitors.values():
+            monitor.cancel()
+        self.__game_monitors = {}
+        self.install_dir = None
+
+    def __monitor(self, path, callback):
+        monitor = Gio.File.new_for_path(path).monitor_directory(Gio.FileMonitorFlags.WATCH_MOVES, None)
+        monitor.connect("changed", callback)
+        return monitor
+
+    def __is_game_dir(self, path) -> bool:
+        # hidden directories hold our own bookkeeping and the installer directory holds kept installers
+        name = os.path.basename(path)
+        return os.path.isdir(path) and not name.startswith(".") and name != "installer"
+
+    def __watch_game_dir(self, path):
+        if path in self.__game_monitors:
+            return
+        self.__game_monitors[path] = self.__monitor(path, self.__on_game_dir_changed)
+
+    def __unwatch_game_dir(self, path):
+        monitor = self.__game_monitors.pop(path, None)
+        if monitor is not None:
+            monitor.cancel()
+
+    def __on_root_changed(self, monitor, file, other_file, event_type):
+        if event_type in (Gio.FileMonitorEvent.CREATED, Gio.FileMonitorEvent.MOVED_IN):
+            self.__game_dir_added(file.get_path())
+        elif event_type in (Gio.FileMonitorEvent.DELETED, Gio.FileMonitorEvent.MOVED_OUT):
+            self.__game_dir_removed(file.get_path())
+        elif event_type == Gio.FileMonitorEvent.RENAMED:
+            self.__game_dir_removed(file.get_path())
+            self.__game_dir_added(other_file.get_path())
+
+    def __on_game_dir_changed(self, monitor, file, other_file, event_type):
+        names = [file.get_basename()]
+        if other_file is not None:
+            names.append(other_file.get_basename())
+        if not any(GAME_INFO_RE.match(name) for name in names):
+            return
+        if event_type in (Gio.FileMonitorEvent.CHANGES_DONE_HINT, Gio.FileMonitorEvent.DELETED,
+                          Gio.FileMonitorEvent.MOVED_IN, Gio.FileMonitorEvent.MOVED_OUT,
+                          Gio.FileMonitorEvent.RENAMED):
+            path = os.path.dirname(file.get_path())
+            self.__notify("updated", self.library.update_installed_game(path))
+
+    def __game_dir_added(self, path):
+        if not self.__is_game_dir(path):
+            return
+        self.__watch_game_dir(path)
+        # the game files may already be there when the directory was moved in
+        self.__notify("added", self.library.update_installed_game(path))
+
+    def __game_dir_removed(self, path):
+        if path not in self.__game_monitors:
+            return
+        self.__unwatch_game_dir(path)
+        self.__notify("removed", self.library.remove_installed_game(path))
+
+    def __notify(self, event, games):
+        if not games:
+            return
+        for listener_func in self.__listeners:
+            listener_func(event, games)
@@ -0,0 +1,149 @@
+import os
+import shutil
+import subprocess
+import threading
+from goodoldgalaxy.paths import WINE_BASE_PREFIX_DIR
+
+WINE_VERSION_FILE_NAME = ".goodoldgalaxy-wine-version"
+
+__base_prefix_lock = threading.Lock()
+
+
+def get_wine_env(prefix: str) -> dict:
+    """
+    Gets the environment to run wine with a given prefix.
+
+    Parameters:
+    -----------
+        prefix: str -> Wine prefix directory
+
+    Return:
+    -------
+        dict: Copy of the current environment with WINEPREFIX set
+    """
+    env = os.environ.copy()
+    env["WINEPREFIX"] = prefix
+    return env
+
+
+def get_wine_version() -> str:
+    """
+    Gets the version of the installed wine.
+
+    Return:
+    -------
+        str: Wine version, None if wine isn't available
+    """
+    try:
+        return subprocess.check_output(["wine", "--version"], stderr=subprocess.DEVNULL).decode("utf-8").strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def is_prefix_initialized(prefix: str) -> bool:
+    """
+    Checks if a prefix was already initialized by wine.
+
+    Parameters:
+    -----------
+        prefix: str -> Wine prefix directory
+
+    Return:
+    -------
+        bool: True if the prefix has a registry, False otherwise
+    """
+    return os.path.isfile(os.path.join(prefix, "system.reg"))
+
+
+def create_base_prefix(version: str = None) -> str:
+    """
+    Creates the shared base prefix game prefixes are cloned from, unless it exists for the installed wine already.
+
+    Parameters:
+    -----------
+        version: str -> Installed wine version, detected if not given
+
+    Return:
+    -------
+        str: Base prefix directory, None if it couldn't be created
+    """
+    if version is None:
+        version = get_wine_version()
+    if version is None:
+        return None
+    with __base_prefix_lock:
+        if __read_prefix_version(WINE_BASE_PREFIX_DIR) == version and is_prefix_initialized(WINE_BASE_PREFIX_DIR):
+            return WINE_BASE_PREFIX_DIR
+        print("Creating the base wine prefix for {}".format(version))
+        tmp_dir = "{}.tmp".format(WINE_BASE_PREFIX_DIR)
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(os.path.dirname(tmp_dir), mode=0o755, exist_ok=True)
+        env = get_wine_env(tmp_dir)
+        # don't ask to install mono and gecko, games that need them get them installed by their installer
+        env["WINEDLLOVERRIDES"] = "mscoree,mshtml="
+        try:
+            subprocess.run(["wineboot", "--init"], env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+            # wineboot returns before the registry is written to disk
+            subprocess.run(["wineserver", "--wait"], env=env, check=False)
+        except (OSError, subprocess.CalledProcessError) as e:
+            print("Could not create the base wine prefix. Cause: {}".format(e))
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+        if not is_prefix_initialized(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+        with open(os.path.join(tmp_dir, WINE_VERSION_FILE_NAME), "w") as file:
+            file.write(version)
+        shutil.rmtree(WINE_BASE_PREFIX_DIR, ignore_errors=True)
+        os.rename(tmp_dir, WINE_BASE_PREFIX_DIR)
+        return WINE_BASE_PREFIX_DIR
+
+
+def prepare_prefix(prefix: str) -> bool:
+    """
+    Fills a game prefix with a clone of the base prefix, so wine doesn't have to initialize it.
+
+    Only on file systems with reflinks (like Btrfs or XFS) the clone takes no space until the game changes it. On
+    other file systems, like ext4, every game prefix is a full copy of the base prefix and takes as much space as a
+    prefix initialized by wine, it only saves the time wine takes to initialize it. Files are never hard linked to the
+    base prefix, as wine and game installers change files of the prefix in place. Prefixes that already have contents
+    are left alone.
+
+    Parameters:
+    -----------
+        prefix: str -> Wine prefix directory of the game
+
+    Return:
+    -------
+        bool: True if the prefix is ready to use, False if wine has to initialize it
+    """
+    if is_prefix_initialized(prefix):
+        return True
+    if os.path.isdir(prefix) and len(os.listdir(prefix)) > 0:
+        return False
+    base_prefix = create_base_prefix()
+    if base_prefix is None:
+        return False
+    if os.path.isdir(prefix):
+        os.rmdir(prefix)
+    os.makedirs(os.path.dirname(prefix), mode=0o755, exist_ok=True)
+    try:
+        subprocess.run(["cp", "-a", "--reflink=auto", base_prefix, prefix],
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print("Could not clone the base wine prefix into {}. Cause: {}".format(prefix, e))
+        shutil.rmtree(prefix, ignore_errors=True)
+        os.makedirs(prefix, mode=0o755, exist_ok=True)
+        return False
+    version_file = os.path.join(prefix, WINE_VERSION_FILE_NAME)
+    if os.path.exists(version_file):
+        os.remove(version_file)
+    return True
+
+
+def __read_prefix_version(prefix: str) -> str:
+    try:
+        with open(os.path.join(prefix, WINE_VERSION_FILE_NAME), "r") as file:
+            return file.read().strip()
+    except OSError:
+        return None
@@ -61,5 +61,25 @@ class TestConfig(TestCase):
         obs = lang
         self.assertEqual(exp, obs)
 
+    @mock.patch('os.replace')
+    @mock.patch('os.fsync')
+    @mock.patch('os.path.exists')
+    def test_write(self, mock_isfile, mock_fsync, mock_replace):
+        mock_isfile.return_value = True
+        config = JSON_DEFAULT_CONFIGURATION
+        with patch("builtins.open", mock_open(read_data=config)) as mock_config:
+            from goodoldgalaxy.config import Config
+            Config.set("lang", "pl")
+            Config.set("lang", "de")
+            Config.flush()
+        writes = [args[0] for name, args, kwargs in mock_config.mock_calls if name == "().write"]
+        exp = 1
+        obs = len(writes)
+        self.assertEqual(exp, obs)
+        self.assertIn('"lang": "de"', writes[0])
+        exp = 1
+        obs = mock_replace.call_count
+        self.assertEqual(exp, obs)
+
 
 del sys.modules['threading']
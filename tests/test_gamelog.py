@@ -0,0 +1,36 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from goodoldgalaxy.gamelog import GameLog
+
+
+class TestGameLog(TestCase):
+    def test1_write(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "logs", "game.log")
+            log = GameLog(path, max_size=100, backups=2)
+            log.open()
+            log.write(b"hello\n")
+            log.close()
+            with open(path, "rb") as file:
+                obs = file.read()
+            self.assertTrue(obs.startswith(b"--- Started at "))
+            self.assertTrue(obs.endswith(b"---\nhello\n"))
+
+    def test2_rotate(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "game.log")
+            log = GameLog(path, max_size=100, backups=2)
+            log.open()
+            for line in (b"a", b"b", b"c", b"d"):
+                log.write(line * 60)
+            log.write(b"e" * 250)
+            log.close()
+            exp = [b"e" * 100, b"d" * 60, b"c" * 60]
+            obs = []
+            for log_path in (path, path + ".1", path + ".2"):
+                with open(log_path, "rb") as file:
+                    obs.append(file.read())
+            self.assertEqual(exp, obs)
+            self.assertFalse(os.path.exists(path + ".3"))
@@ -0,0 +1,48 @@
+import io
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from goodoldgalaxy.gogextract import MultiPartFile, open_installer_data, verify_installer
+
+SCRIPT = b'#!/bin/sh\noffset=`head -n 4 "$0"`\nfilesizes="5"\n# end\n'
+
+
+class TestGogExtract(TestCase):
+    def create_parts(self, directory, content, sizes):
+        paths = []
+        start = 0
+        for size in sizes + [len(content)]:
+            path = os.path.join(directory, "part{}".format(len(paths)))
+            with open(path, "wb") as file:
+                file.write(content[start:start + size])
+            start += size
+            paths.append(path)
+        return paths
+
+    def test1_multi_part_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = bytes(range(256)) * 10
+            paths = self.create_parts(directory, content, [100, 1, 1000])
+            with MultiPartFile(paths) as file:
+                exp = content[50:1200]
+                obs = file.pread(1150, 50)
+                self.assertEqual(exp, obs)
+                file.seek(-10, io.SEEK_END)
+                exp = content[-10:]
+                obs = file.read()
+                self.assertEqual(exp, obs)
+
+    def test2_multi_part_installer(self):
+        with tempfile.TemporaryDirectory() as directory:
+            data = io.BytesIO()
+            with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr("data/noarch/gameinfo", "Test Game\n1.0\n")
+            content = SCRIPT + b"MOJOS" + data.getvalue()
+            paths = self.create_parts(directory, content, [20, len(SCRIPT), 30])
+            self.assertTrue(verify_installer(paths))
+            with open_installer_data(paths) as installer_data, zipfile.ZipFile(installer_data) as archive:
+                exp = b"Test Game\n1.0\n"
+                obs = archive.read("data/noarch/gameinfo")
+                self.assertEqual(exp, obs)
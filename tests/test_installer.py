@@ -0,0 +1,94 @@
+import os
+import sys
+import tempfile
+import time
+import zipfile
+from unittest import TestCase, mock
+from unittest.mock import MagicMock
+
+m_gi = MagicMock()
+sys.modules['gi'] = m_gi
+sys.modules['gi.repository'] = m_gi.repository
+
+from goodoldgalaxy.game import Game
+from goodoldgalaxy.installer import extract_game_data, read_manifest, install_game, trash_directory, \
+    MANIFEST_FILE_NAME, DLC_MANIFEST_FILE_NAME, TRASH_DIR_NAME
+
+
+class TestInstaller(TestCase):
+    def create_installer(self, directory, name, files):
+        path = os.path.join(directory, name)
+        with zipfile.ZipFile(path, "w") as archive:
+            for file_name, content in files.items():
+                archive.writestr("data/noarch/" + file_name, content)
+        return path
+
+    def test1_extract_dlc(self):
+        with tempfile.TemporaryDirectory() as directory:
+            install_dir = os.path.join(directory, "game")
+            game = self.create_installer(directory, "game.sh", {"start.sh": "#!/bin/sh\n", "game/data.pak": "data"})
+            dlc = self.create_installer(directory, "dlc.sh", {"game/dlc.pak": "dlc"})
+            extract_game_data(game, install_dir)
+            extract_game_data(dlc, install_dir, manifest_name=DLC_MANIFEST_FILE_NAME.format(1))
+            exp = [True, True, True]
+            obs = [os.path.isfile(os.path.join(install_dir, name)) for name in ("start.sh", "game/data.pak", "game/dlc.pak")]
+            self.assertEqual(exp, obs)
+            exp = ["game/data.pak", "start.sh"]
+            obs = sorted(read_manifest(install_dir, MANIFEST_FILE_NAME))
+            self.assertEqual(exp, obs)
+
+    def test2_extract_update(self):
+        with tempfile.TemporaryDirectory() as directory:
+            install_dir = os.path.join(directory, "game")
+            game = self.create_installer(directory, "game.sh", {"start.sh": "#!/bin/sh\n", "game/old.pak": "old"})
+            update = self.create_installer(directory, "update.sh", {"start.sh": "#!/bin/sh\n", "game/new.pak": "new"})
+            extract_game_data(game, install_dir)
+            extract_game_data(update, install_dir, update=True)
+            exp = [True, False, True]
+            obs = [os.path.isfile(os.path.join(install_dir, name)) for name in ("start.sh", "game/old.pak", "game/new.pak")]
+            self.assertEqual(exp, obs)
+
+    @mock.patch('goodoldgalaxy.installer.prepare_prefix')
+    @mock.patch('goodoldgalaxy.installer.InstallerStore')
+    @mock.patch('goodoldgalaxy.installer.Config')
+    @mock.patch('subprocess.Popen')
+    def test3_install_malformed_info(self, mock_popen, mock_config, mock_store, mock_prefix):
+        mock_popen.return_value.returncode = 0
+        mock_config.get.return_value = False
+        mock_store.contains.return_value = False
+        with tempfile.TemporaryDirectory() as directory:
+            installer = os.path.join(directory, "setup.exe")
+            with open(installer, "w") as file:
+                file.write("setup")
+            game = Game("Game", game_id=1)
+            game.platform = "windows"
+            game.install_dir = os.path.join(directory, "game")
+            os.makedirs(game.install_dir)
+            for name, content in (("unins000.exe", ""), ("goggame-1.info", '{"playTasks": []}')):
+                with open(os.path.join(game.install_dir, name), "w") as file:
+                    file.write(content)
+            install_game(game, installer)
+            exp = 0
+            obs = game.updates
+            self.assertEqual(exp, obs)
+            exp = False
+            obs = os.path.exists(installer)
+            self.assertEqual(exp, obs)
+
+    def test4_trash_directory(self):
+        with tempfile.TemporaryDirectory() as directory:
+            games = [os.path.join(directory, name) for name in ("first", "second")]
+            for game in games:
+                os.makedirs(os.path.join(game, "data"))
+                trash_directory(game)
+            trash_dir = os.path.join(directory, TRASH_DIR_NAME)
+            deadline = time.monotonic() + 10
+            while os.path.exists(trash_dir) and time.monotonic() < deadline:
+                time.sleep(0.05)
+            exp = [False, False, False]
+            obs = [os.path.exists(path) for path in games + [trash_dir]]
+            self.assertEqual(exp, obs)
+
+
+del sys.modules['gi']
+del sys.modules['gi.repository']
@@ -0,0 +1,92 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from goodoldgalaxy.installer_store import InstallerStore
+
+
+class TestInstallerStore(TestCase):
+    def write_file(self, directory, name, content):
+        path = os.path.join(directory, name)
+        with open(path, "w") as file:
+            file.write(content)
+        return path
+
+    @mock.patch('goodoldgalaxy.installer_store.Config')
+    def test1_add(self, mock_config):
+        with tempfile.TemporaryDirectory() as directory:
+            mock_config.get.side_effect = lambda key: {"install_dir": directory}.get(key)
+            installer = self.write_file(directory, "game.sh", "installer")
+            stored = InstallerStore.add(1234, "linux", "en", "1.0", [installer])
+            exp = (False, True)
+            obs = (os.path.exists(installer), os.path.exists(stored[0]))
+            self.assertEqual(exp, obs)
+            exp = stored
+            obs = InstallerStore.find(1234, "linux", "en", "1.0")
+            self.assertEqual(exp, obs)
+            exp = None
+            obs = InstallerStore.find(1234, "linux", "en", "1.1")
+            self.assertEqual(exp, obs)
+
+    @mock.patch('goodoldgalaxy.installer_store.Config')
+    def test2_add(self, mock_config):
+        with tempfile.TemporaryDirectory() as directory:
+            mock_config.get.side_effect = lambda key: {"install_dir": directory}.get(key)
+            # the same file is only stored once
+            first = InstallerStore.add(1234, "linux", "en", "1.0", [self.write_file(directory, "game.sh", "installer")])
+            second = InstallerStore.add(1234, "linux", "de", "1.0", [self.write_file(directory, "game.sh", "installer")])
+            exp = first
+            obs = second
+            self.assertEqual(exp, obs)
+
+    @mock.patch('goodoldgalaxy.installer_store.Config')
+    def test_find_info(self, mock_config):
+        with tempfile.TemporaryDirectory() as directory:
+            mock_config.get.side_effect = lambda key: {"install_dir": directory}.get(key)
+            InstallerStore.add(1234, "linux", "en", "1.0", [self.write_file(directory, "game.sh", "version 1")])
+            InstallerStore.add(1234, "linux", "en", "1.1", [self.write_file(directory, "game.sh", "version 2")])
+            exp = {"os": "linux", "language": "en", "version": "1.1"}
+            obs = InstallerStore.find_info(1234, "linux", "en")
+            self.assertEqual(exp, obs)
+            exp = None
+            obs = InstallerStore.find_info(1234, "windows", "en")
+            self.assertEqual(exp, obs)
+
+    @mock.patch('goodoldgalaxy.installer_store.Config')
+    def test_prune(self, mock_config):
+        with tempfile.TemporaryDirectory() as directory:
+            config = {"install_dir": directory, "installer_store_max_versions": 1}
+            mock_config.get.side_effect = lambda key: config.get(key)
+            old = InstallerStore.add(1234, "linux", "en", "1.0", [self.write_file(directory, "game.sh", "version 1")])
+            new = InstallerStore.add(1234, "linux", "en", "1.1", [self.write_file(directory, "game.sh", "version 2")])
+            exp = (None, new, False)
+            obs = (InstallerStore.find(1234, "linux", "en", "1.0"), InstallerStore.find(1234, "linux", "en"),
+                   os.path.exists(old[0]))
+            self.assertEqual(exp, obs)
+
+    @mock.patch('goodoldgalaxy.installer_store.Config')
+    def test_link(self, mock_config):
+        with tempfile.TemporaryDirectory() as directory:
+            mock_config.get.side_effect = lambda key: {"install_dir": directory}.get(key)
+            parts = [self.write_file(directory, "setup_game", "part 0"), self.write_file(directory, "setup_game-1.bin", "part 1")]
+            stored = InstallerStore.add(1234, "windows", "en", "1.0", parts)
+            links = InstallerStore.link(stored, os.path.join(directory, "links"))
+            exp = [os.path.join(directory, "links", "setup_game"), os.path.join(directory, "links", "setup_game-1.bin")]
+            obs = links
+            self.assertEqual(exp, obs)
+            exp = os.stat(stored[1]).st_ino
+            obs = os.stat(links[1]).st_ino
+            self.assertEqual(exp, obs)
+
+    @mock.patch('goodoldgalaxy.installer_store.Config')
+    def test_remove(self, mock_config):
+        with tempfile.TemporaryDirectory() as directory:
+            mock_config.get.side_effect = lambda key: {"install_dir": directory}.get(key)
+            shared = InstallerStore.add(1234, "linux", "en", "1.0", [self.write_file(directory, "game.sh", "shared")])
+            stored = InstallerStore.add(1234, "linux", "de", "1.0", [self.write_file(directory, "game.sh", "shared"),
+                                                                     self.write_file(directory, "game.sh-1.bin", "part")])
+            InstallerStore.remove(stored)
+            exp = (None, shared, True, False)
+            obs = (InstallerStore.find(1234, "linux", "de"), InstallerStore.find(1234, "linux", "en"),
+                   os.path.exists(stored[0]), os.path.exists(stored[1]))
+            self.assertEqual(exp, obs)
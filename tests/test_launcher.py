@@ -1,4 +1,6 @@
+import os
 import subprocess
+import tempfile
 from unittest import TestCase, mock
 from unittest.mock import MagicMock
 
@@ -71,78 +73,104 @@ class Test(TestCase):
         obs = launcher.get_start_script_exe_cmd(game, files)
         self.assertEqual(exp, obs)
 
-    @mock.patch('os.getcwd')
-    @mock.patch('os.chdir')
     @mock.patch('subprocess.Popen')
-    @mock.patch('goodoldgalaxy.launcher.get_execute_command')
-    def test1_run_game_subprocess(self, launcher_mock, mock_popen, mock_os_chdir, mock_os_getcwd):
+    @mock.patch('goodoldgalaxy.launcher.get_launch_plan')
+    def test1_run_game_subprocess(self, mock_get_launch_plan, mock_popen):
+        mock_get_launch_plan.return_value = {"command": ["./start.sh"], "cwd": "/test/install/dir", "env": {}}
         mock_process = "Mock Process"
         mock_popen.return_value = mock_process
-        game = Game("Test Game", install_dir="/test/install/dir")
+        game = Game("Test Game")
+        game.install_dir = "/test/install/dir"
         exp = ("", mock_process)
         obs = launcher.run_game_subprocess(game)
         self.assertEqual(exp, obs)
+        exp = "/test/install/dir"
+        obs = mock_popen.call_args[1]["cwd"]
+        self.assertEqual(exp, obs)
 
-    @mock.patch('os.getcwd')
-    @mock.patch('os.chdir')
     @mock.patch('subprocess.Popen')
-    @mock.patch('goodoldgalaxy.launcher.get_execute_command')
-    def test2_run_game_subprocess(self, launcher_mock, mock_popen, mock_os_chdir, mock_os_getcwd):
+    @mock.patch('goodoldgalaxy.launcher.get_launch_plan')
+    def test2_run_game_subprocess(self, mock_get_launch_plan, mock_popen):
+        mock_get_launch_plan.return_value = {"command": ["./start.sh"], "cwd": "/test/install/dir", "env": {}}
         mock_popen.side_effect = FileNotFoundError()
-        game = Game("Test Game", install_dir="/test/install/dir")
+        game = Game("Test Game")
+        game.install_dir = "/test/install/dir"
         exp = ('No executable was found in /test/install/dir', None)
         obs = launcher.run_game_subprocess(game)
         self.assertEqual(exp, obs)
 
+    def test1_get_launch_plan(self):
+        with tempfile.TemporaryDirectory() as directory:
+            install_dir = os.path.join(directory, "game")
+            os.makedirs(install_dir)
+            open(os.path.join(install_dir, "start.sh"), "w").close()
+            game = Game("Test Game")
+            game.install_dir = install_dir
+            with mock.patch('goodoldgalaxy.launcher.LAUNCH_PLAN_DIR', os.path.join(directory, "launch")):
+                launcher.update_launch_plan(game)
+                with mock.patch('goodoldgalaxy.launcher.update_launch_plan') as mock_update_launch_plan:
+                    obs = launcher.get_launch_plan(game)
+                    mock_update_launch_plan.assert_not_called()
+            exp = ([os.path.join(install_dir, "start.sh")], install_dir, {})
+            self.assertEqual(exp, (obs["command"], obs["cwd"], obs["env"]))
+
+    def test2_get_launch_plan(self):
+        with tempfile.TemporaryDirectory() as directory:
+            install_dir = os.path.join(directory, "game")
+            os.makedirs(install_dir)
+            open(os.path.join(install_dir, "start.sh"), "w").close()
+            game = Game("Test Game")
+            game.install_dir = install_dir
+            with mock.patch('goodoldgalaxy.launcher.LAUNCH_PLAN_DIR', os.path.join(directory, "launch")):
+                launcher.update_launch_plan(game)
+                # a new file changes the modification time of the installation directory
+                os.makedirs(os.path.join(install_dir, "game"))
+                os.utime(install_dir, ns=(0, 0))
+                with mock.patch('goodoldgalaxy.launcher.update_launch_plan') as mock_update_launch_plan:
+                    launcher.get_launch_plan(game)
+                    mock_update_launch_plan.assert_called_once_with(game)
+
     @mock.patch('goodoldgalaxy.launcher.check_if_game_start_process_spawned_final_process')
     def test1_check_if_game_started_correctly(self, mock_check_game):
-        mock_process = MagicMock()
-        mock_process.wait.side_effect = subprocess.TimeoutExpired("cmd", 1)
-        game = Game("Test Game", install_dir="/test/install/dir")
+        mock_running_game = MagicMock()
         exp = ""
-        obs = launcher.check_if_game_started_correctly(mock_process, game)
+        obs = launcher.check_if_game_started_correctly(mock_running_game, 5)
         self.assertEqual(exp, obs)
 
     @mock.patch('goodoldgalaxy.launcher.check_if_game_start_process_spawned_final_process')
     def test2_check_if_game_started_correctly(self, mock_check_game):
-        mock_process = MagicMock()
-        mock_process.communicate.return_value = (b"Output message", b"Error message")
-        game = Game("Test Game", install_dir="/test/install/dir")
+        mock_check_game.return_value = "Game start process has finished prematurely"
+        mock_running_game = MagicMock()
+        mock_running_game.read_output.return_value = (b"Output message", b"Error message")
         exp = "Error message"
-        obs = launcher.check_if_game_started_correctly(mock_process, game)
+        obs = launcher.check_if_game_started_correctly(mock_running_game, 1)
         self.assertEqual(exp, obs)
 
     @mock.patch('os.getpid')
-    @mock.patch('subprocess.check_output')
-    def test1_check_if_game_start_process_spawned_final_process(self, mock_check_output, mock_getpid):
-        mock_check_output.return_value = b"""UID        PID  PPID  C STIME TTY          TIME CMD
-root         1     0  0 lis24 ?        00:00:02 /sbin/init splash
-root         2     0  0 lis24 ?        00:00:00 [kthreadd]
-root         3     2  0 lis24 ?        00:00:00 [rcu_gp]
-root         4     2  0 lis24 ?        00:00:00 [rcu_par_gp]
-root         6     2  0 lis24 ?        00:00:00 [kworker/0:0H-kblockd]
-"""
+    @mock.patch('goodoldgalaxy.process.get_stat')
+    @mock.patch('goodoldgalaxy.process.get_children')
+    def test1_check_if_game_start_process_spawned_final_process(self, mock_get_children, mock_get_stat, mock_getpid):
+        mock_get_children.return_value = []
+        mock_get_stat.return_value = None
         mock_getpid.return_value = 1000
+        mock_process = MagicMock()
+        mock_process.pid = 1001
         err_msg = "Error Message"
-        game = Game("Test Game", install_dir="/test/install/dir")
         exp = err_msg
-        obs = launcher.check_if_game_start_process_spawned_final_process(err_msg, game)
+        obs = launcher.check_if_game_start_process_spawned_final_process(err_msg, mock_process)
         self.assertEqual(exp, obs)
 
     @mock.patch('os.getpid')
-    @mock.patch('subprocess.check_output')
-    def test2_check_if_game_start_process_spawned_final_process(self, mock_check_output, mock_getpid):
-        mock_check_output.return_value = b"""UID        PID  PPID  C STIME TTY          TIME CMD
-root         1     0  0 lis24 ?        00:00:02 /sbin/init splash
-root         2     0  0 lis24 ?        00:00:00 [kthreadd]
-root         3     2  0 lis24 ?        00:00:00 [rcu_gp]
-root         4     2  0 lis24 ?        00:00:00 [rcu_par_gp]
-root         6     2  0 lis24 ?        00:00:00 [kworker/0:0H-kblockd]
-makson    1006     2  0 lis24 ?        00:00:00 /bin/sh /home/makson/.paradoxlauncher/launcher-v2.2020.15/Paradox Launcher --pdxlGameDir /home/makson/GOG Games/Stellaris/game --gameDir /home/makson/GOG Games/Stellaris/game
-"""
+    @mock.patch('goodoldgalaxy.process.get_stat')
+    @mock.patch('goodoldgalaxy.process.get_children')
+    def test2_check_if_game_start_process_spawned_final_process(self, mock_get_children, mock_get_stat, mock_getpid):
+        # the start script 1001 exited, the game 1006 it started was reparented to this process
+        mock_get_children.side_effect = lambda pid: {1000: [1006]}.get(pid, [])
+        mock_get_stat.side_effect = lambda pid: {1006: ("S", 1000, 1001)}.get(pid)
         mock_getpid.return_value = 1000
+        mock_process = MagicMock()
+        mock_process.pid = 1001
         err_msg = "Error Message"
-        game = Game("Stellaris", install_dir="/home/makson/GOG Games")
         exp = ""
-        obs = launcher.check_if_game_start_process_spawned_final_process(err_msg, game)
+        obs = launcher.check_if_game_start_process_spawned_final_process(err_msg, mock_process)
         self.assertEqual(exp, obs)
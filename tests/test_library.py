@@ -0,0 +1,149 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+from unittest.mock import MagicMock
+
+from goodoldgalaxy.game import Game
+from goodoldgalaxy.library import Library
+
+
+class TestLibrary(TestCase):
+    def test1_games_snapshot(self):
+        library = Library(MagicMock())
+        library.games = [Game("Test Game", game_id=1)]
+        snapshot = library.games
+        library.games = [Game("Test Game", game_id=1), Game("Other Game", game_id=2)]
+        exp = 1
+        obs = len(snapshot)
+        self.assertEqual(exp, obs)
+        exp = 2
+        obs = len(library.games)
+        self.assertEqual(exp, obs)
+
+    @mock.patch.object(Library, 'save_snapshot')
+    @mock.patch('goodoldgalaxy.library.Config')
+    def test2_games_snapshot(self, mock_config, mock_save):
+        api_mock = MagicMock()
+        api_mock.get_library.side_effect = ConnectionError()
+        library = Library(api_mock)
+        with tempfile.TemporaryDirectory() as install_dir:
+            mock_config.get.return_value = install_dir
+            game_dir = os.path.join(install_dir, "Other Game")
+            os.mkdir(game_dir)
+            with open(os.path.join(game_dir, "gameinfo"), "w") as file:
+                file.write("Other Game\n1.0\n\nen\n2\n")
+            library.games = [Game("Test Game", game_id=1)]
+            snapshot = library.get_snapshot()
+            library.get_games(forced=True)
+        exp = True
+        obs = library.offline
+        self.assertEqual(exp, obs)
+        # the owned games are kept and the installed games merged into them
+        exp = (1, [(1, 0), (2, 1)])
+        obs = (len(snapshot.games), sorted((game.id, game.installed) for game in library.games))
+        self.assertEqual(exp, obs)
+
+    def test1_update_installed_game(self):
+        library = Library(MagicMock())
+        with tempfile.TemporaryDirectory() as game_dir:
+            with open(os.path.join(game_dir, "gameinfo"), "w") as file:
+                file.write("Test Game\n1.0\n\nen\n1234\n")
+            changed = library.update_installed_game(game_dir)
+            exp = ["Test Game"]
+            obs = [game.name for game in changed]
+            self.assertEqual(exp, obs)
+            exp = ("1.0", 1)
+            obs = (library.games[0].installed_version, library.games[0].installed)
+            self.assertEqual(exp, obs)
+
+    def test2_update_installed_game(self):
+        gog_game = Game("Test Game", game_id=1234)
+        gog_game.is_gog_game = 1
+        library = Library(MagicMock())
+        library.games = [gog_game]
+        with tempfile.TemporaryDirectory() as game_dir:
+            with open(os.path.join(game_dir, "gameinfo"), "w") as file:
+                file.write("Test Game\n1.0\n\nen\n1234\n")
+            library.update_installed_game(game_dir)
+            exp = (1, game_dir)
+            obs = (gog_game.installed, gog_game.install_dir)
+            self.assertEqual(exp, obs)
+            library.remove_installed_game(game_dir)
+        exp = (1, 0, None)
+        obs = (len(library.games), gog_game.installed, gog_game.install_dir)
+        self.assertEqual(exp, obs)
+
+    def test_remove_installed_game(self):
+        library = Library(MagicMock())
+        game = Game("Test Game", game_id=1234)
+        game.set_installed("linux", "/test/install/dir", "1.0")
+        library.games = [game]
+        library.remove_installed_game("/test/install/dir")
+        exp = 0
+        obs = len(library.games)
+        self.assertEqual(exp, obs)
+
+    def test_load_snapshot(self):
+        library = Library(MagicMock())
+        game = Game("Test Game", game_id=1234)
+        game.genre = "Adventure"
+        game.set_installed("linux", "/test/install/dir", "1.0")
+        library.games = [game, Game("Other Game", game_id=5678)]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            path = os.path.join(cache_dir, "library.json")
+            library.save_snapshot(path)
+            loaded = Library(MagicMock())
+            obs = loaded.load_snapshot(path)
+            self.assertTrue(obs)
+            # a library that already has games keeps them
+            obs = library.load_snapshot(path)
+            self.assertFalse(obs)
+        exp = [("Test Game", 1234, "Adventure", 0), ("Other Game", 5678, None, 0)]
+        obs = [(game.name, game.id, game.genre, game.installed) for game in loaded.games]
+        self.assertEqual(exp, obs)
+
+    @mock.patch.object(Library, 'save_snapshot')
+    @mock.patch('goodoldgalaxy.library.Config')
+    def test3_games_snapshot(self, mock_config, mock_save):
+        info = {"downloads": {"installers": [{"os": "linux", "version": "1.0"}]}, "languages": {"en": "English"},
+                "images": {"sidebarIcon": "sidebar", "logo": "logo", "icon": "icon", "background": "background"}}
+        api_mock = MagicMock()
+        api_mock.get_library.return_value = []
+        # the batched lookup of the self installed games fails, single lookups work
+        api_mock.get_infos.side_effect = [[], ConnectionError()]
+        api_mock.get_info.side_effect = lambda game: dict(info, id=game.id)
+        library = Library(api_mock)
+        with tempfile.TemporaryDirectory() as install_dir:
+            mock_config.get.return_value = install_dir
+            for game_id in [1234, 5678]:
+                game_dir = os.path.join(install_dir, str(game_id))
+                os.mkdir(game_dir)
+                with open(os.path.join(game_dir, "gameinfo"), "w") as file:
+                    file.write("Game {}\n1.0\n\nen\n{}\n".format(game_id, game_id))
+            library.get_games(forced=True)
+        exp = [(1234, 0, "icon"), (5678, 0, "icon")]
+        obs = sorted((game.id, game.updates, game.icon_url) for game in library.games)
+        self.assertEqual(exp, obs)
+        exp = 2
+        obs = api_mock.get_info.call_count
+        self.assertEqual(exp, obs)
+
+    @mock.patch.object(Library, 'save_snapshot')
+    @mock.patch('goodoldgalaxy.library.Config')
+    def test4_games_snapshot(self, mock_config, mock_save):
+        info = {"id": 42, "downloads": {"installers": [{"os": "linux", "version": "1.0"}]}, "languages": {},
+                "images": {"sidebarIcon": "sidebar", "logo": "logo", "icon": "icon", "background": "background"}}
+        api_mock = MagicMock()
+        api_mock.get_library.return_value = [Game("Owned Game", game_id=42)]
+        api_mock.get_infos.return_value = [info]
+        library = Library(api_mock)
+        with tempfile.TemporaryDirectory() as install_dir:
+            mock_config.get.return_value = install_dir
+            library.get_games(forced=True)
+        # games that aren't installed have no updates
+        exp = [(42, 0)]
+        obs = [(game.id, game.updates) for game in library.games]
+        self.assertEqual(exp, obs)
+        exp = 1
+        obs = api_mock.get_infos.call_count
+        self.assertEqual(exp, obs)
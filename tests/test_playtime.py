@@ -0,0 +1,36 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from goodoldgalaxy.game import Game
+from goodoldgalaxy.playtime import PlayTime
+
+
+class TestPlayTime(TestCase):
+    def test1_add_session(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "playtime.json")
+            with mock.patch('goodoldgalaxy.playtime.PLAYTIME_FILE_PATH', path):
+                play_time = PlayTime.__class__()
+                game = Game("Test Game", game_id=1)
+                play_time.add_session(game, 1000, 1600)
+                play_time.add_session(game, 2000, 2300)
+                # read back from the store
+                play_time = PlayTime.__class__()
+                exp = (900, 2300, [[1000, 1600], [2000, 2300]])
+                obs = (play_time.get_total(game), play_time.get_last_played(game), play_time.get_sessions(game))
+                self.assertEqual(exp, obs)
+
+    def test2_get_most_played(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "playtime.json")
+            with mock.patch('goodoldgalaxy.playtime.PLAYTIME_FILE_PATH', path):
+                play_time = PlayTime.__class__()
+                play_time.add_session(Game("Short Game", game_id=1), 1000, 1100)
+                play_time.add_session(Game("Long Game", game_id=2), 500, 900)
+                exp = ["2", "1"]
+                obs = play_time.get_most_played()
+                self.assertEqual(exp, obs)
+                exp = ["1"]
+                obs = play_time.get_recently_played(1)
+                self.assertEqual(exp, obs)
@@ -0,0 +1,53 @@
+import os
+import time
+import signal
+import subprocess
+from unittest import TestCase
+
+from goodoldgalaxy.process import get_exit_code, get_stat, reap_orphans, add_owned_process, remove_owned_process
+
+
+class TestProcess(TestCase):
+    def test1_get_exit_code(self):
+        process = subprocess.Popen(["sh", "-c", "exit 3"])
+        pid, status = os.waitpid(process.pid, 0)
+        exp = 3
+        obs = get_exit_code(status)
+        self.assertEqual(exp, obs)
+
+    def test2_get_exit_code(self):
+        process = subprocess.Popen(["sleep", "10"])
+        process.send_signal(signal.SIGTERM)
+        pid, status = os.waitpid(process.pid, 0)
+        exp = -signal.SIGTERM
+        obs = get_exit_code(status)
+        self.assertEqual(exp, obs)
+
+    def __start_zombie(self):
+        process = subprocess.Popen(["true"])
+        while get_stat(process.pid)[0] != "Z":
+            time.sleep(0.01)
+        return process
+
+    def test3_reap_orphans(self):
+        process = self.__start_zombie()
+        reap_orphans()
+        exp = "Z"
+        obs = get_stat(process.pid)[0]
+        self.assertEqual(exp, obs)
+        reap_orphans()
+        obs = get_stat(process.pid)
+        self.assertIsNone(obs)
+
+    def test4_reap_orphans(self):
+        process = self.__start_zombie()
+        add_owned_process(process.pid)
+        reap_orphans()
+        reap_orphans()
+        exp = "Z"
+        obs = get_stat(process.pid)[0]
+        self.assertEqual(exp, obs)
+        remove_owned_process(process.pid)
+        exp = 0
+        obs = process.wait()
+        self.assertEqual(exp, obs)
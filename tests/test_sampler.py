@@ -0,0 +1,46 @@
+import os
+import csv
+import tempfile
+from unittest import TestCase, mock
+
+from goodoldgalaxy.sampler import ResourceSampler, CLOCK_TICKS
+
+
+class TestSampler(TestCase):
+    @mock.patch('goodoldgalaxy.sampler.read_process_usage')
+    @mock.patch('time.monotonic')
+    def test1_sample(self, mock_monotonic, mock_usage):
+        tracker = mock.MagicMock()
+        tracker.get_pids.side_effect = [{10}, {10, 11}]
+        mock_monotonic.side_effect = [100, 102]
+        mock_usage.side_effect = [
+            (CLOCK_TICKS, 1000, 0, 0),
+            (2 * CLOCK_TICKS, 2000, 50, 10),
+            (CLOCK_TICKS, 3000, 20, 0),
+        ]
+        sampler = ResourceSampler(tracker, 5)
+        sampler.sample()
+        sampler.sample()
+        exp = [(100.0, 5000, 70, 10)]
+        obs = [sample[1:] for sample in sampler.get_samples()]
+        self.assertEqual(exp, obs)
+        summary = sampler.summary()
+        exp = (1, 100.0, 5000, 70, 10)
+        obs = (summary["samples"], summary["cpu_max"], summary["rss_max"], summary["read_bytes"], summary["written_bytes"])
+        self.assertEqual(exp, obs)
+
+    def test2_export_csv(self):
+        tracker = mock.MagicMock()
+        tracker.get_pids.return_value = {os.getpid()}
+        sampler = ResourceSampler(tracker, 5)
+        sampler.sample()
+        sampler.sample()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "usage.csv")
+            sampler.export_csv(path)
+            with open(path, "r", newline="") as file:
+                rows = list(csv.reader(file))
+        exp = (["time", "cpu_percent", "rss_bytes", "read_bytes", "written_bytes"], 2)
+        obs = (rows[0], len(rows))
+        self.assertEqual(exp, obs)
+        self.assertGreater(int(rows[1][2]), 0)
@@ -0,0 +1,36 @@
+from unittest import TestCase, mock
+
+from goodoldgalaxy.scheduler import RefreshJob
+
+
+class TestRefreshJob(TestCase):
+    @mock.patch('goodoldgalaxy.scheduler.Config')
+    def test1_delay(self, mock_config):
+        mock_config.get.return_value = 600
+        job = RefreshJob("test", None, "test_interval")
+        obs = job.delay()
+        self.assertTrue(540 <= obs <= 660)
+
+    @mock.patch('goodoldgalaxy.scheduler.Config')
+    def test2_delay(self, mock_config):
+        mock_config.get.return_value = 600
+        job = RefreshJob("test", None, "test_interval")
+        job.failures = 2
+        obs = job.delay()
+        self.assertTrue(2160 <= obs <= 2640)
+
+    @mock.patch('goodoldgalaxy.scheduler.Config')
+    def test3_delay(self, mock_config):
+        mock_config.get.return_value = 600
+        job = RefreshJob("test", None, "test_interval")
+        job.failures = 20
+        obs = job.delay()
+        self.assertTrue(obs <= 6 * 60 * 60 * 1.1)
+
+    @mock.patch('goodoldgalaxy.scheduler.Config')
+    def test_interval(self, mock_config):
+        mock_config.get.return_value = 1
+        job = RefreshJob("test", None, "test_interval")
+        exp = 60
+        obs = job.interval()
+        self.assertEqual(exp, obs)
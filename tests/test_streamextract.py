@@ -0,0 +1,58 @@
+import os
+import tempfile
+import zipfile
+from unittest import TestCase
+
+from goodoldgalaxy.streamextract import StreamExtractor
+
+SCRIPT = b'#!/bin/sh\noffset=`head -n 4 "$0"`\nfilesizes="5"\n# end\n'
+
+
+class TestStreamExtractor(TestCase):
+    def create_installer(self, directory):
+        data = os.path.join(directory, "data.zip")
+        with zipfile.ZipFile(data, "w", zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("scripts/config.lua", "setup")
+            info = zipfile.ZipInfo("data/noarch/start.sh")
+            info.external_attr = 0o100755 << 16
+            archive.writestr(info, "#!/bin/sh\n")
+            archive.writestr("data/noarch/gameinfo", "Test Game\n1.0\n")
+            archive.writestr("data/noarch/game/data.pak", "x" * 100000)
+        with open(data, "rb") as file:
+            return SCRIPT + b"MOJOS" + file.read()
+
+    def test1_finish(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = self.create_installer(directory)
+            installer = os.path.join(directory, "installer.sh")
+            install_dir = os.path.join(directory, "game")
+            extractor = StreamExtractor(installer, install_dir)
+            extractor.start()
+            with open(installer, "wb") as file:
+                for start in range(0, len(content), 1000):
+                    file.write(content[start:start + 1000])
+                    file.flush()
+                    extractor.notify()
+            extractor.finish()
+            exp = ["game", "gameinfo", "start.sh"]
+            obs = sorted(os.listdir(install_dir))
+            self.assertEqual(exp, obs)
+            exp = 0o755
+            obs = os.stat(os.path.join(install_dir, "start.sh")).st_mode & 0o777
+            self.assertEqual(exp, obs)
+
+    def test2_finish(self):
+        with tempfile.TemporaryDirectory() as directory:
+            content = self.create_installer(directory)
+            installer = os.path.join(directory, "installer.sh")
+            install_dir = os.path.join(directory, "game")
+            extractor = StreamExtractor(installer, install_dir)
+            extractor.start()
+            # the download stops halfway
+            with open(installer, "wb") as file:
+                file.write(content[:len(content) // 2])
+            self.assertRaises(EOFError, extractor.finish)
+            extractor.cancel()
+            exp = False
+            obs = os.path.exists(install_dir)
+            self.assertEqual(exp, obs)
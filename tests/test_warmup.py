@@ -0,0 +1,43 @@
+import os
+import tempfile
+from unittest import TestCase, mock
+
+from goodoldgalaxy.game import Game
+from goodoldgalaxy.warmup import WarmupRecorder, get_warmup_files, save_warmup_files, warm_up
+
+
+class TestWarmup(TestCase):
+    def test1_record(self):
+        with tempfile.TemporaryDirectory() as directory:
+            game = Game("Test Game", game_id=1)
+            game.install_dir = os.path.join(directory, "Test Game")
+            os.makedirs(game.install_dir)
+            path = os.path.join(game.install_dir, "data.pak")
+            with open(path, "wb") as file:
+                file.write(b"data")
+            tracker = mock.MagicMock()
+            tracker.get_pids.return_value = {os.getpid()}
+            recorder = WarmupRecorder(game, tracker)
+            with open(path, "rb"), open(os.path.join(directory, "other"), "wb"):
+                recorder.record()
+                recorder.record()
+            exp = [path]
+            obs = recorder.files
+            self.assertEqual(exp, obs)
+
+    def test2_warm_up(self):
+        with tempfile.TemporaryDirectory() as directory:
+            game = Game("Test Game", game_id=1)
+            game.install_dir = os.path.join(directory, "Test Game")
+            with mock.patch('goodoldgalaxy.warmup.WARMUP_DIR', os.path.join(directory, "warmup")):
+                self.assertIsNone(warm_up(game))
+                files = [os.path.join(directory, "missing"), __file__]
+                save_warmup_files(game, files)
+                exp = files
+                obs = get_warmup_files(game)
+                self.assertEqual(exp, obs)
+                with mock.patch('os.posix_fadvise') as mock_fadvise:
+                    warm_up(game).join()
+                exp = 1
+                obs = mock_fadvise.call_count
+                self.assertEqual(exp, obs)